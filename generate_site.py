@@ -6,9 +6,23 @@ One command to update all data and generate the complete GitHub Pages site
 
 import sys
 import os
+import time
+import argparse
 from pathlib import Path
 from datetime import datetime
-import subprocess
+
+PROJECT_ROOT = Path(__file__).parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.export.build_graph import BuildState, BuildStep, fingerprint, file_digest, run_graph, print_report
+from src.utils.metrics import span
+
+# Where the incremental build stores input fingerprints between runs
+BUILD_STATE_FILE = PROJECT_ROOT / '.build_state.json'
+
+# Remote data (FRED, Yahoo Finance) cannot be hashed before fetching, so in
+# incremental mode it is re-fetched once it is older than this
+FETCH_MAX_AGE_HOURS = float(os.getenv('PUBLISH_FETCH_MAX_AGE_HOURS', '12'))
 
 def print_header(text):
     """Print a formatted header"""
@@ -16,50 +30,20 @@ def print_header(text):
     print(f"  {text}")
     print("=" * 60 + "\n")
 
-def run_step(description, command, required=True):
+def is_interactive():
+    """True when running in a terminal (not cron/CI) and prompts are allowed"""
+    if os.getenv('CI') or os.getenv('PUBLISH_NON_INTERACTIVE'):
+        return False
+    return sys.stdin.isatty()
+
+def check_api_key(interactive=True):
     """
-    Run a command and report success/failure
+    Check if FRED API key is configured
 
     Args:
-        description: What this step does
-        command: Command to run (as list)
-        required: Whether to exit on failure
+        interactive: Prompt before continuing without a key. When False
+            (cron/CI), continue with existing FRED data instead of blocking.
     """
-    print(f"➤ {description}...")
-
-    try:
-        if isinstance(command, str):
-            result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        else:
-            result = subprocess.run(command, capture_output=True, text=True)
-
-        if result.returncode == 0:
-            print(f"  ✓ Success")
-            if result.stdout:
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        print(f"    {line}")
-            return True
-        else:
-            print(f"  ✗ Failed")
-            if result.stderr:
-                for line in result.stderr.strip().split('\n')[:5]:  # Show first 5 lines
-                    if line.strip():
-                        print(f"    {line}")
-            if required:
-                print(f"\n✗ Required step failed. Aborting.")
-                sys.exit(1)
-            return False
-
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
-        if required:
-            print(f"\n✗ Required step failed. Aborting.")
-            sys.exit(1)
-        return False
-
-def check_api_key():
-    """Check if FRED API key is configured"""
     api_key = os.getenv('FRED_API_KEY')
     if not api_key or api_key == 'YOUR_API_KEY_HERE':
         print("\n⚠️  WARNING: FRED API key not found!")
@@ -69,79 +53,152 @@ def check_api_key():
         print("3. Set it: export FRED_API_KEY='your_key_here'")
         print("\nYou can still proceed to generate the site with existing data.")
 
+        if not interactive:
+            print("\nNon-interactive mode: continuing without fetching FRED data.")
+            return False
+
         response = input("\nContinue without fetching new data? (y/n): ")
         if response.lower() != 'y':
             sys.exit(0)
         return False
     return True
 
-def main():
-    """Main publish workflow"""
-
-    print_header("Defense Capital Dashboard - Publish Script")
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-    # Get project root
-    project_root = Path(__file__).parent
-    os.chdir(project_root)
-
-    print(f"Project directory: {project_root}\n")
+def build_steps(has_api_key):
+    """
+    Define the publish build graph
 
-    # Check for FRED API key
-    has_api_key = check_api_key()
-
-    # Step 1: Fetch FRED data (optional if no API key)
-    print_header("Step 1: Fetch Economic Data")
-    if has_api_key:
-        run_step(
-            "Fetching FRED economic data",
-            [sys.executable, "src/data_fetchers/fred_fetcher.py"],
-            required=False
+    Steps run in-process (no per-step Python interpreter), and heavy imports
+    (pandas, yfinance, SQLAlchemy) happen only when a step actually runs.
+    The three fetches, the deal export and the deal rollups are independent
+    and run in parallel; chart pages wait for the fetches.
+    """
+    github_site = PROJECT_ROOT / 'github_site'
+    data_dir = github_site / 'data'
+    charts_dir = github_site / 'charts'
+    fetch_max_age = FETCH_MAX_AGE_HOURS * 3600
+
+    def fetch_fred(changed_keys):
+        from src.data_fetchers.fred_fetcher import fetch_fred_data
+        return fetch_fred_data(api_key=os.getenv('FRED_API_KEY'), output_dir=data_dir)
+
+    def fetch_market(changed_keys):
+        from src.data_fetchers.finance_fetcher import fetch_all_financial_data
+        return fetch_all_financial_data(api_key=os.getenv('FRED_API_KEY'), output_dir=data_dir)
+
+    from src.data_fetchers.private_capital_fetcher import workbook_fingerprint
+
+    def fetch_private_capital(changed_keys):
+        from src.data_fetchers.private_capital_fetcher import fetch_private_capital_data
+        # The fetcher skips an unchanged workbook; reparse when its own code changed
+        force = changed_keys is None or 'fetcher' in changed_keys
+        return fetch_private_capital_data(output_dir=data_dir, force=force)
+
+    def chart_page_inputs():
+        from src.export.generate_chart_pages_v2 import get_page_inputs
+        return {filename: fingerprint(payload) for filename, payload in get_page_inputs().items()}
+
+    def generate_charts(changed_keys):
+        from src.export.generate_chart_pages_v2 import generate_all_pages
+        return generate_all_pages(output_dir=charts_dir, only=changed_keys)
+
+    def chart_page_outputs():
+        from src.export.generate_chart_pages_v2 import get_page_inputs
+        return [charts_dir / filename for filename in get_page_inputs()]
+
+    def deals_inputs():
+        from src.export.export_to_html_v2 import get_deals_fingerprint
+        from src.export.templating import get_templates_fingerprint_source
+        return {
+            'master_list': get_deals_fingerprint(),
+            'exporter': file_digest(PROJECT_ROOT / 'src' / 'export' / 'export_to_html_v2.py'),
+            'templates': fingerprint(get_templates_fingerprint_source())
+        }
+
+    def export_deals(changed_keys):
+        from src.export.export_to_html_v2 import generate_deals_html
+        return generate_deals_html(output_file=github_site / 'deals' / 'index.html')
+
+    def rollup_inputs():
+        from src.export.export_to_html_v2 import get_deals_fingerprint
+        return {
+            'master_list': get_deals_fingerprint(),
+            'rollups': file_digest(PROJECT_ROOT / 'src' / 'export' / 'rollups.py')
+        }
+
+    def generate_rollups(changed_keys):
+        from src.export.rollups import generate_rollups
+        # Full builds and rollup code changes recompute every period;
+        # master list changes only recompute the periods they touch
+        rebuild = changed_keys is None or 'rollups' in changed_keys
+        return generate_rollups(output_dir=data_dir, rebuild=rebuild)
+
+    excel_file = PROJECT_ROOT / 'Capital paper - first chart - investment trends.xlsx'
+    fetchers_dir = PROJECT_ROOT / 'src' / 'data_fetchers'
+
+    return [
+        BuildStep(
+            name='fred',
+            description='Fetching FRED economic data',
+            run=fetch_fred,
+            inputs=lambda: {'fetcher': file_digest(fetchers_dir / 'fred_fetcher.py')},
+            outputs=[data_dir / 'fred_summary.json'],
+            max_age=fetch_max_age,
+            enabled=has_api_key,
+            skip_reason='no FRED API key'
+        ),
+        BuildStep(
+            name='market',
+            description='Fetching stock/ETF data',
+            run=fetch_market,
+            inputs=lambda: {'fetcher': file_digest(fetchers_dir / 'finance_fetcher.py')},
+            outputs=[data_dir / 'finance_summary.json'],
+            max_age=fetch_max_age
+        ),
+        BuildStep(
+            name='private_capital',
+            description='Fetching VC and M&A data from Excel',
+            run=fetch_private_capital,
+            inputs=lambda: {
+                'workbook': workbook_fingerprint(excel_file),
+                'fetcher': file_digest(fetchers_dir / 'private_capital_fetcher.py')
+            },
+            outputs=[data_dir / 'vc_defense.json', data_dir / 'ma_defense.json',
+                     data_dir / 'public_defense_companies.json']
+        ),
+        BuildStep(
+            name='chart_pages',
+            description='Generating HTML pages for all charts',
+            run=generate_charts,
+            inputs=chart_page_inputs,
+            outputs=chart_page_outputs(),
+            required=True,
+            deps=['fred', 'market', 'private_capital']
+        ),
+        BuildStep(
+            name='deals',
+            description='Exporting deals to intelligence briefing format',
+            run=export_deals,
+            inputs=deals_inputs,
+            outputs=[github_site / 'deals' / 'index.html', github_site / 'deals' / 'search-index.json'],
+            required=True
+        ),
+        BuildStep(
+            name='deal_rollups',
+            description='Aggregating monthly/quarterly deal rollups',
+            run=generate_rollups,
+            inputs=rollup_inputs,
+            outputs=[data_dir / 'deal_rollups_monthly.json', data_dir / 'deal_rollups_quarterly.json']
         )
-    else:
-        print("  ⊘ Skipped (no API key)")
-
-    # Step 2: Fetch financial data
-    print_header("Step 2: Fetch Market Data")
-    run_step(
-        "Fetching stock/ETF data",
-        [sys.executable, "src/data_fetchers/finance_fetcher.py"],
-        required=False
-    )
-
-    # Step 2b: Fetch private capital data (VC and M&A)
-    print_header("Step 2b: Fetch Private Capital Data")
-    run_step(
-        "Fetching VC and M&A data from Excel",
-        [sys.executable, "src/data_fetchers/private_capital_fetcher.py"],
-        required=False
-    )
-
-    # Step 3: Generate chart pages
-    print_header("Step 3: Generate Chart Pages")
-    run_step(
-        "Generating HTML pages for all charts",
-        [sys.executable, "src/export/generate_chart_pages_v2.py"],
-        required=True
-    )
-
-    # Step 4: Export deal tracker
-    print_header("Step 4: Export Deal Tracker")
-    run_step(
-        "Exporting deals to intelligence briefing format",
-        [sys.executable, "src/export/export_to_html_v2.py"],
-        required=True
-    )
-
-    # Step 5: Verify site structure
-    print_header("Step 5: Verify Site Structure")
+    ]
 
-    github_site = project_root / 'github_site'
+def verify_site(github_site):
+    """Check that the key site files exist"""
     required_files = [
         'index.html',
         'css/style.css',
         'js/main.js',
         'deals/index.html',
+        'deals/search-index.json',
         'charts/defense-spending.html'
     ]
 
@@ -157,7 +214,7 @@ def main():
     if not all_present:
         print("\n⚠️  Some files are missing!")
 
-    # Step 6: Count data files
+    # Count data files
     data_dir = github_site / 'data'
     if data_dir.exists():
         json_files = list(data_dir.glob('*.json'))
@@ -165,17 +222,69 @@ def main():
     else:
         print(f"\n  ⚠️  No data directory found")
 
+    return all_present
+
+def main(argv=None):
+    """Main publish workflow"""
+
+    parser = argparse.ArgumentParser(description="Update data and generate the GitHub Pages site")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild outputs whose inputs changed since the last publish")
+    parser.add_argument("--jobs", type=int, default=4,
+                        help="Maximum number of independent steps to run in parallel (default: 4)")
+    parser.add_argument("--non-interactive", action="store_true",
+                        help="Never prompt (default when not run from a terminal or when CI is set)")
+    args = parser.parse_args(argv)
+    interactive = is_interactive() and not args.non_interactive
+
+    print_header("Defense Capital Dashboard - Publish Script")
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    # Get project root
+    project_root = PROJECT_ROOT
+    os.chdir(project_root)
+
+    print(f"Project directory: {project_root}")
+    print(f"Build mode: {'incremental' if args.incremental else 'full rebuild'}\n")
+
+    # Check for FRED API key
+    has_api_key = check_api_key(interactive=interactive)
+
+    # Steps 1-4: Fetch data, generate chart pages, export deal tracker
+    print_header("Build")
+    state = BuildState(BUILD_STATE_FILE)
+    build_start = time.perf_counter()
+    with span('publish', incremental=args.incremental) as build_span:
+        results, ok = run_graph(build_steps(has_api_key), state,
+                                force=not args.incremental, max_workers=args.jobs)
+        if not ok:
+            build_span.outcome = 'error'
+    wall_time = time.perf_counter() - build_start
+
+    print_header("Build Report")
+    print_report(results, wall_time=wall_time)
+
+    if not ok:
+        sys.exit(1)
+
+    # Step 5: Verify site structure
+    print_header("Verify Site Structure")
+
+    github_site = project_root / 'github_site'
+    verify_site(github_site)
+
     # Print summary
     print_header("Publish Complete!")
 
     print("Site location:")
     print(f"  {github_site}\n")
 
+    rebuilt = {result.name for result in results if result.status == 'rebuilt'}
     print("What was updated:")
-    print("  ✓ Fresh economic data (FRED indicators)")
-    print("  ✓ Fresh market data (Yahoo Finance)")
-    print("  ✓ Updated chart pages")
-    print("  ✓ Exported accepted deals from triage\n")
+    print(f"  {'✓' if 'fred' in rebuilt else '⊘'} Fresh economic data (FRED indicators)")
+    print(f"  {'✓' if 'market' in rebuilt else '⊘'} Fresh market data (Yahoo Finance)")
+    print(f"  {'✓' if 'chart_pages' in rebuilt else '⊘'} Updated chart pages")
+    print(f"  {'✓' if 'deals' in rebuilt else '⊘'} Exported accepted deals from triage\n")
 
     print("Next steps:")
     print("  When called via './update_workflow.sh publish', deployment is automatic:")
@@ -74,7 +74,7 @@ function createLineChart(canvasId, data, options = {}) {
         labels: labels,
         datasets: [{
             label: data.name || data.series_id,
-            data: data.data.map(d => d.value || d.close),
+            data: data.data.map(d => d.value ?? d.close),
             borderColor: options.color || chartColors.primary,
             backgroundColor: options.fillColor || 'rgba(34, 110, 147, 0.1)',
             borderWidth: 2,
@@ -150,7 +150,7 @@ function createMultiLineChart(canvasId, datasets, options = {}) {
         label: dataset.name || dataset.ticker || dataset.series_id,
         data: dataset.data.map(d => ({
             x: d.date,
-            y: d.value || d.close
+            y: d.value ?? d.close
         })),
         borderColor: colors[index % colors.length],
         backgroundColor: 'transparent',
@@ -4,13 +4,16 @@ Financial Data Fetcher
 Fetches stock/ETF data using yfinance and Treasury data from FRED
 """
 
-import json
 import os
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import yfinance as yf
 from fredapi import Fred
-import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.data_fetchers.serialization import series_to_records, frame_to_records, write_json
 
 # Financial instruments to track
 FINANCIAL_INSTRUMENTS = {
@@ -31,6 +34,18 @@ FINANCIAL_INSTRUMENTS = {
     }
 }
 
+# OHLC columns from yfinance history -> output keys
+PRICE_COLUMNS = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume'
+}
+
+# Prices are rounded to 4 decimal places (yfinance returns adjusted float noise)
+PRICE_DECIMALS = 4
+
 # Treasury yield from FRED
 TREASURY_SERIES = {
     'DGS10': {
@@ -57,16 +72,12 @@ def fetch_stock_data(ticker, period='5y', output_dir=None):
         hist = stock.history(period=period)
 
         # Convert to list of dicts
-        data_list = []
-        for date, row in hist.iterrows():
-            data_list.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': int(row['Volume'])
-            })
+        data_list = frame_to_records(
+            hist,
+            PRICE_COLUMNS,
+            int_columns=('volume',),
+            decimals=PRICE_DECIMALS
+        )
 
         # Get metadata
         info = stock.info
@@ -104,14 +115,8 @@ def fetch_treasury_data(api_key, series_id='DGS10', output_dir=None):
         fred = Fred(api_key=api_key)
         data = fred.get_series(series_id)
 
-        # Convert to list of dicts
-        data_list = []
-        for date, value in data.items():
-            if pd.notna(value):
-                data_list.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'value': float(value)
-                })
+        # Convert to list of dicts (NaN values dropped)
+        data_list = series_to_records(data)
 
         metadata = TREASURY_SERIES[series_id]
         output = {
@@ -154,8 +159,7 @@ def fetch_all_financial_data(api_key=None, output_dir=None):
         data = fetch_stock_data(ticker, output_dir=output_dir)
         if data:
             output_file = output_dir / f'{ticker.lower()}.json'
-            with open(output_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            write_json(output_file, data)
             print(f"  ✓ Saved {data['data_points']} data points to {output_file.name}")
             results[ticker] = data['data_points']
         else:
@@ -167,8 +171,7 @@ def fetch_all_financial_data(api_key=None, output_dir=None):
             data = fetch_treasury_data(api_key, series_id, output_dir=output_dir)
             if data:
                 output_file = output_dir / f'{series_id.lower()}.json'
-                with open(output_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+                write_json(output_file, data)
                 print(f"  ✓ Saved {data['data_points']} data points to {output_file.name}")
                 results[series_id] = data['data_points']
             else:
@@ -185,8 +188,7 @@ def fetch_all_financial_data(api_key=None, output_dir=None):
     }
 
     summary_file = output_dir / 'finance_summary.json'
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_json(summary_file, summary)
 
     print(f"\n✓ Fetched {len(results)} financial instruments")
     print(f"✓ Saved summary to {summary_file.name}")
@@ -194,8 +196,6 @@ def fetch_all_financial_data(api_key=None, output_dir=None):
     return True
 
 if __name__ == '__main__':
-    import sys
-
     # Check for API key argument (optional for stocks, needed for Treasury)
     api_key = os.getenv('FRED_API_KEY', sys.argv[1] if len(sys.argv) > 1 else None)
 
@@ -4,12 +4,15 @@ FRED Data Fetcher
 Fetches economic data from Federal Reserve Economic Data (FRED) API
 """
 
-import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from fredapi import Fred
-import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.data_fetchers.serialization import series_to_records, write_json
 
 # FRED API configuration
 # User will need to set this environment variable or edit this file
@@ -114,14 +117,8 @@ def fetch_fred_data(api_key=None, output_dir=None):
             # Get the data
             data = fred.get_series(series_id)
 
-            # Convert to list of dicts for JSON
-            data_list = []
-            for date, value in data.items():
-                if pd.notna(value):  # Skip NaN values
-                    data_list.append({
-                        'date': date.strftime('%Y-%m-%d'),
-                        'value': float(value)
-                    })
+            # Convert to list of dicts for JSON (NaN values dropped)
+            data_list = series_to_records(data)
 
             # Prepare output
             output = {
@@ -136,8 +133,7 @@ def fetch_fred_data(api_key=None, output_dir=None):
 
             # Save to JSON file
             output_file = output_dir / f'{series_id.lower()}.json'
-            with open(output_file, 'w') as f:
-                json.dump(output, f, indent=2)
+            write_json(output_file, output)
 
             print(f"  ✓ Saved {len(data_list)} data points to {output_file.name}")
             results[series_id] = len(data_list)
@@ -154,8 +150,7 @@ def fetch_fred_data(api_key=None, output_dir=None):
     }
 
     summary_file = output_dir / 'fred_summary.json'
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_json(summary_file, summary)
 
     print(f"\n✓ Fetched {len(results)} FRED series")
     print(f"✓ Saved summary to {summary_file.name}")
@@ -163,8 +158,6 @@ def fetch_fred_data(api_key=None, output_dir=None):
     return True
 
 if __name__ == '__main__':
-    import sys
-
     # Check for API key argument
     api_key = sys.argv[1] if len(sys.argv) > 1 else None
 
@@ -2,30 +2,201 @@
 """
 Private Capital Data Fetcher
 Extracts VC and M&A data from Excel file
+
+The annual figures sit in a block on Sheet3 whose header row holds the
+series labels ("Public Defense Companies", "Venture Capital", "Mergers &
+Acquisitions") with the years in a column to their left. The block is
+found by those labels rather than fixed cell positions, and it runs
+until the first row without a year, so rows added for new years are
+picked up automatically. The sheet is streamed with openpyxl in
+read-only mode and the scan stops at the end of the block.
+
+Parsed data is cached with the workbook's size, mtime and SHA-256 hash.
+If the size and mtime are unchanged, the file is not even opened. If it
+was touched but its hash is the same, it is not reparsed. Either way the
+JSON files are left alone if they exist.
 """
 
+import hashlib
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
 
-def fetch_private_capital_data(excel_file=None, output_dir=None):
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_EXCEL_FILE = PROJECT_ROOT / 'Capital paper - first chart - investment trends.xlsx'
+SHEET_NAME = 'Sheet3'
+
+# Parsed-workbook cache (keyed by workbook path)
+CACHE_FILE = PROJECT_ROOT / '.private_capital_cache.json'
+
+# Header label of the block's first series: finds the header row
+BLOCK_LABEL = 'Public Defense Companies'
+
+# Header label -> output file and series metadata
+SERIES = {
+    'Public Defense Companies': ('public_defense_companies.json', {
+        'series_id': 'PUBLIC_DEFENSE_COMPANIES',
+        'name': 'Public Defense Companies - Capex & R&D',
+        'description': 'Capital expenditures and R&D investment by publicly traded defense and aerospace companies',
+        'units': 'Billions of Dollars'
+    }),
+    'Venture Capital': ('vc_defense.json', {
+        'series_id': 'VC_DEFENSE',
+        'name': 'Venture Capital Investment in Defense',
+        'description': 'Annual venture capital investment in U.S. defense and dual-use companies',
+        'units': 'Billions of Dollars'
+    }),
+    'Mergers & Acquisitions': ('ma_defense.json', {
+        'series_id': 'MA_DEFENSE',
+        'name': 'M&A Activity in Defense',
+        'description': 'Annual merger and acquisition activity in the U.S. aerospace and defense sector',
+        'units': 'Billions of Dollars'
+    }),
+}
+
+
+def _label(value):
+    return ' '.join(str(value).split()).lower() if isinstance(value, str) else None
+
+
+def _year(value):
+    """Cell value as a year (None if it isn't one)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        return None
+    return int(value) if 1900 <= value <= 2100 else None
+
+
+def parse_workbook(excel_file, sheet_name=SHEET_NAME):
+    """
+    Stream the sheet and extract the labelled annual series
+
+    Returns:
+        Dict of header label -> list of {'date', 'value'} points
+
+    Raises:
+        ValueError: Header row, a series column or the year column not found
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name]
+        columns = None  # header label -> column index
+        year_column = None
+        series = {label: [] for label in SERIES}
+
+        for row in sheet.iter_rows(values_only=True):
+            if columns is None:
+                labels = [_label(value) for value in row]
+                if _label(BLOCK_LABEL) not in labels:
+                    continue
+                missing = [label for label in SERIES if _label(label) not in labels]
+                if missing:
+                    raise ValueError(f"Columns not found next to '{BLOCK_LABEL}': {', '.join(missing)}")
+                columns = {label: labels.index(_label(label)) for label in SERIES}
+                continue
+
+            if year_column is None:
+                # Years are in the first column holding one, left of the values
+                first_value = min(columns.values())
+                year_column = next((i for i, value in enumerate(row[:first_value]) if _year(value)), None)
+                if year_column is None:
+                    raise ValueError(f"No year column found under '{BLOCK_LABEL}' header")
+
+            year = _year(row[year_column]) if year_column < len(row) else None
+            if year is None:
+                break  # End of the block
+
+            for label, column in columns.items():
+                value = row[column] if column < len(row) else None
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    series[label].append({'date': f'{year}-12-31', 'value': float(value)})
+
+        if columns is None:
+            raise ValueError(f"Header '{BLOCK_LABEL}' not found on sheet {sheet_name}")
+        return series
+    finally:
+        workbook.close()
+
+
+def _load_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    tmp_path = CACHE_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    tmp_path.replace(CACHE_FILE)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached_entry(excel_file, cache):
+    """
+    Cache entry for the workbook's current contents
+
+    Returns:
+        Tuple of (entry, status): status is 'unchanged' (same size/mtime),
+        'touched' (new mtime, same hash) or 'changed' (entry has no series)
+    """
+    stat = excel_file.stat()
+    entry = cache.get(str(excel_file.resolve()), {})
+
+    if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns and 'sha256' in entry:
+        return entry, 'unchanged'
+
+    sha256 = _sha256(excel_file)
+    status = 'touched' if entry.get('sha256') == sha256 and 'series' in entry else 'changed'
+    entry = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'series': entry.get('series') if status == 'touched' else None
+    }
+    cache[str(excel_file.resolve())] = entry
+    return entry, status
+
+
+def workbook_fingerprint(excel_file=None):
+    """SHA-256 of the workbook, rehashed only when its size or mtime changed (None if missing)"""
+    excel_file = Path(excel_file or DEFAULT_EXCEL_FILE)
+    if not excel_file.exists():
+        return None
+
+    cache = _load_cache()
+    entry, status = _cached_entry(excel_file, cache)
+    if status != 'unchanged':
+        _save_cache(cache)
+    return entry['sha256']
+
+
+def fetch_private_capital_data(excel_file=None, output_dir=None, force=False):
     """
     Extract VC, M&A, and Public Defense Companies data from Excel file and save as JSON
 
     Args:
         excel_file: Path to Excel file (default: Capital paper - first chart - investment trends.xlsx)
         output_dir: Output directory for JSON files (default: github_site/data)
+        force: Reparse and rewrite even if the workbook is unchanged
     """
-    if excel_file is None:
-        script_dir = Path(__file__).parent
-        excel_file = script_dir.parent.parent / 'Capital paper - first chart - investment trends.xlsx'
-    else:
-        excel_file = Path(excel_file)
+    excel_file = Path(excel_file) if excel_file is not None else DEFAULT_EXCEL_FILE
 
     if output_dir is None:
-        script_dir = Path(__file__).parent
-        output_dir = script_dir.parent.parent / 'github_site' / 'data'
+        output_dir = PROJECT_ROOT / 'github_site' / 'data'
     else:
         output_dir = Path(output_dir)
 
@@ -36,87 +207,36 @@ def fetch_private_capital_data(excel_file=None, output_dir=None):
         return False
 
     try:
-        # Read the Excel file (Sheet3 has the data)
-        print("Reading Excel file...")
-        df = pd.read_excel(excel_file, sheet_name='Sheet3', header=None)
-
-        # Extract Public Defense Companies data (rows 15-20, columns 2-3)
-        print("Fetching Public Defense Companies data...")
-        pdc_data = []
-        for idx in range(16, 21):  # Rows 16-20 (0-indexed)
-            year = int(df.iloc[idx, 2])
-            value = int(df.iloc[idx, 3])
-            pdc_data.append({
-                'date': f'{year}-12-31',
-                'value': float(value)
-            })
-
-        pdc_output = {
-            'series_id': 'PUBLIC_DEFENSE_COMPANIES',
-            'name': 'Public Defense Companies - Capex & R&D',
-            'description': 'Capital expenditures and R&D investment by publicly traded defense and aerospace companies',
-            'units': 'Billions of Dollars',
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data_points': len(pdc_data),
-            'data': pdc_data
-        }
-
-        pdc_file = output_dir / 'public_defense_companies.json'
-        with open(pdc_file, 'w') as f:
-            json.dump(pdc_output, f, indent=2)
-        print(f"  ✓ Saved {len(pdc_data)} Public Defense Companies data points to {pdc_file.name}")
-
-        # Extract Venture Capital data (rows 15-20, column 4)
-        print("Fetching VC investment data...")
-        vc_data = []
-        for idx in range(16, 21):
-            year = int(df.iloc[idx, 2])
-            value = int(df.iloc[idx, 4])
-            vc_data.append({
-                'date': f'{year}-12-31',
-                'value': float(value)
-            })
-
-        vc_output = {
-            'series_id': 'VC_DEFENSE',
-            'name': 'Venture Capital Investment in Defense',
-            'description': 'Annual venture capital investment in U.S. defense and dual-use companies',
-            'units': 'Billions of Dollars',
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data_points': len(vc_data),
-            'data': vc_data
-        }
-
-        vc_file = output_dir / 'vc_defense.json'
-        with open(vc_file, 'w') as f:
-            json.dump(vc_output, f, indent=2)
-        print(f"  ✓ Saved {len(vc_data)} VC data points to {vc_file.name}")
-
-        # Extract M&A data (rows 15-20, column 5)
-        print("Fetching M&A activity data...")
-        ma_data = []
-        for idx in range(16, 21):
-            year = int(df.iloc[idx, 2])
-            value = int(df.iloc[idx, 5])
-            ma_data.append({
-                'date': f'{year}-12-31',
-                'value': float(value)
-            })
-
-        ma_output = {
-            'series_id': 'MA_DEFENSE',
-            'name': 'M&A Activity in Defense',
-            'description': 'Annual merger and acquisition activity in the U.S. aerospace and defense sector',
-            'units': 'Billions of Dollars',
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data_points': len(ma_data),
-            'data': ma_data
-        }
-
-        ma_file = output_dir / 'ma_defense.json'
-        with open(ma_file, 'w') as f:
-            json.dump(ma_output, f, indent=2)
-        print(f"  ✓ Saved {len(ma_data)} M&A data points to {ma_file.name}")
+        cache = _load_cache()
+        entry, status = _cached_entry(excel_file, cache)
+        outputs_exist = all((output_dir / filename).exists() for filename, _ in SERIES.values())
+
+        if status != 'changed' and entry.get('series') is not None and not force:
+            if status == 'touched':
+                _save_cache(cache)
+            if outputs_exist:
+                print(f"⊘ Workbook unchanged ({status}), skipping private capital data")
+                return True
+            series = entry['series']
+        else:
+            print("Reading Excel file...")
+            series = parse_workbook(excel_file)
+            entry['series'] = series
+            _save_cache(cache)
+
+        from src.data_fetchers.serialization import write_json
+
+        last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for label, (filename, metadata) in SERIES.items():
+            data = series[label]
+            output = {
+                **metadata,
+                'last_updated': last_updated,
+                'data_points': len(data),
+                'data': data
+            }
+            write_json(output_dir / filename, output)
+            print(f"  ✓ Saved {len(data)} {label} data points to {filename}")
 
         print(f"\n✓ Fetched all private capital data successfully (Public Defense Companies, VC, M&A)")
         return True
@@ -128,12 +248,14 @@ def fetch_private_capital_data(excel_file=None, output_dir=None):
         return False
 
 if __name__ == '__main__':
-    import sys
+    import argparse
 
-    # Check for Excel file argument
-    excel_file = sys.argv[1] if len(sys.argv) > 1 else None
+    parser = argparse.ArgumentParser(description='Extract private capital series from the Excel workbook')
+    parser.add_argument('excel_file', nargs='?', default=None, help='Excel workbook')
+    parser.add_argument('--force', action='store_true', help='Reparse even if the workbook is unchanged')
+    args = parser.parse_args()
 
-    success = fetch_private_capital_data(excel_file=excel_file)
+    success = fetch_private_capital_data(excel_file=args.excel_file, force=args.force)
 
     if not success:
         sys.exit(1)
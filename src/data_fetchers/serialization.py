@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared serialization helpers for the data fetchers.
+
+Converts pandas objects into the JSON record layout used by the chart pages
+({'date': 'YYYY-MM-DD', 'value': ...}) with vectorized pandas/NumPy operations
+instead of per-row Python loops, and writes JSON with orjson when available.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# orjson is optional - fall back to the standard library encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def series_to_records(series, decimals=None, value_key='value'):
+    """
+    Convert a date-indexed Series into a list of {'date', 'value'} dicts
+
+    Args:
+        series: pandas Series indexed by dates (e.g. from fred.get_series)
+        decimals: Round values to this many decimal places (None = no rounding)
+        value_key: Key name for the value field
+
+    Returns:
+        List of dicts, NaN values dropped
+    """
+    series = series.dropna()
+    if series.empty:
+        return []
+
+    values = series.to_numpy(dtype=np.float64)
+    if decimals is not None:
+        values = np.round(values, decimals)
+
+    dates = pd.DatetimeIndex(series.index).strftime(DATE_FORMAT)
+
+    return [
+        {'date': date, value_key: value}
+        for date, value in zip(dates.tolist(), values.tolist())
+    ]
+
+
+def frame_to_records(df, columns, int_columns=(), decimals=None):
+    """
+    Convert a date-indexed DataFrame into a list of dicts
+
+    Args:
+        df: pandas DataFrame indexed by dates (e.g. from yf.Ticker.history)
+        columns: Mapping of source column -> output key, in output order
+        int_columns: Output keys to emit as integers (e.g. 'volume')
+        decimals: Round float columns to this many decimal places (None = no rounding)
+
+    Returns:
+        List of dicts, rows with NaN in any selected column dropped
+    """
+    frame = df[list(columns)].dropna()
+    if frame.empty:
+        return []
+
+    keys = ['date']
+    column_values = [pd.DatetimeIndex(frame.index).strftime(DATE_FORMAT).tolist()]
+
+    for source, key in columns.items():
+        if key in int_columns:
+            values = frame[source].to_numpy(dtype=np.int64)
+        else:
+            values = frame[source].to_numpy(dtype=np.float64)
+            if decimals is not None:
+                values = np.round(values, decimals)
+        keys.append(key)
+        # tolist() converts NumPy scalars to builtin int/float in one pass
+        column_values.append(values.tolist())
+
+    return [dict(zip(keys, row)) for row in zip(*column_values)]
+
+
+def dumps(payload, indent=True):
+    """
+    Encode payload as JSON bytes
+
+    Args:
+        payload: JSON-serializable object
+        indent: Pretty-print with 2-space indentation (matches existing data files)
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(payload, option=option)
+
+    return json.dumps(payload, indent=2 if indent else None).encode('utf-8')
+
+
+def write_json(path, payload, indent=True):
+    """
+    Write payload to a JSON file
+
+    Args:
+        path: Output file path
+        payload: JSON-serializable object
+        indent: Pretty-print with 2-space indentation
+    """
+    path = Path(path)
+    with open(path, 'wb') as f:
+        f.write(dumps(payload, indent=indent))
+
+
+def _loop_series_to_records(series):
+    """Reference implementation (the original per-row loop) for benchmarking"""
+    data_list = []
+    for date, value in series.items():
+        if pd.notna(value):
+            data_list.append({
+                'date': date.strftime(DATE_FORMAT),
+                'value': float(value)
+            })
+    return data_list
+
+
+def _loop_frame_to_records(hist):
+    """Reference implementation (the original iterrows loop) for benchmarking"""
+    data_list = []
+    for date, row in hist.iterrows():
+        data_list.append({
+            'date': date.strftime(DATE_FORMAT),
+            'open': float(row['Open']),
+            'high': float(row['High']),
+            'low': float(row['Low']),
+            'close': float(row['Close']),
+            'volume': int(row['Volume'])
+        })
+    return data_list
+
+
+def benchmark(data_dir=None, repeat=5):
+    """
+    Benchmark loop vs vectorized conversion over the existing data/*.json files
+
+    Args:
+        data_dir: Directory containing fetched JSON files (default: data/)
+        repeat: Number of timing repetitions (best time is reported)
+    """
+    import time
+
+    if data_dir is None:
+        data_dir = Path(__file__).parent.parent.parent / 'data'
+    data_dir = Path(data_dir)
+
+    def best_of(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    print(f"{'File':<22}{'Rows':>8}{'Loop (ms)':>12}{'Vector (ms)':>13}{'Speedup':>10}")
+    print("-" * 65)
+
+    total_loop = 0.0
+    total_vec = 0.0
+
+    for json_file in sorted(data_dir.glob('*.json')):
+        with open(json_file) as f:
+            payload = json.load(f)
+
+        rows = payload.get('data') if isinstance(payload, dict) else None
+        if not rows or 'date' not in rows[0]:
+            continue
+
+        index = pd.DatetimeIndex([row['date'] for row in rows])
+
+        # Loop baseline uses json.dumps to reflect the original fetchers end-to-end
+        if 'close' in rows[0]:
+            hist = pd.DataFrame({
+                'Open': [row['open'] for row in rows],
+                'High': [row['high'] for row in rows],
+                'Low': [row['low'] for row in rows],
+                'Close': [row['close'] for row in rows],
+                'Volume': [row['volume'] for row in rows],
+            }, index=index)
+            columns = {'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume'}
+
+            def loop():
+                json.dumps({'data': _loop_frame_to_records(hist)}, indent=2)
+
+            def vectorized():
+                dumps({'data': frame_to_records(hist, columns, int_columns=('volume',))})
+        else:
+            series = pd.Series([row['value'] for row in rows], index=index)
+
+            def loop():
+                json.dumps({'data': _loop_series_to_records(series)}, indent=2)
+
+            def vectorized():
+                dumps({'data': series_to_records(series)})
+
+        loop_time = best_of(loop)
+        vec_time = best_of(vectorized)
+        total_loop += loop_time
+        total_vec += vec_time
+
+        print(f"{json_file.name:<22}{len(rows):>8}{loop_time * 1000:>12.2f}{vec_time * 1000:>13.2f}"
+              f"{loop_time / vec_time:>9.1f}x")
+
+    print("-" * 65)
+    if total_vec:
+        print(f"{'TOTAL':<30}{total_loop * 1000:>12.2f}{total_vec * 1000:>13.2f}"
+              f"{total_loop / total_vec:>9.1f}x")
+    print(f"\nJSON encoder: {'orjson' if orjson is not None else 'json (stdlib)'}")
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python src/data_fetchers/serialization.py [data_dir]
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -6,6 +6,15 @@ from .models import (
     AIExtraction,
     MasterItem,
     RejectedItem,
+    StoryFingerprint,
+    StoryBand,
+    Category,
+    Company,
+    CompanyAlias,
+    DealRollup,
+    DealRollupSource,
+    Job,
+    Notification,
     get_engine,
     get_session
 )
@@ -16,6 +25,15 @@ __all__ = [
     'AIExtraction',
     'MasterItem',
     'RejectedItem',
+    'StoryFingerprint',
+    'StoryBand',
+    'Category',
+    'Company',
+    'CompanyAlias',
+    'DealRollup',
+    'DealRollupSource',
+    'Job',
+    'Notification',
     'get_engine',
     'get_session'
 ]
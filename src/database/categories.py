@@ -0,0 +1,165 @@
+"""Normalized sectors and capital sources.
+
+AIExtraction and MasterItem keep their comma-joined `sectors` and
+`capital_sources` text columns for display, and link to Category rows through
+the extraction_categories / master_categories junction tables for filtering
+and counting. set_categories() writes both, so every writer stays in sync:
+
+    set_categories(session, master, sectors=['AI/ML', 'Space'], capital_sources='Venture Capital')
+
+Existing databases are backfilled with src/database/migrate_categories_junction.py.
+"""
+
+from sqlalchemy import func, select
+
+from src.database.models import AIExtraction, MasterItem, Category, extraction_categories, master_categories
+
+SECTOR = 'sector'
+CAPITAL_SOURCE = 'capital_source'
+
+# Junction table and its owner column for each model
+JUNCTIONS = {
+    AIExtraction: (extraction_categories, extraction_categories.c.extraction_id),
+    MasterItem: (master_categories, master_categories.c.master_id),
+}
+
+
+def split_categories(value):
+    """
+    Normalize a list or comma-joined string of names
+
+    Returns:
+        List of unique, stripped names in their original order
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+
+    names = []
+    for name in value:
+        name = (name or '').strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_categories(session, kind, names):
+    """
+    Category rows for names, creating missing ones (one lookup query)
+
+    Returns:
+        List of Category in the order of names
+    """
+    names = split_categories(names)
+    if not names:
+        return []
+
+    existing = {
+        category.name: category
+        for category in session.query(Category).filter(Category.kind == kind, Category.name.in_(names))
+    }
+    # Pending rows created earlier in this session (not yet flushed)
+    for obj in session.new:
+        if isinstance(obj, Category) and obj.kind == kind and obj.name in names:
+            existing.setdefault(obj.name, obj)
+
+    categories = []
+    for name in names:
+        if name not in existing:
+            existing[name] = Category(kind=kind, name=name)
+            session.add(existing[name])
+        categories.append(existing[name])
+    return categories
+
+
+def set_categories(session, record, sectors=None, capital_sources=None):
+    """
+    Set sectors and capital sources on an AIExtraction or MasterItem
+
+    Updates the comma-joined text columns and the junction rows together.
+
+    Args:
+        session: Database session
+        record: AIExtraction or MasterItem
+        sectors: List or comma-joined string of sector names
+        capital_sources: List or comma-joined string of capital source names
+    """
+    sectors = split_categories(sectors)
+    capital_sources = split_categories(capital_sources)
+
+    record.sectors = ','.join(sectors) if sectors else None
+    record.capital_sources = ','.join(capital_sources) if capital_sources else None
+    record.categories = (get_categories(session, SECTOR, sectors) +
+                         get_categories(session, CAPITAL_SOURCE, capital_sources))
+
+
+def in_category(model, kind, name):
+    """
+    Filter expression: model rows linked to a category
+
+    Resolved through the (category_id, owner) junction index, e.g.
+    session.query(MasterItem).filter(in_category(MasterItem, SECTOR, 'AI/ML'))
+    """
+    junction, owner = JUNCTIONS[model]
+    return model.id.in_(
+        select(owner).join(Category, Category.id == junction.c.category_id).where(
+            Category.kind == kind, Category.name == name
+        )
+    )
+
+
+def category_counts(session, model=MasterItem, kind=None, query=None):
+    """
+    Count rows per category with a single GROUP BY
+
+    Args:
+        session: Database session
+        model: MasterItem (curated deals) or AIExtraction
+        kind: Only count SECTOR or CAPITAL_SOURCE (default both)
+        query: Optional query of model ids to restrict the counts to
+
+    Returns:
+        Dict of kind -> list of (name, count), most common first
+    """
+    junction, owner = JUNCTIONS[model]
+    counts = session.query(
+        Category.kind, Category.name, func.count(owner)
+    ).join(
+        junction, junction.c.category_id == Category.id
+    ).group_by(
+        Category.kind, Category.name
+    ).order_by(
+        func.count(owner).desc(), Category.name
+    )
+
+    if kind is not None:
+        counts = counts.filter(Category.kind == kind)
+    if query is not None:
+        counts = counts.filter(owner.in_(query))
+
+    facets = {}
+    for category_kind, name, count in counts:
+        facets.setdefault(category_kind, []).append((name, count))
+    return facets
+
+
+def categories_by_owner(session, model, kind, owner_ids=None):
+    """
+    Category names per row in one query
+
+    Returns:
+        Dict of model id -> list of names
+    """
+    junction, owner = JUNCTIONS[model]
+    rows = session.query(owner, Category.name).join(
+        Category, Category.id == junction.c.category_id
+    ).filter(Category.kind == kind)
+
+    if owner_ids is not None:
+        rows = rows.filter(owner.in_(list(owner_ids)))
+
+    names = {}
+    for owner_id, name in rows:
+        names.setdefault(owner_id, []).append(name)
+    return names
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Company entity resolution.
+
+The same company shows up as "Shield AI", "Shield AI Inc." and "ShieldAI"
+across AIExtraction.company and MasterItem.company. Every spelling is
+reduced to a normalized key (ASCII, lowercase, alphanumerics only, leading
+"The" and trailing legal designators dropped), so all three become
+"shieldai". Keys live in company_aliases, each pointing at one row in the
+companies registry.
+
+Placeholder names the summarizer writes when a field is missing ("Unknown",
+"N/A", "Undisclosed") have no key, so those records stay unlinked.
+
+Resolving a name is an indexed lookup on the exact key. Unknown keys are
+compared only against aliases sharing their first or last BLOCK_KEY_LENGTH
+characters, so a near miss like "Andurill" still finds "Anduril" and
+"Sheild AI" still finds "Shield AI" without scanning the whole registry.
+Matched spellings are saved as new aliases; anything else becomes a new
+company.
+
+Existing rows are linked with src/database/migrate_companies.py.
+"""
+
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from sqlalchemy import or_
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.database.models import RawItem, AIExtraction, MasterItem, Company, CompanyAlias
+
+BLOCK_KEY_LENGTH = 4
+
+# Fuzzy matches need a long enough key, the same digits ("Company 1" is not
+# "Company 2") and a close spelling
+FUZZY_MIN_LENGTH = 6
+FUZZY_THRESHOLD = 0.9
+
+LEGAL_DESIGNATORS = {
+    'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'plc', 'pbc', 'gmbh', 'ag', 'sa', 'sas', 'srl', 'bv', 'nv', 'pty'
+}
+
+# Normalized keys of "no company" answers, e.g. "Unknown", "N/A", "Not disclosed"
+PLACEHOLDER_KEYS = {
+    'unknown', 'na', 'none', 'undisclosed', 'notdisclosed', 'notspecified', 'notavailable'
+}
+
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_company(name):
+    """
+    Normalized registry key for a company name
+
+    e.g. "Shield AI, Inc." -> "shieldai", "The Boeing Company" -> "boeing"
+
+    Returns:
+        Key string, or None if the name is empty, has no letters or digits,
+        or is a placeholder like "Unknown"
+    """
+    if not name:
+        return None
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    words = _WORD_PATTERN.findall(text.replace('&', ' and '))
+
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_DESIGNATORS:
+        words.pop()
+
+    key = ''.join(words)
+    if not key or key in PLACEHOLDER_KEYS:
+        return None
+    return key
+
+
+def block_key(key):
+    """Prefix blocking key: aliases sharing it (or the tail key) are the fuzzy-match candidates"""
+    return key[:BLOCK_KEY_LENGTH]
+
+
+def tail_key(key):
+    """Suffix blocking key, so a typo in the first characters still finds candidates"""
+    return key[-BLOCK_KEY_LENGTH:]
+
+
+def _is_transposition(a, b):
+    """True if b is a with two adjacent characters swapped ("sheildai" / "shieldai")"""
+    if len(a) != len(b):
+        return False
+    diffs = [i for i in range(len(a)) if a[i] != b[i]]
+    return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+
+
+def _similarity(key, other):
+    """Spelling similarity; a single swapped letter pair always counts as a match"""
+    ratio = SequenceMatcher(None, key, other).ratio()
+    if ratio < FUZZY_THRESHOLD and _is_transposition(key, other):
+        return FUZZY_THRESHOLD
+    return ratio
+
+
+def _fuzzy_match(key, candidates):
+    """Best (alias, ratio) among candidate aliases at or above FUZZY_THRESHOLD"""
+    if len(key) < FUZZY_MIN_LENGTH:
+        return None, None
+
+    digits = _NON_DIGITS.sub('', key)
+    best, best_ratio = None, None
+    for alias in candidates:
+        if len(alias.normalized_key) < FUZZY_MIN_LENGTH or _NON_DIGITS.sub('', alias.normalized_key) != digits:
+            continue
+        ratio = _similarity(key, alias.normalized_key)
+        if ratio >= FUZZY_THRESHOLD and (best_ratio is None or ratio > best_ratio):
+            best, best_ratio = alias, ratio
+    return best, best_ratio
+
+
+def resolve_company(session, name, create=True):
+    """
+    Find (or register) the company a name refers to (caller commits)
+
+    Args:
+        session: Database session
+        name: Company name as written
+        create: Register unknown companies (otherwise return None for them)
+
+    Returns:
+        Company, or None if the name is empty or a placeholder, or unknown
+        and create is False
+    """
+    key = normalize_company(name)
+    if not key:
+        return None
+
+    alias = session.query(CompanyAlias).filter_by(normalized_key=key).first()
+    if alias is not None:
+        return alias.company
+
+    candidates = session.query(CompanyAlias).filter(
+        or_(CompanyAlias.block_key == block_key(key), CompanyAlias.tail_key == tail_key(key))
+    ).all()
+    match, _ = _fuzzy_match(key, candidates)
+
+    if match is not None:
+        company = match.company
+    elif create:
+        company = Company(name=name.strip(), normalized_key=key)
+        session.add(company)
+    else:
+        return None
+
+    # Remember this spelling so the next lookup is an exact hit
+    company.aliases.append(CompanyAlias(alias=name.strip(), normalized_key=key,
+                                        block_key=block_key(key), tail_key=tail_key(key)))
+    session.flush()
+    return company
+
+
+def link_company(session, record):
+    """
+    Set company_id on an AIExtraction or MasterItem from its company name
+
+    Returns:
+        The resolved Company, or None if the record has no (or a placeholder) company name
+    """
+    company = resolve_company(session, record.company)
+    record.company_id = company.id if company else None
+    return company
+
+
+def get_prior_deals(session, company_ids, exclude_item_ids=()):
+    """
+    Master list deals for a set of companies, newest first (one query)
+
+    Args:
+        session: Database session
+        company_ids: Registry ids to look up
+        exclude_item_ids: Raw item ids to leave out (e.g. the items being triaged)
+
+    Returns:
+        Dict of company_id -> list of (MasterItem, RawItem)
+    """
+    deals = {}
+    company_ids = {company_id for company_id in company_ids if company_id}
+    if not company_ids:
+        return deals
+
+    rows = session.query(MasterItem, RawItem).join(
+        RawItem, MasterItem.item_id == RawItem.id
+    ).filter(
+        MasterItem.company_id.in_(company_ids)
+    ).order_by(RawItem.published_date.desc())
+
+    if exclude_item_ids:
+        rows = rows.filter(~MasterItem.item_id.in_(list(exclude_item_ids)))
+
+    for master, raw in rows:
+        deals.setdefault(master.company_id, []).append((master, raw))
+    return deals
+
+
+def purge_placeholder_companies(session):
+    """
+    Unlink records from companies registered under a placeholder name ("Unknown")
+    and delete those companies (caller commits)
+
+    Returns:
+        Number of placeholder companies removed
+    """
+    placeholders = list(PLACEHOLDER_KEYS)
+    session.query(CompanyAlias).filter(
+        CompanyAlias.normalized_key.in_(placeholders)
+    ).delete(synchronize_session=False)
+
+    companies = session.query(Company).filter(Company.normalized_key.in_(placeholders)).all()
+    if not companies:
+        session.flush()
+        return 0
+
+    ids = [company.id for company in companies]
+    for model in (AIExtraction, MasterItem):
+        session.query(model).filter(model.company_id.in_(ids)).update(
+            {model.company_id: None}, synchronize_session=False
+        )
+    for company in companies:
+        session.delete(company)
+    session.flush()
+    return len(companies)
+
+
+def backfill_companies(session):
+    """
+    Link every extraction and master item that has a company name but no company_id
+
+    Placeholder companies left by earlier runs are removed first, and aliases
+    saved before tail keys existed get theirs filled in.
+
+    Returns:
+        Tuple of (records linked, companies in the registry)
+    """
+    purge_placeholder_companies(session)
+    for alias in session.query(CompanyAlias).filter(CompanyAlias.tail_key.is_(None)):
+        alias.tail_key = tail_key(alias.normalized_key)
+    session.flush()
+
+    linked = 0
+    for model in (AIExtraction, MasterItem):
+        records = session.query(model).filter(
+            model.company.isnot(None), model.company_id.is_(None)
+        ).order_by(model.id)
+
+        for record in records.all():
+            if link_company(session, record) is not None:
+                linked += 1
+
+    session.commit()
+    return linked, session.query(Company).count()
+
+
+def benchmark(n=20_000, probes=500, seed=42):
+    """
+    Compare resolving misspelled names via the blocking index vs a full fuzzy scan
+
+    Builds a registry of n synthetic company names in memory, then resolves
+    variants (legal suffixes, spacing, one-letter typos) of random ones.
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 8))).capitalize() for _ in range(3000)]
+
+    names = list({f"{rng.choice(words)} {rng.choice(words)}" for _ in range(n)})
+    keys = [normalize_company(name) for name in names]
+    exact = {key: i for i, key in enumerate(keys)}
+    blocks, tails = {}, {}
+    for i, key in enumerate(keys):
+        blocks.setdefault(block_key(key), []).append(i)
+        tails.setdefault(tail_key(key), []).append(i)
+
+    def variant(name):
+        choice = rng.random()
+        if choice < 0.3:
+            return name + rng.choice([' Inc.', ', LLC', ' Corp', ' Ltd'])
+        if choice < 0.5:
+            return name.replace(' ', '')
+        i = rng.randrange(len(name) - 1)
+        if choice < 0.75:
+            return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        return name[:i] + rng.choice(letters) + name[i + 1:]
+
+    queries = [(i, normalize_company(variant(names[i]))) for i in (rng.randrange(len(names)) for _ in range(probes))]
+
+    def best(key, indexes):
+        scored = [(_similarity(key, keys[i]), i) for i in indexes]
+        ratio, i = max(scored, default=(0, None))
+        return i if ratio >= FUZZY_THRESHOLD else None
+
+    # Baseline: fuzzy-compare every registered name (timed on a sample - it is slow)
+    sample = queries[:20]
+    start = time.perf_counter()
+    scan_found = sum(1 for target, key in sample if exact.get(key, best(key, range(len(keys)))) == target)
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    block_found = 0
+    for target, key in queries:
+        found = exact.get(key)
+        if found is None:
+            found = best(key, set(blocks.get(block_key(key), ())) | set(tails.get(tail_key(key), ())))
+        block_found += found == target
+    block_time = time.perf_counter() - start
+
+    average_block = sum(len(v) for v in blocks.values()) / len(blocks) + sum(len(v) for v in tails.values()) / len(tails)
+    print(f"{probes} lookups of name variants against {len(names):,} registered companies")
+    print(f"  Full fuzzy scan: {scan_time / len(sample) * 1000:8.2f} ms/lookup ({scan_found}/{len(sample)} resolved)")
+    print(f"  Blocking index:  {block_time / probes * 1000:8.2f} ms/lookup ({block_found}/{probes} resolved, "
+          f"{average_block:.1f} candidates per block)")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Company registry')
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark blocked vs full-scan resolution')
+    parser.add_argument('--resolve', help='Show which company a name resolves to (read-only)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        from src.database import get_session
+
+        session = get_session()
+        try:
+            if args.resolve:
+                company = resolve_company(session, args.resolve, create=False)
+                print(f"{args.resolve!r} -> key {normalize_company(args.resolve)!r} -> "
+                      f"{f'{company.name} (#{company.id})' if company else 'no match'}")
+                session.rollback()
+            else:
+                linked, companies = backfill_companies(session)
+                print(f"✓ Linked {linked} records, {companies} companies in the registry")
+        finally:
+            session.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Database migration: Add numeric amount_usd columns.
+
+Adds an indexed amount_usd REAL column to:
+- ai_extractions (parsed from deal_amount)
+- master_list (parsed from investment_amount)
+
+Existing rows are backfilled by parsing the free-text amounts with
+src/utils/amounts.parse_amount_usd. Re-running the migration only fills
+rows that have an amount string but no amount_usd yet; pass --reparse to
+recompute every row (e.g. after changing the parser).
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.amounts import parse_amount_usd
+
+# table -> free-text amount column
+AMOUNT_COLUMNS = {
+    'ai_extractions': 'deal_amount',
+    'master_list': 'investment_amount',
+}
+
+
+def migrate_database(db_path='databases/tracker.db', reparse=False):
+    """Add amount_usd columns/indexes and backfill them."""
+
+    # Resolve path
+    if not Path(db_path).is_absolute():
+        script_dir = Path(__file__).parent
+        db_path = script_dir.parent.parent / db_path
+
+    print(f"Migrating database: {db_path}")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    for table, source_column in AMOUNT_COLUMNS.items():
+        # Check which columns already exist
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        if 'amount_usd' not in existing_columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN amount_usd REAL")
+            print(f"  ✓ Added {table}.amount_usd column")
+        else:
+            print(f"  ⊘ {table}.amount_usd column already exists")
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_amount_usd ON {table} (amount_usd)")
+
+        # Backfill
+        where = f"{source_column} IS NOT NULL"
+        if not reparse:
+            where += " AND amount_usd IS NULL"
+        cursor.execute(f"SELECT id, {source_column} FROM {table} WHERE {where}")
+        rows = cursor.fetchall()
+
+        updates = [(parse_amount_usd(amount), row_id) for row_id, amount in rows]
+        cursor.executemany(f"UPDATE {table} SET amount_usd = ? WHERE id = ?", updates)
+
+        parsed = sum(1 for amount, _ in updates if amount is not None)
+        print(f"  ✓ Backfilled {table}: {parsed} of {len(updates)} amounts parsed "
+              f"({len(updates) - parsed} undisclosed/unparseable)")
+
+    conn.commit()
+    conn.close()
+
+    print("\n✅ Migration complete!")
+
+
+if __name__ == '__main__':
+    migrate_database(reparse='--reparse' in sys.argv)
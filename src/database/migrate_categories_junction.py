@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Database migration: Normalize sectors/capital_sources into junction tables.
+
+Creates:
+- categories (kind + name, unique)
+- extraction_categories (ai_extractions <-> categories)
+- master_categories (master_list <-> categories)
+
+and backfills them from the comma-joined sectors and capital_sources text
+columns of ai_extractions and master_list. The text columns are kept.
+Safe to re-run: existing links are left alone.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine
+
+from src.database.models import Category, extraction_categories, master_categories
+from src.database.categories import SECTOR, CAPITAL_SOURCE, split_categories
+
+# table -> (junction table, owner column)
+SOURCES = {
+    'ai_extractions': ('extraction_categories', 'extraction_id'),
+    'master_list': ('master_categories', 'master_id'),
+}
+
+
+def migrate_database(db_path='databases/tracker.db'):
+    """Create the category tables and backfill them from the text columns."""
+
+    # Resolve path
+    if not Path(db_path).is_absolute():
+        script_dir = Path(__file__).parent
+        db_path = script_dir.parent.parent / db_path
+
+    print(f"Migrating database: {db_path}")
+
+    # Create the new tables (and their indexes) from the model definitions
+    engine = create_engine(f'sqlite:///{db_path}')
+    tables = [Category.__table__, extraction_categories, master_categories]
+    tables[0].metadata.create_all(engine, tables=tables)
+    engine.dispose()
+    print("  ✓ Category tables ready")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    category_ids = {
+        (kind, name): category_id
+        for category_id, kind, name in cursor.execute("SELECT id, kind, name FROM categories")
+    }
+
+    def category_id(kind, name):
+        if (kind, name) not in category_ids:
+            cursor.execute("INSERT INTO categories (kind, name) VALUES (?, ?)", (kind, name))
+            category_ids[(kind, name)] = cursor.lastrowid
+        return category_ids[(kind, name)]
+
+    for table, (junction, owner_column) in SOURCES.items():
+        rows = cursor.execute(
+            f"SELECT id, sectors, capital_sources FROM {table} "
+            f"WHERE sectors IS NOT NULL OR capital_sources IS NOT NULL"
+        ).fetchall()
+
+        links = []
+        for row_id, sectors, capital_sources in rows:
+            for kind, names in ((SECTOR, sectors), (CAPITAL_SOURCE, capital_sources)):
+                for name in split_categories(names):
+                    links.append((row_id, category_id(kind, name)))
+
+        before = conn.total_changes
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO {junction} ({owner_column}, category_id) VALUES (?, ?)", links
+        )
+        added = conn.total_changes - before
+        print(f"  ✓ Backfilled {junction}: {added} new links from {len(rows)} {table} rows")
+
+    conn.commit()
+    conn.close()
+
+    print(f"\n✅ Migration complete! {len(category_ids)} categories")
+
+
+if __name__ == '__main__':
+    migrate_database()
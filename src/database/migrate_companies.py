@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Database migration: Add the company registry.
+
+Creates:
+- companies (one row per resolved company)
+- company_aliases (normalized spellings with prefix and suffix blocking keys)
+
+Adds an indexed company_id column to ai_extractions and master_list, then
+resolves every existing company name into the registry (see
+src/database/companies.py). Safe to re-run: only unlinked rows are resolved,
+and re-running on an older registry adds company_aliases.tail_key and drops
+companies registered under placeholder names like "Unknown".
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Company, CompanyAlias
+from src.database.companies import backfill_companies
+
+
+def migrate_database(db_path='databases/tracker.db'):
+    """Create the registry tables, add company_id columns and link existing rows."""
+
+    # Resolve path
+    if not Path(db_path).is_absolute():
+        script_dir = Path(__file__).parent
+        db_path = script_dir.parent.parent / db_path
+
+    print(f"Migrating database: {db_path}")
+
+    # Create the registry tables (and their indexes) from the model definitions
+    engine = create_engine(f'sqlite:///{db_path}')
+    Company.metadata.create_all(engine, tables=[Company.__table__, CompanyAlias.__table__])
+    print("  ✓ Company registry tables ready")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    for table in ('ai_extractions', 'master_list'):
+        # Check which columns already exist
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        if 'company_id' not in existing_columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN company_id INTEGER REFERENCES companies(id)")
+            print(f"  ✓ Added {table}.company_id column")
+        else:
+            print(f"  ⊘ {table}.company_id column already exists")
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_company_id ON {table} (company_id)")
+
+    cursor.execute("PRAGMA table_info(company_aliases)")
+    if 'tail_key' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE company_aliases ADD COLUMN tail_key VARCHAR")
+        print("  ✓ Added company_aliases.tail_key column")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_company_aliases_tail_key ON company_aliases (tail_key)")
+
+    conn.commit()
+    conn.close()
+
+    # Resolve existing company names
+    session = sessionmaker(bind=engine)()
+    try:
+        linked, companies = backfill_companies(session)
+    finally:
+        session.close()
+        engine.dispose()
+
+    print(f"  ✓ Linked {linked} records to {companies} companies")
+    print("\n✅ Migration complete!")
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database migration: Notification ledger for incremental digests.
+
+Creates the notifications table (items already emailed, per channel) and
+indexes ai_extractions.extracted_at, which the digest's watermark query
+filters on. Existing databases get the table from create_all as well; the
+index on the existing column needs this migration.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine
+
+from src.database.models import Notification
+
+
+def migrate_database(db_path='databases/tracker.db'):
+    """Create the notifications table and the extracted_at index."""
+
+    # Resolve path
+    if not Path(db_path).is_absolute():
+        script_dir = Path(__file__).parent
+        db_path = script_dir.parent.parent / db_path
+
+    print(f"Migrating database: {db_path}")
+
+    engine = create_engine(f'sqlite:///{db_path}')
+    Notification.__table__.create(engine, checkfirst=True)
+    engine.dispose()
+    print("  ✓ notifications table ready")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_ai_extractions_extracted_at ON ai_extractions (extracted_at)")
+    conn.commit()
+    conn.close()
+    print("  ✓ Indexed ai_extractions.extracted_at")
+
+    print("\n✅ Migration complete!")
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -1,7 +1,7 @@
 """Database models for the Defense Capital Tracker."""
 
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, text
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, LargeBinary, Table, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import os
@@ -17,6 +17,26 @@ Base = declarative_base()
 # Turso/LibSQL connection cache
 _turso_engine = None
 
+# Databases whose full-text search table and triggers have been checked this process
+_search_ready = set()
+
+# Category junction tables: sectors and capital sources of AI extractions and
+# curated deals. The (category_id, owner) indexes serve "all deals in sector X"
+# lookups and per-category counts.
+extraction_categories = Table(
+    'extraction_categories', Base.metadata,
+    Column('extraction_id', Integer, ForeignKey('ai_extractions.id'), primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    Index('ix_extraction_categories_category', 'category_id', 'extraction_id')
+)
+
+master_categories = Table(
+    'master_categories', Base.metadata,
+    Column('master_id', Integer, ForeignKey('master_list.id'), primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    Index('ix_master_categories_category', 'category_id', 'master_id')
+)
+
 
 class RawItem(Base):
     """Raw RSS feed items."""
@@ -39,6 +59,7 @@ class RawItem(Base):
     article = relationship("ArticleContent", back_populates="raw_item", uselist=False)
     extraction = relationship("AIExtraction", back_populates="raw_item", uselist=False)
     master = relationship("MasterItem", back_populates="raw_item", uselist=False)
+    fingerprint = relationship("StoryFingerprint", back_populates="raw_item", uselist=False)
 
     def __repr__(self):
         return f"<RawItem(id={self.id}, title='{self.title[:50]}...')>"
@@ -72,9 +93,11 @@ class AIExtraction(Base):
 
     # Core deal information
     company = Column(String)  # Company name
+    company_id = Column(Integer, ForeignKey('companies.id'), index=True)  # Resolved registry entry
     company_description = Column(Text)  # What the company does (1 sentence)
     deal_type = Column(String)  # VC, M&A, IPO, etc. (legacy)
     deal_amount = Column(String)  # e.g., "$300M", "$4.7B"
+    amount_usd = Column(Float, index=True)  # deal_amount parsed to USD (None if undisclosed)
     investors = Column(Text)  # Key investors/acquirers
 
     # New enhanced category fields
@@ -95,12 +118,13 @@ class AIExtraction(Base):
 
     # Metadata
     confidence_score = Column(Float)
-    extracted_at = Column(DateTime, default=datetime.utcnow)
+    extracted_at = Column(DateTime, default=datetime.utcnow, index=True)  # Refreshed on re-summarize (digest watermark)
     model_used = Column(String)  # e.g., "claude-sonnet-4-20250514"
     summary_complete = Column(Boolean, default=False)  # Was AI extraction successful?
 
     # Relationships
     raw_item = relationship("RawItem", back_populates="extraction")
+    categories = relationship("Category", secondary=extraction_categories)  # Normalized sectors/capital_sources
 
     def __repr__(self):
         return f"<AIExtraction(item_id={self.item_id}, company='{self.company}')>"
@@ -115,8 +139,10 @@ class MasterItem(Base):
 
     # Human-verified fields (can override AI extractions)
     company = Column(String)
+    company_id = Column(Integer, ForeignKey('companies.id'), index=True)  # Resolved registry entry
     investors = Column(String)
     investment_amount = Column(String)
+    amount_usd = Column(Float, index=True)  # investment_amount parsed to USD
 
     # Legacy single-select fields (kept for backward compatibility)
     deal_type = Column(String)
@@ -143,6 +169,7 @@ class MasterItem(Base):
 
     # Relationships
     raw_item = relationship("RawItem", back_populates="master")
+    categories = relationship("Category", secondary=master_categories)  # Normalized sectors/capital_sources
 
     def __repr__(self):
         return f"<MasterItem(id={self.id}, company='{self.company}')>"
@@ -161,6 +188,175 @@ class RejectedItem(Base):
         return f"<RejectedItem(item_id={self.item_id})>"
 
 
+class StoryFingerprint(Base):
+    """MinHash signature and near-duplicate story cluster for a scraped item."""
+    __tablename__ = 'story_fingerprints'
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey('raw_items.id'), unique=True, nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # MinHash values (uint32 array)
+    cluster_id = Column(Integer, index=True)  # raw_items.id of the cluster representative
+    source = Column(String)  # 'text' (clean_text) or 'title' (title + summary)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    raw_item = relationship("RawItem", back_populates="fingerprint")
+    bands = relationship("StoryBand", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<StoryFingerprint(item_id={self.item_id}, cluster_id={self.cluster_id})>"
+
+
+class StoryBand(Base):
+    """LSH band index: items sharing a (band, value) pair are near-duplicate candidates."""
+    __tablename__ = 'story_bands'
+    __table_args__ = (
+        Index('ix_story_bands_band_value', 'band', 'value'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    fingerprint_id = Column(Integer, ForeignKey('story_fingerprints.id'), nullable=False, index=True)
+    band = Column(Integer, nullable=False)  # Band number
+    value = Column(Integer, nullable=False)  # 64-bit hash of the band's MinHash rows (stored signed)
+
+    def __repr__(self):
+        return f"<StoryBand(fingerprint_id={self.fingerprint_id}, band={self.band})>"
+
+
+class Category(Base):
+    """A sector or capital source value, linked to extractions and deals via junction tables."""
+    __tablename__ = 'categories'
+    __table_args__ = (
+        UniqueConstraint('kind', 'name', name='uq_categories_kind_name'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # 'sector' or 'capital_source'
+    name = Column(String, nullable=False)  # e.g., "AI/ML", "Venture Capital"
+
+    def __repr__(self):
+        return f"<Category(kind='{self.kind}', name='{self.name}')>"
+
+
+class Company(Base):
+    """Company registry: one row per real-world company, however its name is spelled."""
+    __tablename__ = 'companies'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)  # Display name (first spelling seen)
+    normalized_key = Column(String, unique=True, nullable=False, index=True)  # e.g., "shieldai"
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    aliases = relationship("CompanyAlias", back_populates="company", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<Company(id={self.id}, name='{self.name}')>"
+
+
+class CompanyAlias(Base):
+    """A normalized spelling of a company name, with blocking keys for fuzzy lookups."""
+    __tablename__ = 'company_aliases'
+
+    id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey('companies.id'), nullable=False, index=True)
+    alias = Column(String, nullable=False)  # Spelling as first seen, e.g., "Shield AI Inc."
+    normalized_key = Column(String, unique=True, nullable=False, index=True)
+    block_key = Column(String, nullable=False, index=True)  # Key prefix: candidates for fuzzy matching
+    tail_key = Column(String, index=True)  # Key suffix: catches typos inside the prefix
+
+    # Relationships
+    company = relationship("Company", back_populates="aliases")
+
+    def __repr__(self):
+        return f"<CompanyAlias(alias='{self.alias}', company_id={self.company_id})>"
+
+
+class DealRollup(Base):
+    """Pre-aggregated master list deal metrics for one period and dimension value."""
+    __tablename__ = 'deal_rollups'
+    __table_args__ = (
+        UniqueConstraint('period', 'period_start', 'dimension', 'value', name='uq_deal_rollups_bucket'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String, nullable=False)  # 'month' or 'quarter'
+    period_start = Column(String, nullable=False)  # First day of the period, e.g., "2025-04-01"
+    dimension = Column(String, nullable=False)  # 'all', 'transaction_type', 'sector', 'capital_source'
+    value = Column(String, nullable=False)  # Dimension value ('' for 'all')
+    deal_count = Column(Integer, nullable=False, default=0)
+    disclosed_count = Column(Integer, nullable=False, default=0)  # Deals with a parsed amount
+    total_usd = Column(Float)
+    median_usd = Column(Float)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DealRollup({self.period} {self.period_start} {self.dimension}={self.value!r}: {self.deal_count})>"
+
+
+class DealRollupSource(Base):
+    """What each master item last contributed to the rollups (for incremental updates)."""
+    __tablename__ = 'deal_rollup_sources'
+
+    master_id = Column(Integer, primary_key=True)  # master_list.id (no FK: rows outlive deleted deals)
+    month_start = Column(String, nullable=False)  # Month the deal was counted in
+    fingerprint = Column(String, nullable=False)  # Hash of date, amount and dimension values
+
+    def __repr__(self):
+        return f"<DealRollupSource(master_id={self.master_id}, month_start='{self.month_start}')>"
+
+
+class Job(Base):
+    """Pipeline work item: one stage (scrape, summarize) for one raw item."""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        UniqueConstraint('stage', 'item_id', name='uq_jobs_stage_item'),
+        # Claim order: ready jobs of a stage, highest priority first
+        Index('ix_jobs_claim', 'stage', 'status', 'priority', 'available_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    stage = Column(String, nullable=False)  # 'scrape' or 'summarize'
+    item_id = Column(Integer, ForeignKey('raw_items.id'), nullable=False)
+    status = Column(String, nullable=False, default='pending')  # pending, running, done, failed
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Not claimable before (retry backoff)
+    lease_owner = Column(String)  # Worker holding the job ("host:pid")
+    lease_expires_at = Column(DateTime)  # Running jobs past this are reclaimed
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, {self.stage} item={self.item_id}, status='{self.status}')>"
+
+
+class Notification(Base):
+    """Ledger of items sent on a notification channel: one row per item per channel."""
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        UniqueConstraint('channel', 'item_id', name='uq_notifications_channel_item'),
+        # Channel watermark: newest summary already sent (max() is one index seek)
+        Index('ix_notifications_channel_summarized', 'channel', 'summarized_at'),
+        # Reminders: items sent longest ago
+        Index('ix_notifications_channel_notified', 'channel', 'notified_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    channel = Column(String, nullable=False)  # e.g., "email:analyst@example.com"
+    item_id = Column(Integer, ForeignKey('raw_items.id'), nullable=False)
+    summarized_at = Column(DateTime)  # extracted_at of the summary that was sent
+    first_notified_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    notified_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Last sent (incl. reminders)
+    notify_count = Column(Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f"<Notification({self.channel} item={self.item_id}, count={self.notify_count})>"
+
+
 # Database setup
 def get_engine(db_path='databases/tracker.db'):
     """Create and return database engine.
@@ -208,6 +404,7 @@ def get_engine(db_path='databases/tracker.db'):
                 with _turso_engine.connect() as conn:
                     conn.execute(text("SELECT 1"))
                 Base.metadata.create_all(_turso_engine)
+                _ensure_search(_turso_engine, 'turso')
                 return _turso_engine
             except Exception as e:
                 last_error = e
@@ -221,9 +418,20 @@ def get_engine(db_path='databases/tracker.db'):
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         engine = create_engine(f'sqlite:///{db_path}', echo=False)
         Base.metadata.create_all(engine)
+        _ensure_search(engine, os.path.abspath(db_path))
         return engine
 
 
+def _ensure_search(engine, key):
+    """Create the FTS5 search table and sync triggers once per database per process."""
+    if key in _search_ready:
+        return
+
+    from .search import ensure_search_index
+    ensure_search_index(engine)
+    _search_ready.add(key)
+
+
 def get_session(db_path='databases/tracker.db'):
     """Create and return database session."""
     engine = get_engine(db_path)
@@ -0,0 +1,248 @@
+"""Full-text search over items with SQLite FTS5.
+
+The item_search virtual table holds one row per raw item (rowid = raw_items.id)
+with the item's title, RSS summary, scraped article text and the AI-extracted
+company and investors. Triggers on raw_items, article_content and
+ai_extractions keep it in sync, so every ingest path is covered without code
+changes. Existing databases are indexed with:
+
+    python src/database/search.py --rebuild
+"""
+
+import html
+import re
+import time
+
+from sqlalchemy import text
+
+FTS_TABLE = 'item_search'
+
+# Column order matters: bm25() weights and highlight() column numbers follow it
+FTS_COLUMNS = ['title', 'rss_summary', 'clean_text', 'company', 'investors']
+
+# Relative bm25 weights - a hit in the title or company name outranks one deep in the article
+BM25_WEIGHTS = [10.0, 3.0, 1.0, 8.0, 5.0]
+
+MAX_PER_PAGE = 100
+
+# Control characters mark highlights so the text can be HTML-escaped afterwards
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {', '.join(FTS_COLUMNS)},
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )""",
+
+    # raw_items: one search row per item
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_raw_insert AFTER INSERT ON raw_items BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, rss_summary) VALUES (new.id, new.title, new.rss_summary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_raw_update AFTER UPDATE OF title, rss_summary ON raw_items BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, rss_summary = new.rss_summary WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_raw_delete AFTER DELETE ON raw_items BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+
+    # article_content: scraped text
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_article_insert AFTER INSERT ON article_content BEGIN
+        UPDATE {FTS_TABLE} SET clean_text = new.clean_text WHERE rowid = new.item_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_article_update AFTER UPDATE OF clean_text ON article_content BEGIN
+        UPDATE {FTS_TABLE} SET clean_text = new.clean_text WHERE rowid = new.item_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_article_delete AFTER DELETE ON article_content BEGIN
+        UPDATE {FTS_TABLE} SET clean_text = NULL WHERE rowid = old.item_id;
+    END""",
+
+    # ai_extractions: company and investors
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai_insert AFTER INSERT ON ai_extractions BEGIN
+        UPDATE {FTS_TABLE} SET company = new.company, investors = new.investors WHERE rowid = new.item_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai_update AFTER UPDATE OF company, investors ON ai_extractions BEGIN
+        UPDATE {FTS_TABLE} SET company = new.company, investors = new.investors WHERE rowid = new.item_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai_delete AFTER DELETE ON ai_extractions BEGIN
+        UPDATE {FTS_TABLE} SET company = NULL, investors = NULL WHERE rowid = old.item_id;
+    END""",
+]
+
+
+def ensure_search_index(engine):
+    """
+    Create the FTS5 table and sync triggers if they don't exist
+
+    Returns:
+        True if the index is available (False if SQLite lacks FTS5)
+    """
+    try:
+        with engine.begin() as conn:
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(text(statement))
+        return True
+    except Exception as e:
+        print(f"⚠ Full-text search unavailable: {e}")
+        return False
+
+
+def rebuild_search_index(engine):
+    """
+    Re-index every item from the source tables
+
+    Returns:
+        Number of items indexed
+    """
+    ensure_search_index(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        conn.execute(text(f"""
+            INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)})
+            SELECT r.id, r.title, r.rss_summary, a.clean_text, e.company, e.investors
+            FROM raw_items r
+            LEFT JOIN article_content a ON a.item_id = r.id
+            LEFT JOIN ai_extractions e ON e.item_id = r.id
+        """))
+        # Merge index segments for faster queries
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+        return conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+
+
+def build_match_query(query):
+    """
+    Turn free text into a safe FTS5 MATCH expression
+
+    Every word must match; the last word also matches as a prefix so results
+    show up while typing ("andur" finds "Anduril"). FTS5 operators in the input
+    are treated as plain words.
+
+    Returns:
+        MATCH string, or None if the query has no searchable words
+    """
+    tokens = _TOKEN_PATTERN.findall(query or '')
+    if not tokens:
+        return None
+
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _render_highlight(value):
+    """HTML-escape highlighted text, then turn the markers into <mark> tags"""
+    if not value:
+        return value
+    escaped = html.escape(value)
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_items(session, query, page=1, per_page=20):
+    """
+    Ranked full-text search over items
+
+    Args:
+        session: Database session
+        query: Free-text search string
+        page: 1-based page number
+        per_page: Results per page (capped at MAX_PER_PAGE)
+
+    Returns:
+        Dict with query, page, per_page, total, took_ms and results. Each
+        result has the item id, highlighted title, best matching snippet,
+        url, status, published date and triage state (master/rejected/pending).
+    """
+    start = time.perf_counter()
+    page = max(1, int(page))
+    per_page = min(max(1, int(per_page)), MAX_PER_PAGE)
+
+    response = {'query': query, 'page': page, 'per_page': per_page, 'total': 0, 'results': []}
+
+    match = build_match_query(query)
+    if match is None:
+        response['took_ms'] = 0.0
+        return response
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    params = {'match': match, 'limit': per_page, 'offset': (page - 1) * per_page}
+
+    response['total'] = session.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"), params
+    ).scalar()
+
+    rows = session.execute(text(f"""
+        SELECT r.id, r.url, r.status, r.published_date,
+               highlight({FTS_TABLE}, 0, '{_MARK_START}', '{_MARK_END}') AS title,
+               snippet({FTS_TABLE}, -1, '{_MARK_START}', '{_MARK_END}', '…', 24) AS snippet,
+               m.id AS master_id, rj.id AS rejected_id,
+               bm25({FTS_TABLE}, {weights}) AS rank
+        FROM {FTS_TABLE}
+        JOIN raw_items r ON r.id = {FTS_TABLE}.rowid
+        LEFT JOIN master_list m ON m.item_id = r.id
+        LEFT JOIN rejected_items rj ON rj.item_id = r.id
+        WHERE {FTS_TABLE} MATCH :match
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """), params).mappings()
+
+    for row in rows:
+        if row['master_id']:
+            triage_state = 'master'
+        elif row['rejected_id']:
+            triage_state = 'rejected'
+        else:
+            triage_state = 'pending'
+
+        published = row['published_date']
+        response['results'].append({
+            'id': row['id'],
+            'title': _render_highlight(row['title']),
+            'snippet': _render_highlight(row['snippet']),
+            'url': row['url'],
+            'status': row['status'],
+            'triage_state': triage_state,
+            'published_date': str(published)[:10] if published else None,
+            'score': round(-row['rank'], 3)
+        })
+
+    response['took_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return response
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+    from pathlib import Path
+
+    project_root = Path(__file__).parent.parent.parent
+    sys.path.append(str(project_root))
+    os.chdir(project_root)
+
+    from src.database import get_engine, get_session
+
+    parser = argparse.ArgumentParser(description='Full-text search index')
+    parser.add_argument('--rebuild', action='store_true', help='Re-index all existing items')
+    parser.add_argument('--query', '-q', help='Run a search and print the top results')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        start = time.perf_counter()
+        count = rebuild_search_index(get_engine())
+        print(f"✓ Indexed {count} items in {time.perf_counter() - start:.2f}s")
+
+    if args.query:
+        session = get_session()
+        try:
+            result = search_items(session, args.query)
+        finally:
+            session.close()
+        print(f"{result['total']} matches for {args.query!r} ({result['took_ms']} ms)")
+        for hit in result['results']:
+            print(f"  [{hit['id']}] {hit['triage_state']:<8} {hit['title']}")
+
+    if not args.rebuild and not args.query:
+        parser.print_help()
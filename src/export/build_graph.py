@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Content-hash based incremental build graph for the publish pipeline.
+
+Each build step declares the inputs it depends on as a dict of
+{key: fingerprint}. Fingerprints from the last successful run are stored in a
+small JSON state file; a step only runs when one of its fingerprints changed,
+one of its outputs is missing, or (for remote data sources that cannot be
+hashed up front) its last run is older than max_age.
+
+Steps that produce several outputs receive the list of changed input keys so
+they can rebuild only the affected outputs.
+
+Steps declare their dependencies by name and form a DAG; independent steps run
+concurrently in a thread pool. Each step's printed output is buffered and
+emitted as one block when the step finishes so parallel logs stay readable.
+"""
+
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.utils.metrics import span
+
+
+def fingerprint(obj) -> str:
+    """Stable SHA-256 fingerprint of a JSON-serializable object"""
+    encoded = json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_digest(path) -> Optional[str]:
+    """SHA-256 digest of a file's contents (None if the file does not exist)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildState:
+    """Fingerprints and timestamps from previous successful step runs"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.steps = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.steps = json.load(f).get('steps', {})
+            except (ValueError, OSError):
+                # Corrupt state just means a full rebuild
+                self.steps = {}
+
+    def get(self, step_name):
+        return self.steps.get(step_name, {})
+
+    def record(self, step_name, inputs):
+        """Record the fingerprints a step was built from"""
+        self.steps[step_name] = {
+            'inputs': dict(inputs),
+            'finished_at': time.time()
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'steps': self.steps}, f, indent=2, sort_keys=True)
+        tmp_path.replace(self.path)
+
+
+@dataclass
+class BuildStep:
+    """
+    A single node in the publish build graph
+
+    Attributes:
+        name: Short identifier (used as the state key)
+        description: Human-readable description for the report
+        run: Callable(changed_keys) -> bool. changed_keys is None for a full build
+        inputs: Callable returning {key: fingerprint} for everything the step reads
+        outputs: Paths the step writes (a missing output forces a rebuild)
+        required: Abort the build if this step fails
+        max_age: Seconds before the step is considered stale regardless of inputs
+        enabled: Set False to skip the step entirely
+        skip_reason: Report text when the step is disabled
+        deps: Names of steps that must finish before this one starts
+    """
+    name: str
+    description: str
+    run: Callable[[Optional[List[str]]], bool]
+    inputs: Callable[[], Dict[str, str]] = lambda: {}
+    outputs: List[Path] = field(default_factory=list)
+    required: bool = False
+    max_age: Optional[float] = None
+    enabled: bool = True
+    skip_reason: str = ''
+    deps: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StepResult:
+    """Outcome of one step in a build"""
+    name: str
+    status: str  # 'rebuilt', 'skipped', 'failed', 'disabled'
+    detail: str = ''
+    seconds: float = 0.0
+
+
+def plan_step(step, state, force=False):
+    """
+    Decide whether a step needs to run
+
+    Returns:
+        Tuple of (run: bool, changed_keys: Optional[list], reason: str, inputs: dict).
+        changed_keys is None when the whole step must rebuild.
+    """
+    inputs = step.inputs()
+    previous = state.get(step.name)
+    previous_inputs = previous.get('inputs', {})
+
+    if force:
+        return True, None, 'forced', inputs
+
+    if not previous:
+        return True, None, 'no previous build', inputs
+
+    missing = [str(path) for path in step.outputs if not Path(path).exists()]
+    if missing:
+        return True, None, f'{len(missing)} output(s) missing', inputs
+
+    if step.max_age is not None:
+        age = time.time() - previous.get('finished_at', 0)
+        if age > step.max_age:
+            return True, None, f'stale ({age / 3600:.1f}h old)', inputs
+
+    changed = [key for key, value in inputs.items() if previous_inputs.get(key) != value]
+    if changed:
+        return True, changed, f'{len(changed)} input(s) changed', inputs
+
+    return False, [], 'up to date', inputs
+
+
+class _ThreadOutput(io.TextIOBase):
+    """stdout proxy that buffers writes from threads running a build step"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def begin(self):
+        self.local.buffer = io.StringIO()
+
+    def end(self):
+        buffer = getattr(self.local, 'buffer', None)
+        self.local.buffer = None
+        return buffer.getvalue() if buffer else ''
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _plan_and_run(step, state, force, state_lock):
+    """Plan and run one step; returns a StepResult"""
+    start = time.perf_counter()
+    try:
+        should_run, changed_keys, reason, inputs = plan_step(step, state, force=force)
+    except Exception as e:
+        should_run, changed_keys, reason, inputs = True, None, f'could not fingerprint inputs: {e}', {}
+
+    if not should_run:
+        print(f"✓ {step.description}: skipped ({reason})")
+        return StepResult(step.name, 'skipped', reason, time.perf_counter() - start)
+
+    print(f"➤ {step.description} ({reason})...")
+    with span(f'publish.{step.name}', partial=changed_keys is not None) as step_span:
+        try:
+            ok = step.run(changed_keys)
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            step_span.fail(e)
+            ok = False
+        if ok is False:
+            step_span.outcome = 'error'
+
+    elapsed = time.perf_counter() - start
+
+    if ok is False:
+        return StepResult(step.name, 'failed', reason, elapsed)
+
+    # Unchanged keys of a partial build already match, so record everything
+    with state_lock:
+        state.record(step.name, inputs)
+        state.save()
+
+    print(f"  ✓ Done in {elapsed:.2f}s")
+    return StepResult(step.name, 'rebuilt', reason, elapsed)
+
+
+def _execute_step(step, state, force, state_lock, output):
+    """Run one step on a worker thread; returns (StepResult, captured output)"""
+    output.begin()
+    try:
+        result = _plan_and_run(step, state, force, state_lock)
+    finally:
+        captured = output.end()
+    return result, captured
+
+
+def run_graph(steps, state, force=False, max_workers=4, log=print):
+    """
+    Run build steps as a DAG, skipping those whose inputs are unchanged
+
+    A step starts as soon as all of its dependencies have finished (whether
+    rebuilt, skipped, disabled or failed). If a required step fails, no new
+    steps are started and the build reports failure.
+
+    Args:
+        steps: List of BuildStep
+        state: BuildState (saved after each successful step)
+        force: Rebuild every step regardless of fingerprints
+        max_workers: Maximum number of steps running at once
+        log: Output function
+
+    Returns:
+        Tuple of (results: list of StepResult in step order, ok: bool)
+    """
+    names = {step.name for step in steps}
+    pending = {step.name: step for step in steps}
+    results = {}
+    running = {}
+    state_lock = threading.Lock()
+    ok = True
+
+    output = _ThreadOutput(sys.stdout)
+    original_stdout = sys.stdout
+    sys.stdout = output
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            while True:
+                progressed = False
+                if ok:
+                    for step in list(pending.values()):
+                        if not all(dep in results for dep in step.deps if dep in names):
+                            continue
+                        del pending[step.name]
+                        progressed = True
+
+                        if not step.enabled:
+                            log(f"⊘ {step.description}: {step.skip_reason or 'disabled'}")
+                            results[step.name] = StepResult(step.name, 'disabled', step.skip_reason)
+                            continue
+
+                        future = pool.submit(_execute_step, step, state, force, state_lock, output)
+                        running[future] = step
+
+                # Disabled steps may have unblocked others - rescan before waiting
+                if progressed:
+                    continue
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    result, captured = future.result()
+                    if captured:
+                        log(captured.rstrip('\n'))
+                    results[step.name] = result
+
+                    if result.status == 'failed' and step.required:
+                        log(f"\n✗ Required step '{step.name}' failed. Aborting.")
+                        ok = False
+    finally:
+        sys.stdout = original_stdout
+
+    for name in pending:
+        results[name] = StepResult(name, 'skipped', 'not started (build aborted)')
+
+    return [results[step.name] for step in steps], ok
+
+
+def print_report(results, wall_time=None, log=print):
+    """Print a rebuilt/skipped summary table with per-step wall time"""
+    log(f"{'Step':<24}{'Status':<10}{'Time':>8}  Detail")
+    log("-" * 72)
+    for result in results:
+        log(f"{result.name:<24}{result.status:<10}{result.seconds:>7.2f}s  {result.detail}")
+
+    rebuilt = sum(1 for r in results if r.status == 'rebuilt')
+    skipped = sum(1 for r in results if r.status in ('skipped', 'disabled'))
+    failed = sum(1 for r in results if r.status == 'failed')
+    log("-" * 72)
+    log(f"{rebuilt} rebuilt, {skipped} skipped, {failed} failed")
+
+    if wall_time is not None:
+        step_total = sum(r.seconds for r in results)
+        log(f"Wall time: {wall_time:.2f}s (sum of step times: {step_total:.2f}s)")
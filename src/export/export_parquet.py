@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Parquet export of the pipeline corpus for analytics.
+
+Writes raw_items, ai_extractions, master_list and rejected_items as
+Hive-partitioned Parquet datasets, one partition per month of the raw
+item's published date (date found if the feed gave none):
+
+    exports/parquet/ai_extractions/month=2025-06/part-0.parquet
+
+Columns keep their database types - integer ids, float64 amounts and
+scores, booleans, timestamps - and the comma-joined category columns
+(sectors, capital_sources, relevance_flags) become list<string>. Read a
+table with pandas.read_parquet('exports/parquet/ai_extractions') or
+pyarrow.dataset; the month column comes from the partition path.
+
+Exports are incremental: exports/parquet/_manifest.json stores a
+fingerprint of every partition's rows, so a run only rewrites months
+whose rows changed (and drops months that no longer have any). Pass
+--full to rewrite the exported tables from scratch (only the --table ones
+if given; other tables are left alone).
+
+Requires pyarrow.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, func
+
+from src.database import RawItem, AIExtraction, MasterItem, RejectedItem, get_session
+from src.database.categories import split_categories
+
+# pyarrow is optional - only this export needs it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_IMPORT_ERROR = None
+except ImportError as e:
+    # Also raised when pyarrow is installed but broken (e.g. built for another NumPy)
+    pa = pq = None
+    PYARROW_IMPORT_ERROR = e
+
+DEFAULT_OUTPUT_DIR = 'exports/parquet'
+MANIFEST_FILE = '_manifest.json'
+
+# table -> model (partitioned through its raw item)
+TABLES = {
+    'raw_items': RawItem,
+    'ai_extractions': AIExtraction,
+    'master_list': MasterItem,
+    'rejected_items': RejectedItem,
+}
+
+# Comma-joined text columns exported as list<string>
+LIST_COLUMNS = {'sectors', 'capital_sources', 'relevance_flags'}
+
+UNKNOWN_MONTH = 'unknown'
+
+# Rows fetched from the database cursor at a time
+BATCH_SIZE = 1000
+
+
+def arrow_schema(model):
+    """Arrow schema for a model's columns (list<string> for LIST_COLUMNS)"""
+    fields = []
+    for column in model.__table__.columns:
+        if column.name in LIST_COLUMNS:
+            arrow_type = pa.list_(pa.string())
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp('us')
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def month_rows(session, model):
+    """
+    Stream a table's rows grouped by partition month
+
+    Yields:
+        (month, rows) with month as YYYY-MM (or UNKNOWN_MONTH) and rows as
+        tuples in column order, oldest month first
+    """
+    month = func.strftime('%Y-%m', func.coalesce(RawItem.published_date, RawItem.date_found))
+    query = session.query(month.label('month'), *model.__table__.columns)
+    if model is not RawItem:
+        query = query.join(RawItem, model.item_id == RawItem.id)
+    query = query.order_by(month, model.id).yield_per(BATCH_SIZE)
+
+    for month_value, rows in groupby(query, key=lambda row: row[0]):
+        yield month_value or UNKNOWN_MONTH, [tuple(row[1:]) for row in rows]
+
+
+def rows_fingerprint(rows):
+    """Short hash of a partition's rows"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(repr(row).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def rows_to_table(rows, schema):
+    """Arrow table from row tuples (category text split into lists)"""
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name in LIST_COLUMNS:
+            values = [split_categories(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_partition(table_dir, month, table):
+    """Replace one month's partition file"""
+    partition_dir = table_dir / f"month={month}"
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    path = partition_dir / 'part-0.parquet'
+    tmp_path = partition_dir / 'part-0.parquet.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def load_manifest(output_dir):
+    path = output_dir / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir, manifest):
+    path = output_dir / MANIFEST_FILE
+    tmp_path = output_dir / (MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def export_table(session, name, model, output_dir, manifest):
+    """
+    Write the changed month partitions of one table
+
+    Returns:
+        Dict with 'rows', 'written', 'unchanged' and 'removed' partition counts
+    """
+    schema = arrow_schema(model)
+    table_dir = output_dir / name
+    previous = manifest.get(name, {})
+    current = {}
+    stats = {'rows': 0, 'written': 0, 'unchanged': 0, 'removed': 0}
+
+    for month, rows in month_rows(session, model):
+        fingerprint = rows_fingerprint(rows)
+        current[month] = {'rows': len(rows), 'fingerprint': fingerprint}
+        stats['rows'] += len(rows)
+
+        partition_file = table_dir / f"month={month}" / 'part-0.parquet'
+        if previous.get(month, {}).get('fingerprint') == fingerprint and partition_file.exists():
+            stats['unchanged'] += 1
+            continue
+
+        write_partition(table_dir, month, rows_to_table(rows, schema))
+        stats['written'] += 1
+
+    # Months with no rows left
+    for month in set(previous) - set(current):
+        shutil.rmtree(table_dir / f"month={month}", ignore_errors=True)
+        stats['removed'] += 1
+
+    manifest[name] = current
+    return stats
+
+
+def pyarrow_unavailable():
+    """Print why pyarrow can't be used; True if it can't"""
+    if pa is not None:
+        return False
+    if isinstance(PYARROW_IMPORT_ERROR, ModuleNotFoundError) and PYARROW_IMPORT_ERROR.name == 'pyarrow':
+        print("✗ pyarrow is required for Parquet export: pip install -r requirements.txt")
+    else:
+        print(f"✗ pyarrow could not be imported: {PYARROW_IMPORT_ERROR}")
+    return True
+
+
+def export_parquet(output_dir=DEFAULT_OUTPUT_DIR, tables=None, full=False):
+    """
+    Export the corpus tables to partitioned Parquet
+
+    Args:
+        output_dir: Dataset root directory
+        tables: Table names to export (default: all of TABLES)
+        full: Rewrite every partition of the exported tables instead of only
+            changed ones
+
+    Returns:
+        True if successful
+    """
+    if pyarrow_unavailable():
+        return False
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tables = tables or list(TABLES)
+
+    manifest = load_manifest(output_dir)
+    if full:
+        # Only the tables being exported; the others keep their partitions
+        for name in tables:
+            shutil.rmtree(output_dir / name, ignore_errors=True)
+            manifest.pop(name, None)
+
+    session = get_session()
+    try:
+        for name in tables:
+            stats = export_table(session, name, TABLES[name], output_dir, manifest)
+            print(f"✓ {name}: {stats['rows']:,} rows, {stats['written']} partitions written, "
+                  f"{stats['unchanged']} unchanged, {stats['removed']} removed")
+
+        manifest['_exported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        save_manifest(output_dir, manifest)
+        return True
+
+    except Exception as e:
+        print(f"✗ Error exporting Parquet: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        session.close()
+
+
+def benchmark(output_dir=DEFAULT_OUTPUT_DIR, repeat=5):
+    """
+    Time common analytics reads: Parquet via pyarrow and pandas vs SQLite
+
+    Run an export first. Each read is timed repeat times; the best run is
+    reported.
+    """
+    if pyarrow_unavailable():
+        return
+
+    output_dir = Path(output_dir)
+    # Empty tables get no partition directory, so there may be nothing to read
+    if not any((output_dir / 'ai_extractions').glob('month=*/*.parquet')):
+        print(f"Nothing to read: no ai_extractions partitions in {output_dir} "
+              f"(run an export first, or the table is empty)")
+        return
+
+    import time
+
+    import pandas as pd
+    import pyarrow.dataset as ds
+
+    session = get_session()
+    engine = session.get_bind()
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000, result
+
+    columns = ['item_id', 'company', 'amount_usd', 'sectors']
+    latest_month = max(
+        (month for month in load_manifest(output_dir).get('ai_extractions', {}) if month != UNKNOWN_MONTH),
+        default=None
+    )
+
+    reads = [
+        ('Full table, pyarrow', lambda: ds.dataset(output_dir / 'ai_extractions', partitioning='hive').to_table()),
+        ('Full table, pandas', lambda: pd.read_parquet(output_dir / 'ai_extractions')),
+        ('Full table, SQLite', lambda: pd.read_sql_table('ai_extractions', engine)),
+        ('4 columns, pyarrow', lambda: ds.dataset(output_dir / 'ai_extractions', partitioning='hive').to_table(columns=columns)),
+        ('4 columns, pandas', lambda: pd.read_parquet(output_dir / 'ai_extractions', columns=columns)),
+        ('4 columns, SQLite', lambda: pd.read_sql_query(
+            'SELECT item_id, company, amount_usd, sectors FROM ai_extractions', engine)),
+    ]
+    if latest_month:
+        reads.append((f"Month {latest_month}, pyarrow", lambda: ds.dataset(
+            output_dir / 'ai_extractions', partitioning='hive'
+        ).to_table(filter=ds.field('month') == latest_month)))
+
+    try:
+        print(f"Read benchmark: ai_extractions (best of {repeat})")
+        for label, read in reads:
+            elapsed, result = best(read)
+            print(f"  {label:<28} {elapsed:8.2f} ms ({len(result):,} rows)")
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Export the pipeline corpus to partitioned Parquet')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='Dataset root directory')
+    parser.add_argument('--table', action='append', choices=list(TABLES), help='Only export this table (repeatable)')
+    parser.add_argument('--full', action='store_true', help='Rewrite every partition')
+    parser.add_argument('--benchmark', action='store_true', help='Time Parquet vs SQLite reads of the last export')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.output_dir)
+    else:
+        sys.exit(0 if export_parquet(args.output_dir, tables=args.table, full=args.full) else 1)
@@ -1,68 +1,153 @@
-"""Export master list to CSV for Google Sheets embedding."""
+"""Export master list to CSV for Google Sheets embedding.
+
+Also served by the web app as a streaming download: /export/master.csv
+"""
 
 import csv
+import io
 import sys
 from pathlib import Path
 from datetime import datetime
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from sqlalchemy import func
+
 from src.database import MasterItem, RawItem, get_session
+from src.database.categories import SECTOR, CAPITAL_SOURCE, in_category
+from src.utils.amounts import format_usd
+
+
+FIELDNAMES = [
+    'Date',
+    'Company',
+    'Investment Amount',
+    'Amount (USD)',
+    'Capital Type',
+    'Sector',
+    'Location',
+    'Project Type',
+    'Summary',
+    'Source URL'
+]
+
+# Rows fetched from the database cursor at a time
+BATCH_SIZE = 500
+
+
+def master_rows_query(session, sort_by='date', sector=None, capital_source=None):
+    """
+    Projection of the CSV columns for every master list deal
+
+    A single join of master_list and raw_items; yields plain rows in
+    batches of BATCH_SIZE instead of loading every ORM object.
+
+    Args:
+        session: Database session
+        sort_by: 'date' (most recent first) or 'amount' (largest first, undisclosed last)
+        sector: Only deals in this sector
+        capital_source: Only deals with this capital source
+    """
+    query = session.query(
+        RawItem.published_date,
+        MasterItem.company,
+        MasterItem.investment_amount,
+        MasterItem.amount_usd,
+        MasterItem.capital_type,
+        MasterItem.sector,
+        MasterItem.location,
+        MasterItem.project_type,
+        MasterItem.summary,
+        RawItem.url
+    ).join(
+        RawItem, MasterItem.item_id == RawItem.id
+    )
+    if sector:
+        query = query.filter(in_category(MasterItem, SECTOR, sector))
+    if capital_source:
+        query = query.filter(in_category(MasterItem, CAPITAL_SOURCE, capital_source))
+    if sort_by == 'amount':
+        query = query.order_by(MasterItem.amount_usd.is_(None), MasterItem.amount_usd.desc())
+    return query.order_by(
+        RawItem.published_date.desc()  # Most recent first
+    ).yield_per(BATCH_SIZE)
+
+
+def csv_row(row):
+    """CSV record (FIELDNAMES order) for a master_rows_query row"""
+    return [
+        row.published_date.strftime('%Y-%m-%d') if row.published_date else 'N/A',
+        row.company or 'N/A',
+        row.investment_amount or 'Not disclosed',
+        f"{row.amount_usd:.0f}" if row.amount_usd is not None else '',
+        row.capital_type or 'N/A',
+        row.sector or 'N/A',
+        row.location or 'N/A',
+        row.project_type or 'N/A',
+        row.summary if row.summary else 'N/A',
+        row.url
+    ]
+
+
+def iter_master_csv(sort_by='date', sector=None, capital_source=None):
+    """
+    Stream the master list as CSV text chunks (header first)
+
+    Opens its own session, kept open while the caller iterates, so it can
+    back an HTTP streaming response. Memory use is one batch of rows
+    whatever the size of the master list.
+    """
+    session = get_session()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FIELDNAMES)
+
+        for i, row in enumerate(master_rows_query(session, sort_by, sector, capital_source), 1):
+            writer.writerow(csv_row(row))
+            if i % BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+    finally:
+        session.close()
 
 
-def export_master_to_csv(output_path='exports/master_list.csv'):
-    """Export master list to CSV file."""
-    session = get_session()
+def export_master_to_csv(output_path='exports/master_list.csv', sort_by='date'):
+    """
+    Export master list to CSV file.
 
-    # Get all master items with their raw item data
-    master_items = session.query(MasterItem).join(
-        RawItem, MasterItem.item_id == RawItem.id
-    ).order_by(
-        RawItem.published_date.desc()  # Most recent first
-    ).all()
+    Rows are written as they arrive from the database cursor.
+
+    Args:
+        output_path: CSV file to write
+        sort_by: 'date' (most recent first) or 'amount' (largest first, undisclosed last)
+    """
+    session = get_session()
 
     # Ensure export directory exists
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
     # Write to CSV
-    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            'Date',
-            'Company',
-            'Investment Amount',
-            'Capital Type',
-            'Sector',
-            'Location',
-            'Project Type',
-            'Summary',
-            'Source URL'
-        ]
-
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for master in master_items:
-            raw = session.query(RawItem).filter_by(id=master.item_id).first()
-
-            writer.writerow({
-                'Date': raw.published_date.strftime('%Y-%m-%d') if raw.published_date else 'N/A',
-                'Company': master.company or 'N/A',
-                'Investment Amount': master.investment_amount or 'Not disclosed',
-                'Capital Type': master.capital_type or 'N/A',
-                'Sector': master.sector or 'N/A',
-                'Location': master.location or 'N/A',
-                'Project Type': master.project_type or 'N/A',
-                'Summary': master.summary if master.summary else 'N/A',
-                'Source URL': raw.url
-            })
-
-    session.close()
+    count = 0
+    try:
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
+
+            for row in master_rows_query(session, sort_by):
+                writer.writerow(csv_row(row))
+                count += 1
+    finally:
+        session.close()
 
     print("=" * 80)
     print(f"CSV EXPORT COMPLETE")
     print("=" * 80)
     print()
-    print(f"Exported {len(master_items)} items to: {output_path}")
+    print(f"Exported {count} items to: {output_path}")
     print()
     print("Next steps:")
     print("1. Open Google Sheets")
@@ -71,40 +156,40 @@ def export_master_to_csv(output_path='exports/master_list.csv'):
     print("4. Insert → Embed → paste the Google Sheets URL")
     print()
 
-    return len(master_items)
+    return count
 
 
 def print_summary():
     """Print summary of master list for preview."""
     session = get_session()
 
-    master_items = session.query(MasterItem).join(
-        RawItem, MasterItem.item_id == RawItem.id
-    ).order_by(
-        RawItem.published_date.desc()
-    ).all()
+    total, disclosed, total_usd = session.query(
+        func.count(MasterItem.id), func.count(MasterItem.amount_usd), func.sum(MasterItem.amount_usd)
+    ).one()
 
     print("=" * 80)
-    print(f"MASTER LIST SUMMARY ({len(master_items)} items)")
+    print(f"MASTER LIST SUMMARY ({total} items)")
     print("=" * 80)
     print()
+    if disclosed:
+        print(f"Disclosed investment: {format_usd(total_usd)} across {disclosed} items")
+        print()
 
-    if not master_items:
+    if not total:
         print("No items in master list yet.")
         print("Add items via the web interface at http://127.0.0.1:8000")
         session.close()
         return
 
-    for i, master in enumerate(master_items[:5], 1):
-        raw = session.query(RawItem).filter_by(id=master.item_id).first()
-        print(f"{i}. {master.company or 'Unknown Company'}")
-        print(f"   Investment: {master.investment_amount or 'Not disclosed'}")
-        print(f"   Type: {master.capital_type or 'N/A'} | Sector: {master.sector or 'N/A'}")
-        print(f"   Date: {raw.published_date.strftime('%Y-%m-%d') if raw.published_date else 'N/A'}")
+    for i, row in enumerate(master_rows_query(session).limit(5), 1):
+        print(f"{i}. {row.company or 'Unknown Company'}")
+        print(f"   Investment: {row.investment_amount or 'Not disclosed'}")
+        print(f"   Type: {row.capital_type or 'N/A'} | Sector: {row.sector or 'N/A'}")
+        print(f"   Date: {row.published_date.strftime('%Y-%m-%d') if row.published_date else 'N/A'}")
         print()
 
-    if len(master_items) > 5:
-        print(f"... and {len(master_items) - 5} more items")
+    if total > 5:
+        print(f"... and {total - 5} more items")
         print()
 
     session.close()
@@ -114,9 +199,12 @@ if __name__ == '__main__':
     import os
     os.chdir(Path(__file__).parent.parent.parent)
 
-    if len(sys.argv) > 1 and sys.argv[1] == 'preview':
+    args = [arg for arg in sys.argv[1:] if arg != '--by-amount']
+    sort_by = 'amount' if '--by-amount' in sys.argv else 'date'
+
+    if args and args[0] == 'preview':
         print_summary()
     else:
         # Default output path
-        output = sys.argv[1] if len(sys.argv) > 1 else 'exports/master_list.csv'
-        export_master_to_csv(output)
+        output = args[0] if args else 'exports/master_list.csv'
+        export_master_to_csv(output, sort_by=sort_by)
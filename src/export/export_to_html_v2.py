@@ -3,6 +3,9 @@
 Export deal tracker to intelligence briefing-style HTML.
 
 Generates a professional, paginated feed with AI summaries for government analysts.
+The first page is rendered inline; later pages are pre-rendered shards
+(deals/pages/page-N.html) fetched on demand, and filtering uses a compact
+search index (deals/search-index.json) instead of every card.
 
 VISUAL DESIGN DOCUMENTATION:
 ===========================
@@ -46,14 +49,28 @@ Data Priority:
 
 import sys
 import os
+import json
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urlparse
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from database.models import get_session, MasterItem, RawItem, AIExtraction
+from sqlalchemy import and_, case, func
+
+from src.database import get_session, MasterItem, RawItem, AIExtraction
+from src.database.categories import SECTOR, category_counts, categories_by_owner
+from src.export.templating import render, render_fragment
+from src.utils.amounts import format_usd
+
+DEALS_PER_PAGE = 10
+
+# Pages after the first are written here (relative to deals/) and fetched on demand
+SHARD_DIR = 'pages'
+
+# Compact [id, page, type, text] index used for filtering without every shard
+SEARCH_INDEX_FILE = 'search-index.json'
 
 
 def extract_domain(url):
@@ -89,10 +106,104 @@ def extract_domain(url):
         return 'source'
 
 
-def generate_deals_html(output_file=None, deals_per_page=10):
+def deal_amount_usd():
+    """
+    SQL expression for a deal's amount in USD
+
+    Follows the card's Amount field: the curated investment_amount when one
+    was entered (non-empty, as the card checks), otherwise the AI-extracted
+    deal_amount.
+    """
+    return case(
+        (and_(MasterItem.investment_amount.isnot(None), MasterItem.investment_amount != ''),
+         MasterItem.amount_usd),
+        else_=AIExtraction.amount_usd
+    )
+
+
+def query_deals(session, order='date'):
+    """
+    Query master list deals with their raw item and AI extraction
+
+    Args:
+        session: Database session
+        order: 'date' (newest first) or 'amount' (largest first, undisclosed last)
+    """
+    query = session.query(MasterItem, RawItem, AIExtraction).join(
+        RawItem, MasterItem.item_id == RawItem.id
+    ).outerjoin(
+        AIExtraction, AIExtraction.item_id == RawItem.id
+    )
+
+    if order == 'amount':
+        amount = deal_amount_usd()
+        return query.order_by(amount.is_(None), amount.desc(), RawItem.published_date.desc())
+    return query.order_by(RawItem.published_date.desc())
+
+
+def get_deal_totals(session):
+    """
+    Aggregate the master list in one query
+
+    Returns:
+        Dict with deals, disclosed (deals with a parsed amount), total_usd
+        and largest_usd
+    """
+    amount = deal_amount_usd()
+    deals, disclosed, total_usd, largest_usd = session.query(
+        func.count(MasterItem.id), func.count(amount), func.sum(amount), func.max(amount)
+    ).select_from(MasterItem).outerjoin(
+        AIExtraction, AIExtraction.item_id == MasterItem.item_id
+    ).one()
+
+    return {
+        'deals': deals,
+        'disclosed': disclosed,
+        'total_usd': total_usd or 0.0,
+        'largest_usd': largest_usd
+    }
+
+
+def get_deals_fingerprint():
+    """
+    Fingerprint every field the deal cards render.
+
+    Used by the incremental publish build to skip regenerating the deal
+    tracker when the master list has not changed.
+    """
+    import hashlib
+
+    session = get_session()
+    try:
+        digest = hashlib.sha256()
+        for master, raw, ai in query_deals(session):
+            row = (
+                master.id, master.company, master.investors, master.investment_amount, master.amount_usd,
+                master.transaction_type, master.deal_type, master.capital_sources,
+                master.capital_type, master.sectors, master.sector, master.summary,
+                raw.url, raw.published_date,
+                ai.company if ai else None, ai.deal_type if ai else None,
+                ai.deal_amount if ai else None, ai.amount_usd if ai else None, ai.investors if ai else None,
+                ai.summary_complete if ai else None
+            )
+            digest.update(repr(row).encode('utf-8'))
+
+        # Sector links drive the sector filter and its counts
+        deal_sectors = categories_by_owner(session, MasterItem, SECTOR)
+        digest.update(repr(sorted((k, sorted(v)) for k, v in deal_sectors.items())).encode('utf-8'))
+        return digest.hexdigest()
+    finally:
+        session.close()
+
+
+def generate_deals_html(output_file=None, deals_per_page=DEALS_PER_PAGE):
     """
     Generate intelligence briefing-style HTML page.
 
+    The first page of deals is rendered inline; the remaining pages are
+    written as pre-rendered shards (pages/page-N.html) that the page fetches
+    on demand, plus a compact search index used for filtering.
+
     Args:
         output_file: Path to output HTML file
         deals_per_page: Number of deals to show per page
@@ -108,22 +219,34 @@ def generate_deals_html(output_file=None, deals_per_page=10):
     # Get deals with AI summaries
     session = get_session()
     try:
-        deals = session.query(MasterItem, RawItem, AIExtraction).join(
-            RawItem, MasterItem.item_id == RawItem.id
-        ).outerjoin(
-            AIExtraction, AIExtraction.item_id == RawItem.id
-        ).order_by(RawItem.published_date.desc()).all()
+        deals = query_deals(session).all()
 
         print(f"Found {len(deals)} deals in master list")
 
-        # Generate HTML
-        html = generate_html_page(deals, deals_per_page)
+        cards = [deal_card_context(master, raw, ai) for master, raw, ai in deals]
+        pages = paginate(cards, deals_per_page)
+
+        # Largest-first order and totals come straight from SQL
+        by_amount = [deal_id for (deal_id,) in query_deals(session, order='amount').with_entities(MasterItem.id)]
+        totals = get_deal_totals(session)
+
+        # Sector facet counts (one GROUP BY) and each deal's sectors for filtering
+        sector_counts = category_counts(session, MasterItem, kind=SECTOR).get(SECTOR, [])
+        deal_sectors = categories_by_owner(session, MasterItem, SECTOR)
+
+        # Generate HTML (first page inline)
+        html = generate_html_page(pages[0], deals_per_page, total_pages=len(pages), totals=totals,
+                                  sector_counts=sector_counts)
 
         # Write to file
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
 
-        print(f"✓ Exported {len(deals)} deals to {output_file}")
+        write_deal_shards(pages, output_file.parent)
+        write_search_index(pages, output_file.parent, deals_per_page, by_amount=by_amount,
+                           deal_sectors=deal_sectors)
+
+        print(f"✓ Exported {len(deals)} deals to {output_file} ({len(pages)} pages)")
         return True
 
     except Exception as e:
@@ -135,185 +258,117 @@ def generate_deals_html(output_file=None, deals_per_page=10):
         session.close()
 
 
-def generate_html_page(deals, deals_per_page=10):
-    """Generate intelligence briefing-style HTML"""
-
-    # Build deal cards
-    deal_cards = []
-    for master, raw, ai in deals:
-        card = generate_deal_card(master, raw, ai)
-        deal_cards.append(card)
-
-    deal_cards_html = '\n'.join(deal_cards)
-
-    # Count deals with AI summaries
-    ai_summary_count = sum(1 for _, _, ai in deals if ai and ai.summary_complete)
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Defense Investment Activity - Defense Capital Dashboard</title>
-    <link rel="stylesheet" href="../css/style.css">
-</head>
-<body>
-    <nav>
-        <div class="container">
-            <a href="../index.html" class="logo">Defense Capital Dashboard</a>
-            <button class="mobile-menu-toggle">☰</button>
-            <ul>
-                <li><a href="../index.html">Home</a></li>
-                <li><a href="index.html" class="active">Deal Tracker</a></li>
-                <li><a href="../charts/defense-investment.html">Defense Investment Trends</a></li>
-                <li><a href="../charts/defense-industrial.html">Defense Industrial Health</a></li>
-                <li><a href="../charts/us-industrial.html">Overall US Industrial Health</a></li>
-            </ul>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="page-header">
-            <h1>Defense Investment Activity</h1>
-            <p>Curated intelligence on venture capital, M&A, and funding activity in the defense sector</p>
-            <p class="last-updated">Last updated: {datetime.now().strftime('%B %d, %Y')}</p>
-        </div>
-
-        <!-- Search/Filter Bar -->
-        <div class="briefing-controls">
-            <input type="text" id="searchBox" placeholder="Search deals..." class="search-input">
-            <select id="dealTypeFilter" class="filter-select">
-                <option value="all">All Deal Types</option>
-                <option value="vc">Venture Capital</option>
-                <option value="m&a">M&A / Acquisition</option>
-                <option value="ipo">IPO</option>
-                <option value="other">Other</option>
-            </select>
-        </div>
-
-        <!-- Deal Feed -->
-        <div id="dealFeed" class="briefing-feed">
-            {deal_cards_html}
-        </div>
-
-        <!-- Pagination -->
-        <div id="pagination" class="pagination"></div>
-
-        <!-- Empty State -->
-        <div id="emptyState" class="empty-state" style="display: none;">
-            <p>No deals match your search criteria.</p>
-        </div>
-    </div>
-
-    <footer>
-        <p>Defense Capital Dashboard</p>
-        <p>Deal intelligence curated from open sources</p>
-    </footer>
-
-    <script src="../js/main.js"></script>
-    <script>
-        // Pagination and filtering
-        const searchBox = document.getElementById('searchBox');
-        const dealTypeFilter = document.getElementById('dealTypeFilter');
-        const dealFeed = document.getElementById('dealFeed');
-        const deals = Array.from(dealFeed.querySelectorAll('.deal-card'));
-        const emptyState = document.getElementById('emptyState');
-        const paginationDiv = document.getElementById('pagination');
-
-        const DEALS_PER_PAGE = {deals_per_page};
-        let currentPage = 1;
-        let filteredDeals = deals;
-
-        function filterDeals() {{
-            const searchTerm = searchBox.value.toLowerCase();
-            const dealType = dealTypeFilter.value.toLowerCase();
-
-            filteredDeals = deals.filter(deal => {{
-                const text = deal.textContent.toLowerCase();
-                const type = deal.dataset.dealType ? deal.dataset.dealType.toLowerCase() : '';
-
-                const matchesSearch = text.includes(searchTerm);
-                const matchesType = dealType === 'all' || type.includes(dealType);
-
-                return matchesSearch && matchesType;
-            }});
-
-            currentPage = 1;
-            renderPage();
-        }}
-
-        function renderPage() {{
-            // Hide all deals
-            deals.forEach(deal => deal.style.display = 'none');
-
-            // Show deals for current page
-            const start = (currentPage - 1) * DEALS_PER_PAGE;
-            const end = start + DEALS_PER_PAGE;
-            const pageDeals = filteredDeals.slice(start, end);
-
-            pageDeals.forEach(deal => deal.style.display = 'block');
-
-            // Update empty state
-            emptyState.style.display = filteredDeals.length === 0 ? 'block' : 'none';
-
-            // Render pagination controls
-            renderPagination();
-
-            // Scroll to top
-            window.scrollTo({{ top: 0, behavior: 'smooth' }});
-        }}
-
-        function renderPagination() {{
-            const totalPages = Math.ceil(filteredDeals.length / DEALS_PER_PAGE);
-
-            if (totalPages <= 1) {{
-                paginationDiv.innerHTML = '';
-                return;
-            }}
-
-            let html = '<div class="pagination-controls">';
-
-            // Previous button
-            if (currentPage > 1) {{
-                html += `<button class="page-btn" onclick="changePage(${{currentPage - 1}})">&larr; Previous</button>`;
-            }}
-
-            // Page numbers
-            html += '<span class="page-info">Page ' + currentPage + ' of ' + totalPages + '</span>';
-
-            // Next button
-            if (currentPage < totalPages) {{
-                html += `<button class="page-btn" onclick="changePage(${{currentPage + 1}})">Next &rarr;</button>`;
-            }}
+def paginate(cards, deals_per_page):
+    """Split cards into pages (always at least one, possibly empty, page)"""
+    pages = [cards[i:i + deals_per_page] for i in range(0, len(cards), deals_per_page)]
+    return pages or [[]]
+
+
+def generate_html_page(cards, deals_per_page=DEALS_PER_PAGE, total_pages=1, totals=None, sector_counts=None):
+    """
+    Generate intelligence briefing-style HTML
+
+    Args:
+        cards: Deal card contexts for the first page (rendered inline)
+        deals_per_page: Number of deals to show per page
+        total_pages: Total number of pages, including the shards
+        totals: Master list aggregates from get_deal_totals (optional)
+        sector_counts: (sector, deal count) pairs for the sector filter (optional)
+    """
+    if totals and totals['disclosed']:
+        totals_line = (f"{totals['deals']:,} deals · {format_usd(totals['total_usd'])} disclosed "
+                       f"across {totals['disclosed']:,} deals")
+    elif totals:
+        totals_line = f"{totals['deals']:,} deals"
+    else:
+        totals_line = None
+
+    return render(
+        'deals_page.html',
+        nav_html=render_fragment('_nav.html', active='deals', categories=get_nav_categories()),
+        cards=cards,
+        deals_per_page=deals_per_page,
+        total_pages=total_pages,
+        shard_dir=SHARD_DIR,
+        search_index_url=SEARCH_INDEX_FILE,
+        totals_line=totals_line,
+        sector_counts=sector_counts or [],
+        last_updated=datetime.now().strftime('%B %d, %Y')
+    )
+
+
+def write_deal_shards(pages, deals_dir):
+    """
+    Write pages 2..N as pre-rendered card fragments
+
+    Shards left over from a previous, longer export are removed.
+    """
+    shard_dir = Path(deals_dir) / SHARD_DIR
+    shard_dir.mkdir(parents=True, exist_ok=True)
 
-            html += '</div>';
-            paginationDiv.innerHTML = html;
-        }}
+    written = set()
+    for page_number, cards in enumerate(pages[1:], start=2):
+        shard_file = shard_dir / f'page-{page_number}.html'
+        with open(shard_file, 'w', encoding='utf-8') as f:
+            f.write(render('_deal_page.html', cards=cards))
+        written.add(shard_file.name)
 
-        function changePage(page) {{
-            currentPage = page;
-            renderPage();
-        }}
+    for stale in shard_dir.glob('page-*.html'):
+        if stale.name not in written:
+            stale.unlink()
 
-        searchBox.addEventListener('input', filterDeals);
-        dealTypeFilter.addEventListener('change', filterDeals);
 
-        // Mobile menu toggle
-        document.querySelector('.mobile-menu-toggle').addEventListener('click', function() {{
-            document.querySelector('nav ul').classList.toggle('active');
-        }});
+def search_text(card):
+    """Lowercased text a deal can be found by (summary reduced to unique words)"""
+    parts = [card['deal_type'], card['date'], card['company'] or '', card['source_domain']]
+    parts.extend(str(value) for _, value in card['metadata'])
 
-        // Initial render
-        renderPage();
-    </script>
-</body>
-</html>"""
+    if card['summary']:
+        seen = set()
+        for word in card['summary'].lower().split():
+            if word not in seen:
+                seen.add(word)
+                parts.append(word)
 
-    return html
+    return ' '.join(parts).lower()
 
 
-def generate_deal_card(master, raw, ai):
-    """Generate HTML for a single deal card with improved UX"""
+def write_search_index(pages, deals_dir, deals_per_page, by_amount=None, deal_sectors=None):
+    """
+    Write the compact search index used for client-side filtering
+
+    Each entry is [deal id, page number, deal type, search text, sectors] so the page
+    can filter without downloading every shard, then fetch only the shards
+    holding the matching deals. by_amount lists deal ids largest amount first
+    (undisclosed last) for sorting by size.
+    """
+    deal_sectors = deal_sectors or {}
+    entries = [
+        [card['id'], page_number, card['deal_type'].lower(), search_text(card), deal_sectors.get(card['id'], [])]
+        for page_number, cards in enumerate(pages, start=1)
+        for card in cards
+    ]
+
+    index = {
+        'deals_per_page': deals_per_page,
+        'total_pages': len(pages),
+        'deals': entries,
+        # Deal ids largest amount first, for the "Largest first" sort
+        'by_amount': by_amount or []
+    }
+
+    with open(Path(deals_dir) / SEARCH_INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+
+
+def get_nav_categories():
+    """Chart categories for the shared navigation bar"""
+    from src.export.generate_chart_pages_v2 import CATEGORIES
+    return [(cat_id, cat_info['title']) for cat_id, cat_info in CATEGORIES.items()]
+
+
+def deal_card_context(master, raw, ai):
+    """Build the template context for a single deal card"""
 
     # Extract date
     date_str = raw.published_date.strftime('%b %d, %Y') if raw.published_date else 'Date unknown'
@@ -380,45 +435,21 @@ def generate_deal_card(master, raw, ai):
     company_name = (ai.company if ai and ai.company else
                    master.company if master and master.company else None)
 
-    # Build card with clean text-based layout
-    card_html = f"""
-    <div class="deal-card" data-deal-type="{deal_type.lower()}">
-        <div class="deal-card-header">
-            <div class="deal-header-line">
-                <span class="deal-type-label">{deal_type}</span>
-                <span class="deal-date">{date_str}</span>
-            </div>
-        </div>
-
-        <div class="deal-card-body">"""
-
     # Company headline (use curated company name from master, fallback to AI)
     company_display = master.company if master and master.company else company_name
-    if company_display:
-        card_html += f"""
-            <h3 class="deal-company-name">{company_display}</h3>"""
 
-    # Start metadata section
-    card_html += """
-            <div class="deal-metadata">"""
+    # Labeled metadata fields - only shown when data exists
+    metadata = []
 
     # Amount: prioritize master.investment_amount
     amount = master.investment_amount if master and master.investment_amount else (ai.deal_amount if ai else None)
     if amount:
-        card_html += f"""
-                <div class="deal-meta-line">
-                    <span class="meta-label">Amount</span>
-                    <span>{amount}</span>
-                </div>"""
+        metadata.append(('Amount', amount))
 
     # Investors: prioritize master.investors
     investors = master.investors if master and master.investors else (ai.investors if ai else None)
     if investors:
-        card_html += f"""
-                <div class="deal-meta-line">
-                    <span class="meta-label">Investors</span>
-                    <span>{investors}</span>
-                </div>"""
+        metadata.append(('Investors', investors))
 
     # Capital Sources (with fallback to old capital_type)
     capital_sources = None
@@ -428,11 +459,7 @@ def generate_deal_card(master, raw, ai):
         capital_sources = master.capital_type
 
     if capital_sources:
-        card_html += f"""
-                <div class="deal-meta-line">
-                    <span class="meta-label">Capital</span>
-                    <span>{capital_sources}</span>
-                </div>"""
+        metadata.append(('Capital', capital_sources))
 
     # Sectors (with fallback to old sector)
     sectors = None
@@ -442,44 +469,25 @@ def generate_deal_card(master, raw, ai):
         sectors = master.sector
 
     if sectors:
-        card_html += f"""
-                <div class="deal-meta-line">
-                    <span class="meta-label">Sectors</span>
-                    <span>{sectors}</span>
-                </div>"""
-
-    # Close metadata section
-    card_html += """
-            </div>"""
-
-    # Use ONLY human-curated summary from master list
-    # AI data and RSS summaries are NOT shown - only what you approved in triage
-    if master and master.summary:
-        # Simply display the curated summary as-is (no section parsing)
-        card_html += f"""
-            <div class="deal-insight">
-                <p>{master.summary}</p>
-            </div>"""
-    else:
-        # If no curated summary, show a placeholder
-        card_html += f"""
-            <div class="deal-insight">
-                <p style="color: #999; font-style: italic;">No summary provided.</p>
-            </div>"""
-
-    # Footer with source link (includes domain attribution)
-    source_domain = extract_domain(raw.url)
-    card_html += f"""
-        </div>
-
-        <div class="deal-card-footer">
-            <a href="{raw.url}" target="_blank" rel="noopener" class="deal-source-link">
-                Read Full Article on {source_domain} →
-            </a>
-        </div>
-    </div>"""
-
-    return card_html
+        metadata.append(('Sectors', sectors))
+
+    return {
+        'id': master.id,
+        'deal_type': deal_type,
+        'date': date_str,
+        'company': company_display,
+        'metadata': metadata,
+        # Use ONLY human-curated summary from master list
+        # AI data and RSS summaries are NOT shown - only what you approved in triage
+        'summary': master.summary if master else None,
+        'url': raw.url,
+        'source_domain': extract_domain(raw.url)
+    }
+
+
+def generate_deal_card(master, raw, ai):
+    """Generate HTML for a single deal card with improved UX"""
+    return render('_deal_card.html', card=deal_card_context(master, raw, ai))
 
 
 if __name__ == '__main__':
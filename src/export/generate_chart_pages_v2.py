@@ -2,10 +2,20 @@
 """
 Generate HTML pages for all charts with reorganized navigation
 Creates individual chart pages and category overview pages
+
+Pages are rendered from the Jinja2 templates in src/export/templates.
+The navigation fragment is rendered once per build for each active section
+and reused across every chart page in that section.
 """
 
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.export.templating import render, render_fragment, get_templates_fingerprint_source
+
 # Navigation categories with key insights
 CATEGORIES = {
     'defense-investment': {
@@ -357,19 +367,20 @@ CHARTS = {
     }
 }
 
-def generate_navigation(current_category=None):
-    """Generate navigation HTML with category dropdowns"""
+# Annual investment charts show all available data instead of 2019-present
+LIMITED_DATA_CHARTS = ['public_defense_companies', 'vc_defense', 'ma_defense']
 
-    nav_items = [
-        '<li><a href="../index.html">Home</a></li>',
-        '<li><a href="../deals/index.html">Deal Tracker</a></li>'
-    ]
+# Investment/dollar amount charts start the y-axis at zero
+ZERO_BASELINE_CHARTS = ['public_defense_companies', 'vc_defense', 'ma_defense', 'dgorder', 'fdefx',
+                        'pnfi', 'gpdi', 'prmfgcons', 'adefno', 'adapno']
 
-    for cat_id, cat_info in CATEGORIES.items():
-        active = 'class="active"' if cat_id == current_category else ''
-        nav_items.append(f'<li><a href="../charts/{cat_id}.html" {active}>{cat_info["title"]}</a></li>')
+DEFAULT_Y_AXIS_FORMAT = {'prefix': '', 'suffix': '', 'divisor': 1}
 
-    return '\n                '.join(nav_items)
+@lru_cache(maxsize=None)
+def generate_navigation(current_category=None):
+    """Generate navigation HTML (cached: rendered once per section per build)"""
+    categories = tuple((cat_id, cat_info['title']) for cat_id, cat_info in CATEGORIES.items())
+    return render_fragment('_nav.html', active=current_category, categories=categories)
 
 def get_source_url(chart_id):
     """Get the source URL for a given chart"""
@@ -396,419 +407,75 @@ def get_source_url(chart_id):
         return None
 
 
+def get_related_charts(chart_id):
+    """Get up to 3 other charts in the same category"""
+    category = CHARTS[chart_id]['category']
+    return [cid for cid, cinfo in CHARTS.items()
+            if cinfo['category'] == category and cid != chart_id][:3]
+
+
 def generate_chart_page(chart_id, chart_info):
     """Generate HTML page for a single chart"""
 
     category = chart_info['category']
-    nav_html = generate_navigation(category)
 
     # Determine if this is market data
     is_market = chart_id in ['ita', 'xli', 'pld', 'dgs10']
-    data_file = f'../data/{chart_id.lower()}.json'
 
-    # Get source URL
+    # Get source URL and name
     source_url = get_source_url(chart_id)
-
-    # Determine source name
-    if chart_id in ['vc_defense', 'ma_defense', 'public_defense_companies']:
+    if chart_id in LIMITED_DATA_CHARTS:
         source_name = 'Custom Research'
-        source_link = source_name  # No link for custom data
+        source_url = None  # No link for custom data
     elif is_market and chart_id != 'dgs10':
         source_name = 'Yahoo Finance'
-        source_link = f'<a href="{source_url}" target="_blank" rel="noopener" style="color: #226E93; text-decoration: none;">{source_name}</a>' if source_url else source_name
     else:
         source_name = 'Federal Reserve Economic Data (FRED)'
-        source_link = f'<a href="{source_url}" target="_blank" rel="noopener" style="color: #226E93; text-decoration: none;">{source_name}</a>' if source_url else source_name
 
     # Find related charts in the same category
-    related_charts = [cid for cid, cinfo in CHARTS.items()
-                     if cinfo['category'] == category and cid != chart_id][:3]
-
-    related_links = '\n                '.join([
-        f'<a href="{get_chart_filename(cid)}" class="btn btn-secondary">{CHARTS[cid]["title"]}</a>'
-        for cid in related_charts
-    ])
-
-    if not related_links:
-        related_links = f'<a href="{category}.html" class="btn btn-secondary">Back to {CATEGORIES[category]["title"]}</a>'
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{chart_info['title']} - Defense Capital Dashboard</title>
-    <link rel="stylesheet" href="../css/style.css">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
-</head>
-<body>
-    <nav>
-        <div class="container">
-            <a href="../index.html" class="logo">Defense Capital Dashboard</a>
-            <button class="mobile-menu-toggle">☰</button>
-            <ul>
-                {nav_html}
-            </ul>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="page-header">
-            <h1>{chart_info['title']}</h1>
-            <p>{chart_info['subtitle']}</p>
-            <p style="margin-top: 0.5rem; font-size: 0.9rem; color: #666;">
-                Source: {source_link}
-            </p>
-            <p class="last-updated" id="lastUpdated"></p>
-        </div>
-
-        <div class="card">
-            <div class="chart-container" style="height: 500px;">
-                <canvas id="mainChart"></canvas>
-            </div>
-        </div>
-
-        <!-- Data Summary Stats -->
-        <div class="data-summary" id="dataSummary" style="display: none;">
-            <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1rem;">
-                <h2 style="margin: 0;">Key Statistics</h2>
-                <button class="btn btn-download" id="downloadBtn">Download CSV</button>
-            </div>
-            <div class="summary-grid">
-                <div class="summary-item">
-                    <div class="summary-label">Latest Value</div>
-                    <div class="summary-value" id="latestValue">--</div>
-                    <div class="summary-change" id="latestDate">--</div>
-                </div>
-                <div class="summary-item">
-                    <div class="summary-label">Period Change</div>
-                    <div class="summary-value" id="monthChange">--</div>
-                    <div class="summary-change" id="monthChangePercent">--</div>
-                </div>
-                <div class="summary-item">
-                    <div class="summary-label">Year-over-Year</div>
-                    <div class="summary-value" id="yearChange">--</div>
-                    <div class="summary-change" id="yearChangePercent">--</div>
-                </div>
-                <div class="summary-item">
-                    <div class="summary-label">Trend</div>
-                    <div class="summary-value"><span id="trendIndicator" class="trend-indicator">→</span></div>
-                    <div class="summary-change">Recent direction</div>
-                </div>
-            </div>
-        </div>
-
-        <div class="card">
-            <h2>About This Metric</h2>
-            <p>{chart_info['description']}</p>
-            <p>{chart_info['context']}</p>
-            <p style="margin-top: 1rem; color: #666; font-size: 0.9rem;">Units: {chart_info['units']}</p>
-        </div>
-
-        <div class="card">
-            <h2>Related Charts</h2>
-            <div class="grid grid-3">
-                {related_links}
-            </div>
-        </div>
-    </div>
-
-    <footer>
-        <p>Defense Capital Dashboard</p>
-        <p>Data source: {'Yahoo Finance' if is_market and chart_id != 'dgs10' else 'Federal Reserve Economic Data (FRED)'}</p>
-    </footer>
-
-    <script src="../js/main.js"></script>
-    <script>
-        let chartData = null;
-
-        document.addEventListener('DOMContentLoaded', async function() {{
-            try {{
-                // Load data
-                const response = await fetch('{data_file}');
-                chartData = await response.json();
-
-                // Calculate and display stats
-                const stats = ChartUtils.calculateStats(chartData.data);
-                if (stats) {{
-                    document.getElementById('dataSummary').style.display = 'block';
-                    document.getElementById('latestValue').textContent = ChartUtils.formatNumber(stats.latest.toFixed(2));
-                    document.getElementById('latestDate').textContent = stats.latestDate;
-
-                    if (stats.monthChange !== null) {{
-                        const monthChangeElem = document.getElementById('monthChange');
-                        const monthChangePercentElem = document.getElementById('monthChangePercent');
-                        monthChangeElem.textContent = (stats.monthChange >= 0 ? '+' : '') + ChartUtils.formatNumber(stats.monthChange.toFixed(2));
-                        monthChangePercentElem.textContent = (stats.monthChangePercent >= 0 ? '+' : '') + stats.monthChangePercent.toFixed(2) + '%';
-                        monthChangePercentElem.className = 'summary-change ' + (stats.monthChangePercent > 0 ? 'positive' : stats.monthChangePercent < 0 ? 'negative' : 'neutral');
-                    }}
-
-                    const yearChangeElem = document.getElementById('yearChange');
-                    const yearChangePercentElem = document.getElementById('yearChangePercent');
-                    yearChangeElem.textContent = (stats.yearChange >= 0 ? '+' : '') + ChartUtils.formatNumber(stats.yearChange.toFixed(2));
-                    yearChangePercentElem.textContent = (stats.yearChangePercent >= 0 ? '+' : '') + stats.yearChangePercent.toFixed(2) + '%';
-                    yearChangePercentElem.className = 'summary-change ' + (stats.yearChangePercent > 0 ? 'positive' : stats.yearChangePercent < 0 ? 'negative' : 'neutral');
-
-                    document.getElementById('trendIndicator').textContent = stats.trend;
-                }}
-
-                // Display last updated
-                if (chartData.last_updated) {{
-                    document.getElementById('lastUpdated').textContent = 'Last updated: ' + chartData.last_updated;
-                }}
-
-                // Filter data to 2019-present for consistent visualization
-                // Exception: Annual investment charts (VC, M&A, PDC) show all available data
-                const limitedDataCharts = ['public_defense_companies', 'vc_defense', 'ma_defense'];
-                let displayData = chartData;
-
-                if (!limitedDataCharts.includes('{chart_id}')) {{
-                    const filteredData = chartData.data.filter(d => new Date(d.date) >= new Date('{DEFAULT_START_DATE}'));
-                    if (filteredData.length > 0) {{
-                        displayData = {{
-                            ...chartData,
-                            data: filteredData
-                        }};
-                    }}
-                }}
-
-                // Create year labels from the filtered data
-                const yearLabels = displayData.data.map(d => {{
-                    const date = new Date(d.date);
-                    const year = date.getFullYear();
-                    return `${{year}}`;
-                }});
-
-                // Modify displayData to include year labels
-                displayData = {{
-                    ...displayData,
-                    yearLabels: yearLabels
-                }};
-
-                // Render chart with year labels and gridlines
-                const chartOptions = {{
-                    fill: true,
-                    scales: {{
-                        x: {{
-                            grid: {{
-                                display: true,
-                                color: '#e0e0e0'
-                            }},
-                            ticks: {{
-                                autoSkip: true,
-                                maxRotation: 45,
-                                minRotation: 45,
-                                maxTicksLimit: 20
-                            }}
-                        }},
-                        y: {{
-                            // Start at zero for investment/dollar amount charts
-                            beginAtZero: ['public_defense_companies', 'vc_defense', 'ma_defense', 'dgorder', 'fdefx', 'pnfi', 'gpdi', 'prmfgcons', 'adefno', 'adapno'].includes('{chart_id}'),
-                            ticks: {{
-                                callback: function(value) {{
-                                    const formats = {str(Y_AXIS_FORMATS.get(chart_id, {'prefix': '', 'suffix': '', 'divisor': 1}))};
-                                    const displayValue = value / formats.divisor;
-                                    return formats.prefix + displayValue.toLocaleString() + formats.suffix;
-                                }}
-                            }}
-                        }}
-                    }},
-                    plugins: {{
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    return `Value: ${{context.parsed.y.toFixed(2)}}`;
-                                }}
-                            }}
-                        }}
-                    }}
-                }};
-
-                ChartUtils.createLineChart('mainChart', displayData, chartOptions);
-            }} catch (error) {{
-                console.error('Error loading chart:', error);
-            }}
-
-            // Download button handler
-            document.getElementById('downloadBtn').addEventListener('click', function() {{
-                if (chartData) {{
-                    ChartUtils.downloadCSV(chartData, '{chart_id}.csv');
-                }}
-            }});
-        }});
-    </script>
-</body>
-</html>"""
-
-    return html
+    related = [(get_chart_filename(cid), CHARTS[cid]['title']) for cid in get_related_charts(chart_id)]
+
+    return render(
+        'chart_page.html',
+        nav_html=generate_navigation(category),
+        chart=chart_info,
+        chart_id=chart_id,
+        category_id=category,
+        category_title=CATEGORIES[category]['title'],
+        source_name=source_name,
+        source_url=source_url,
+        footer_source='Yahoo Finance' if is_market and chart_id != 'dgs10' else 'Federal Reserve Economic Data (FRED)',
+        related=related,
+        data_file=f'../data/{chart_id.lower()}.json',
+        limited_data_charts=LIMITED_DATA_CHARTS,
+        begin_at_zero=chart_id in ZERO_BASELINE_CHARTS,
+        y_axis=Y_AXIS_FORMATS.get(chart_id, DEFAULT_Y_AXIS_FORMAT),
+        start_date=DEFAULT_START_DATE
+    )
 
 def generate_category_page(cat_id, cat_info):
     """Generate overview page for a category"""
 
-    nav_html = generate_navigation(cat_id)
-
-    # Get all charts in this category
-    category_charts = [(cid, CHARTS[cid]) for cid in cat_info['charts'] if cid in CHARTS]
-
-    # Generate chart cards
-    chart_cards = []
-    for cid, cinfo in category_charts:
-        filename = get_chart_filename(cid)
-        chart_cards.append(f"""
-            <div class="card">
-                <h3><a href="{filename}">{cinfo['title']}</a></h3>
-                <p>{cinfo['subtitle']}</p>
-                <div class="chart-container" style="height: 250px;">
-                    <canvas id="chart_{cid}"></canvas>
-                </div>
-                <a href="{filename}" class="btn btn-primary" style="margin-top: 1rem;">View Details</a>
-            </div>
-        """)
-
-    chart_cards_html = '\n            '.join(chart_cards)
-
-    # Generate key insights HTML
-    insights_html = ''
-    if 'insights' in cat_info and cat_info['insights']:
-        insights_items = '\n                    '.join([f'<li>{insight}</li>' for insight in cat_info['insights']])
-        insights_html = f"""
-        <div class="key-insights">
-            <h3>Key Insights</h3>
-            <ul>
-                {insights_items}
-            </ul>
-        </div>"""
-
-    # Generate chart loading scripts with 2019+ filtering and clean year labels
-    chart_scripts = []
-    for cid, cinfo in category_charts:
-        # Check if this is a limited data chart (annual investment charts)
-        is_limited = cid in ['public_defense_companies', 'vc_defense', 'ma_defense']
-
-        chart_scripts.append(f"""
-            fetch('../data/{cid.lower()}.json')
-                .then(response => response.json())
-                .then(data => {{
-                    const ctx = document.getElementById('chart_{cid}');
-                    if (!ctx) return;
-
-                    // Filter to 2019+ for consistency (except annual investment charts)
-                    const limitedDataChart = {str(is_limited).lower()};
-                    let displayData = data.data;
-
-                    if (!limitedDataChart) {{
-                        displayData = data.data.filter(d => new Date(d.date) >= new Date('{DEFAULT_START_DATE}'));
-                    }}
-
-                    // Create year labels
-                    const yearLabels = displayData.map(d => {{
-                        const date = new Date(d.date);
-                        const year = date.getFullYear();
-                        return `${{year}}`;
-                    }});
-
-                    new Chart(ctx, {{
-                        type: 'line',
-                        data: {{
-                            labels: yearLabels,
-                            datasets: [{{
-                                label: data.name,
-                                data: displayData.map(d => d.value || d.close),
-                                borderColor: '#226E93',
-                                backgroundColor: 'rgba(34, 110, 147, 0.1)',
-                                borderWidth: 2,
-                                fill: true,
-                                tension: 0.1,
-                                pointRadius: 0
-                            }}]
-                        }},
-                        options: {{
-                            responsive: true,
-                            maintainAspectRatio: false,
-                            plugins: {{
-                                legend: {{ display: false }}
-                            }},
-                            scales: {{
-                                x: {{
-                                    display: true,
-                                    grid: {{
-                                        display: true,
-                                        color: '#e0e0e0'
-                                    }},
-                                    ticks: {{
-                                        maxRotation: 45,
-                                        minRotation: 45,
-                                        maxTicksLimit: 12
-                                    }}
-                                }},
-                                y: {{
-                                    grid: {{ color: '#e0e0e0' }},
-                                    beginAtZero: {str(cid in ['public_defense_companies', 'vc_defense', 'ma_defense', 'dgorder', 'fdefx', 'pnfi', 'gpdi', 'prmfgcons', 'adefno', 'adapno']).lower()},
-                                    ticks: {{
-                                        callback: function(value) {{
-                                            const formats = {str(Y_AXIS_FORMATS.get(cid, {'prefix': '', 'suffix': '', 'divisor': 1}))};
-                                            const displayValue = value / formats.divisor;
-                                            return formats.prefix + displayValue.toLocaleString() + formats.suffix;
-                                        }}
-                                    }}
-                                }}
-                            }}
-                        }}
-                    }});
-                }})
-                .catch(err => console.log('Could not load {cid}:', err));
-        """)
-
-    chart_scripts_html = '\n            '.join(chart_scripts)
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{cat_info['title']} - Defense Capital Dashboard</title>
-    <link rel="stylesheet" href="../css/style.css">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
-</head>
-<body>
-    <nav>
-        <div class="container">
-            <a href="../index.html" class="logo">Defense Capital Dashboard</a>
-            <button class="mobile-menu-toggle">☰</button>
-            <ul>
-                {nav_html}
-            </ul>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="page-header">
-            <h1>{cat_info['title']}</h1>
-            <p>{cat_info['description']}</p>
-        </div>
-
-        {insights_html}
-
-        <div class="grid grid-2">
-            {chart_cards_html}
-        </div>
-    </div>
-
-    <footer>
-        <p>Defense Capital Dashboard</p>
-        <p>Data sources: Federal Reserve Economic Data (FRED), Yahoo Finance</p>
-    </footer>
-
-    <script src="../js/main.js"></script>
-    <script>
-        document.addEventListener('DOMContentLoaded', async function() {{
-            {chart_scripts_html}
-        }});
-    </script>
-</body>
-</html>"""
-
-    return html
+    charts = [
+        {
+            'id': cid,
+            'filename': get_chart_filename(cid),
+            'title': CHARTS[cid]['title'],
+            'subtitle': CHARTS[cid]['subtitle'],
+            'is_limited': cid in LIMITED_DATA_CHARTS,
+            'begin_at_zero': cid in ZERO_BASELINE_CHARTS,
+            'y_axis': Y_AXIS_FORMATS.get(cid, DEFAULT_Y_AXIS_FORMAT)
+        }
+        for cid in cat_info['charts'] if cid in CHARTS
+    ]
+
+    return render(
+        'category_page.html',
+        nav_html=generate_navigation(cat_id),
+        category=cat_info,
+        charts=charts,
+        start_date=DEFAULT_START_DATE
+    )
 
 def get_chart_filename(chart_id):
     """Get the HTML filename for a chart"""
@@ -833,8 +500,61 @@ def get_chart_filename(chart_id):
     }
     return filename_map.get(chart_id, f'{chart_id}.html')
 
-def generate_all_pages(output_dir=None):
-    """Generate all chart and category pages"""
+def get_page_inputs():
+    """
+    Get the metadata each generated page depends on, keyed by output filename
+
+    Used by the incremental publish build to fingerprint pages so only pages
+    whose chart/category metadata changed are regenerated.
+    """
+    import inspect
+
+    # Page markup lives in the templates and these functions, so their source is an input too
+    renderer = '\n'.join([get_templates_fingerprint_source()] + [inspect.getsource(fn) for fn in (
+        get_source_url, get_related_charts, generate_navigation.__wrapped__,
+        generate_chart_page, generate_category_page, get_chart_filename
+    )])
+
+    nav = {cat_id: cat_info['title'] for cat_id, cat_info in CATEGORIES.items()}
+    inputs = {}
+
+    for chart_id, chart_info in CHARTS.items():
+        inputs[get_chart_filename(chart_id)] = {
+            'chart_id': chart_id,
+            'chart': chart_info,
+            'nav': nav,
+            'related': [(cid, get_chart_filename(cid), CHARTS[cid]['title'])
+                        for cid in get_related_charts(chart_id)],
+            'limited_data_charts': LIMITED_DATA_CHARTS,
+            'begin_at_zero': chart_id in ZERO_BASELINE_CHARTS,
+            'y_axis': Y_AXIS_FORMATS.get(chart_id, DEFAULT_Y_AXIS_FORMAT),
+            'start_date': DEFAULT_START_DATE,
+            'renderer': renderer
+        }
+
+    for cat_id, cat_info in CATEGORIES.items():
+        inputs[f'{cat_id}.html'] = {
+            'category_id': cat_id,
+            'category': cat_info,
+            'nav': nav,
+            'charts': [(cid, get_chart_filename(cid), CHARTS[cid]['title'], CHARTS[cid]['subtitle'],
+                        cid in LIMITED_DATA_CHARTS, cid in ZERO_BASELINE_CHARTS,
+                        Y_AXIS_FORMATS.get(cid, DEFAULT_Y_AXIS_FORMAT))
+                       for cid in cat_info['charts'] if cid in CHARTS],
+            'start_date': DEFAULT_START_DATE,
+            'renderer': renderer
+        }
+
+    return inputs
+
+def generate_all_pages(output_dir=None, only=None):
+    """
+    Generate all chart and category pages
+
+    Args:
+        output_dir: Output directory (default: github_site/charts)
+        only: Optional collection of filenames to regenerate (default: all pages)
+    """
 
     if output_dir is None:
         script_dir = Path(__file__).parent
@@ -844,24 +564,37 @@ def generate_all_pages(output_dir=None):
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Shared fragments are rendered once per build
+    generate_navigation.cache_clear()
+
+    chart_count = 0
+    category_count = 0
+
     # Generate individual chart pages
     for chart_id, chart_info in CHARTS.items():
-        html = generate_chart_page(chart_id, chart_info)
         filename = get_chart_filename(chart_id)
+        if only is not None and filename not in only:
+            continue
+        html = generate_chart_page(chart_id, chart_info)
         output_file = output_dir / filename
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
         print(f"✓ Generated {filename}")
+        chart_count += 1
 
     # Generate category overview pages
     for cat_id, cat_info in CATEGORIES.items():
+        if only is not None and f'{cat_id}.html' not in only:
+            continue
         html = generate_category_page(cat_id, cat_info)
         output_file = output_dir / f'{cat_id}.html'
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html)
         print(f"✓ Generated {cat_id}.html (category page)")
+        category_count += 1
 
-    print(f"\n✓ Generated {len(CHARTS)} chart pages + {len(CATEGORIES)} category pages")
+    print(f"\n✓ Generated {chart_count} chart pages + {category_count} category pages")
+    return True
 
 if __name__ == '__main__':
     generate_all_pages()
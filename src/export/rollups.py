@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Deal flow rollups for the public dashboard.
+
+Aggregates the curated master list into monthly and quarterly buckets -
+deal count, disclosed amount total and median amount - overall and by
+transaction type, sector and capital source. Buckets are stored in the
+deal_rollups table and exported as compact JSON for the chart helpers in
+github_site/js/main.js:
+
+    ChartUtils.createLineChart('dealsChart', rollup.count.all)
+    ChartUtils.createMultiLineChart('sectorChart', rollup.total.sector)
+
+Updates are incremental: deal_rollup_sources remembers what each master
+item last contributed (its month and a fingerprint of its date, amount and
+dimension values), so only the periods touched by added, edited or removed
+deals are recomputed.
+
+Deals are dated by their article's published date (curation date if
+unknown) and valued with the same amount the deal card shows (curated
+amount, else the AI-extracted one). Deals without a sector or capital
+source are left out of that dimension; a missing transaction type counts
+as "Unspecified".
+"""
+
+import hashlib
+import json
+import statistics
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import func
+
+from src.database import get_session, MasterItem, RawItem, AIExtraction, DealRollup, DealRollupSource
+from src.database.categories import SECTOR, CAPITAL_SOURCE, categories_by_owner
+from src.export.export_to_html_v2 import deal_amount_usd
+
+PERIODS = ('month', 'quarter')
+DIMENSIONS = ('transaction_type', 'sector', 'capital_source')
+METRICS = {
+    'count': 'Deals',
+    'total': 'Millions of Dollars',
+    'median': 'Millions of Dollars',
+}
+
+ROLLUP_FILES = {
+    'month': 'deal_rollups_monthly.json',
+    'quarter': 'deal_rollups_quarterly.json',
+}
+
+# Multi-line charts stay readable with a handful of lines
+MAX_SERIES_PER_DIMENSION = 6
+
+UNSPECIFIED = 'Unspecified'
+
+
+def month_start(date):
+    """First day of the date's month as YYYY-MM-01"""
+    return f"{date.year:04d}-{date.month:02d}-01"
+
+
+def quarter_start(month):
+    """First day of the quarter containing a YYYY-MM-01 month"""
+    year, month_number = int(month[:4]), int(month[5:7])
+    return f"{year:04d}-{(month_number - 1) // 3 * 3 + 1:02d}-01"
+
+
+def load_deal_rows(session):
+    """
+    Narrow projection of every master list deal (no ORM objects)
+
+    Returns:
+        Dict of master id -> {'month', 'amount', 'transaction_type',
+        'sector', 'capital_source'} (dimension values as lists)
+    """
+    deal_date = func.coalesce(RawItem.published_date, MasterItem.curated_at)
+    deals = session.query(
+        MasterItem.id, deal_date, deal_amount_usd(), MasterItem.transaction_type
+    ).join(
+        RawItem, MasterItem.item_id == RawItem.id
+    ).outerjoin(
+        AIExtraction, AIExtraction.item_id == MasterItem.item_id
+    )
+
+    sectors = categories_by_owner(session, MasterItem, SECTOR)
+    capital_sources = categories_by_owner(session, MasterItem, CAPITAL_SOURCE)
+
+    rows = {}
+    for master_id, date, amount, transaction_type in deals:
+        if date is None:
+            continue
+        if isinstance(date, str):
+            date = datetime.fromisoformat(date)
+        rows[master_id] = {
+            'month': month_start(date),
+            'amount': amount,
+            'transaction_type': [transaction_type or UNSPECIFIED],
+            'sector': sorted(sectors.get(master_id, [])),
+            'capital_source': sorted(capital_sources.get(master_id, []))
+        }
+    return rows
+
+
+def row_fingerprint(row):
+    """Short hash of everything a deal contributes to the rollups"""
+    return hashlib.sha1(repr(sorted(row.items())).encode('utf-8')).hexdigest()
+
+
+def find_dirty_periods(session, rows):
+    """
+    Sync deal_rollup_sources with the current deals (caller commits)
+
+    Returns:
+        Set of (period, period_start) buckets whose inputs changed
+    """
+    stored = {source.master_id: source for source in session.query(DealRollupSource)}
+    dirty_months = set()
+
+    for master_id, row in rows.items():
+        fingerprint = row_fingerprint(row)
+        source = stored.pop(master_id, None)
+
+        if source is None:
+            session.add(DealRollupSource(master_id=master_id, month_start=row['month'], fingerprint=fingerprint))
+            dirty_months.add(row['month'])
+        elif source.fingerprint != fingerprint:
+            dirty_months.update((source.month_start, row['month']))
+            source.month_start = row['month']
+            source.fingerprint = fingerprint
+
+    # Deals removed from the master list
+    for source in stored.values():
+        dirty_months.add(source.month_start)
+        session.delete(source)
+
+    return ({('month', month) for month in dirty_months} |
+            {('quarter', quarter_start(month)) for month in dirty_months})
+
+
+def compute_buckets(rows, periods):
+    """
+    Aggregate deals into the given (period, period_start) buckets
+
+    Returns:
+        Dict of (period, period_start, dimension, value) -> list of amounts
+        (None for undisclosed)
+    """
+    buckets = defaultdict(list)
+    for row in rows.values():
+        for period, start in (('month', row['month']), ('quarter', quarter_start(row['month']))):
+            if (period, start) not in periods:
+                continue
+            buckets[(period, start, 'all', '')].append(row['amount'])
+            for dimension in DIMENSIONS:
+                for value in row[dimension]:
+                    buckets[(period, start, dimension, value)].append(row['amount'])
+    return buckets
+
+
+def update_rollups(session, rebuild=False):
+    """
+    Recompute the rollup buckets affected by master list changes
+
+    Args:
+        session: Database session
+        rebuild: Recompute every period from scratch
+
+    Returns:
+        Number of (period, period_start) buckets recomputed
+    """
+    if rebuild:
+        session.query(DealRollupSource).delete()
+        session.query(DealRollup).delete()
+
+    rows = load_deal_rows(session)
+    dirty = find_dirty_periods(session, rows)
+    if not dirty:
+        session.commit()
+        return 0
+
+    for period in PERIODS:
+        starts = [start for p, start in dirty if p == period]
+        if starts:
+            session.query(DealRollup).filter(
+                DealRollup.period == period, DealRollup.period_start.in_(starts)
+            ).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    for (period, start, dimension, value), amounts in compute_buckets(rows, dirty).items():
+        disclosed = [amount for amount in amounts if amount is not None]
+        session.add(DealRollup(
+            period=period,
+            period_start=start,
+            dimension=dimension,
+            value=value,
+            deal_count=len(amounts),
+            disclosed_count=len(disclosed),
+            total_usd=sum(disclosed) if disclosed else None,
+            median_usd=statistics.median(disclosed) if disclosed else None,
+            updated_at=now
+        ))
+
+    session.commit()
+    return len(dirty)
+
+
+def _period_axis(first, last, period):
+    """Every period start from first to last inclusive (YYYY-MM-01 strings)"""
+    step = 1 if period == 'month' else 3
+    year, month = int(first[:4]), int(first[5:7])
+    axis = []
+    while True:
+        start = f"{year:04d}-{month:02d}-01"
+        if start > last:
+            return axis
+        axis.append(start)
+        month += step
+        if month > 12:
+            year, month = year + 1, month - 12
+
+
+def _metric_value(rollup, metric):
+    if rollup is None:
+        # No deals: zero count/total, no median
+        return None if metric == 'median' else 0
+    if metric == 'count':
+        return rollup.deal_count
+    amount = rollup.total_usd if metric == 'total' else rollup.median_usd
+    return round(amount / 1e6, 1) if amount is not None else (0 if metric == 'total' else None)
+
+
+def build_rollup_json(session, period):
+    """
+    Chart-ready rollups for one period
+
+    Every series is {series_id, name, units, data: [{date, value}]} over the
+    same zero-filled period axis, so 'all' series go to createLineChart and
+    per-dimension lists (top MAX_SERIES_PER_DIMENSION values by deal count)
+    go to createMultiLineChart.
+    """
+    rollups = session.query(DealRollup).filter(DealRollup.period == period).order_by(DealRollup.period_start).all()
+
+    result = {
+        'period': period,
+        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'units': METRICS
+    }
+    if not rollups:
+        for metric in METRICS:
+            result[metric] = {'all': None, **{dimension: [] for dimension in DIMENSIONS}}
+        return result
+
+    axis = _period_axis(rollups[0].period_start, rollups[-1].period_start, period)
+    by_key = defaultdict(dict)
+    totals = defaultdict(int)
+    for rollup in rollups:
+        by_key[(rollup.dimension, rollup.value)][rollup.period_start] = rollup
+        totals[(rollup.dimension, rollup.value)] += rollup.deal_count
+
+    def series(metric, dimension, value):
+        buckets = by_key[(dimension, value)]
+        suffix = f"_{dimension}_{value}" if value else ''
+        return {
+            'series_id': f"DEALS_{period}_{metric}{suffix}".upper(),
+            'name': value or 'All deals',
+            'units': METRICS[metric],
+            'data': [{'date': start, 'value': _metric_value(buckets.get(start), metric)} for start in axis]
+        }
+
+    for metric in METRICS:
+        result[metric] = {'all': series(metric, 'all', '')}
+        for dimension in DIMENSIONS:
+            values = sorted(
+                (value for dim, value in totals if dim == dimension),
+                key=lambda value: (-totals[(dimension, value)], value)
+            )[:MAX_SERIES_PER_DIMENSION]
+            result[metric][dimension] = [series(metric, dimension, value) for value in values]
+
+    return result
+
+
+def generate_rollups(output_dir=None, rebuild=False):
+    """
+    Update the rollup tables and write the chart JSON files
+
+    Args:
+        output_dir: Directory for the JSON files (default github_site/data)
+        rebuild: Recompute every period instead of only changed ones
+    """
+    if output_dir is None:
+        output_dir = Path(__file__).parent.parent.parent / 'github_site' / 'data'
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    session = get_session()
+    try:
+        recomputed = update_rollups(session, rebuild=rebuild)
+        print(f"Recomputed {recomputed} period buckets")
+
+        for period, filename in ROLLUP_FILES.items():
+            with open(output_dir / filename, 'w', encoding='utf-8') as f:
+                json.dump(build_rollup_json(session, period), f, separators=(',', ':'))
+            print(f"✓ Wrote {output_dir / filename}")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error generating deal rollups: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Deal flow rollups for the dashboard')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute every period from scratch')
+    parser.add_argument('--output-dir', default=None, help='Directory for the JSON files')
+    args = parser.parse_args()
+
+    generate_rollups(output_dir=args.output_dir, rebuild=args.rebuild)
@@ -0,0 +1,46 @@
+"""
+Jinja2 environment for static site page generation.
+
+Templates live in src/export/templates and are compiled once per process:
+the environment caches compiled templates, so generating all chart and
+category pages reuses the same compiled layout and page templates.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+
+@lru_cache(maxsize=None)
+def get_environment():
+    """Get the shared Jinja2 environment (created and cached on first use)"""
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(['html']),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        # Templates don't change during a build - skip mtime checks on every get
+        auto_reload=False
+    )
+
+
+def render(template_name, **context):
+    """Render a template with the given context"""
+    return get_environment().get_template(template_name).render(**context)
+
+
+def render_fragment(template_name, **context):
+    """Render a reusable fragment as safe markup for embedding in other pages"""
+    return Markup(render(template_name, **context).strip())
+
+
+def get_templates_fingerprint_source():
+    """Concatenated template sources (for build fingerprints)"""
+    return '\n'.join(
+        path.read_text(encoding='utf-8')
+        for path in sorted(TEMPLATES_DIR.glob('*.html'))
+    )
@@ -0,0 +1,182 @@
+"""Pre-scrape gating for newly ingested items.
+
+Runs between ingest and scrape_pending_items. Items with status 'new' are
+checked against the `gating` section of config/feeds.json and marked
+'auto_rejected' before any HTTP request or Claude call is spent on them:
+
+- trusted_sources (feed_source values, e.g. manual Telegram submissions) and
+  allowed_domains always pass; a source also matches on its prefix before
+  ':', so 'telegram' covers 'telegram:<username>'
+- blocked_domains are always rejected
+- items with an exclude keyword hit are rejected (reject_on_exclude)
+- items scoring below min_relevance_score are rejected
+
+Domains match on suffix, so "example.com" also covers "news.example.com".
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.database import RawItem, get_session
+from src.ingest.relevance import DEFAULT_CONFIG_PATH, get_scorer, parse_flags
+
+AUTO_REJECTED = 'auto_rejected'
+
+DEFAULT_GATING = {
+    'enabled': True,
+    'min_relevance_score': 0.15,
+    'reject_on_exclude': True,
+    'blocked_domains': [],
+    'allowed_domains': [],
+    'trusted_sources': ['telegram', 'Excel Import']
+}
+
+# Rough Claude usage per summarized article (see ai_summarizer.summarize_deal_article):
+# ~3.3k chars of prompt + up to 8k chars of article text at ~4 chars/token in,
+# a JSON extraction of a few hundred tokens out
+EST_INPUT_TOKENS_PER_ITEM = 2800
+EST_OUTPUT_TOKENS_PER_ITEM = 400
+
+
+def load_gating_config(config_path=None):
+    """Load the gating section of the feeds config (with defaults filled in)"""
+    import json
+
+    with open(config_path or DEFAULT_CONFIG_PATH, 'r') as f:
+        gating = json.load(f).get('gating', {})
+    return {**DEFAULT_GATING, **gating}
+
+
+def item_domain(url):
+    """Domain an item points to (following Google Alert redirects), without 'www.'"""
+    from src.scraper.article_scraper import extract_real_url_from_google_redirect
+
+    domain = urlparse(extract_real_url_from_google_redirect(url or '')).netloc.lower()
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def _domain_in(domain, domains):
+    return any(domain == d or domain.endswith('.' + d) for d in domains)
+
+
+def _source_in(feed_source, sources):
+    if not feed_source:
+        return False
+    return feed_source in sources or feed_source.split(':', 1)[0] in sources
+
+
+def gate_item(item, gating):
+    """
+    Decide whether an item should be scraped
+
+    Returns:
+        None if the item passes, otherwise a short rejection reason
+    """
+    domain = item_domain(item.url)
+
+    if _source_in(item.feed_source, gating['trusted_sources']) or _domain_in(domain, gating['allowed_domains']):
+        return None
+
+    if _domain_in(domain, gating['blocked_domains']):
+        return 'blocked domain'
+
+    _, excluded = parse_flags(item.relevance_flags)
+    if gating['reject_on_exclude'] and excluded:
+        return 'exclude keyword'
+
+    if (item.relevance_score or 0.0) < gating['min_relevance_score']:
+        return 'low relevance'
+
+    return None
+
+
+def gate_new_items(session=None, config_path=None, dry_run=False):
+    """
+    Mark low-relevance and excluded 'new' items as auto_rejected
+
+    Items ingested before relevance scoring existed are scored first.
+
+    Args:
+        session: Database session (a new one is opened and closed if None)
+        config_path: Feeds config path (default config/feeds.json)
+        dry_run: Report what would be rejected without changing anything
+
+    Returns:
+        Dict with checked/passed/rejected counts, rejections by reason and
+        estimated scrapes/tokens avoided
+    """
+    gating = load_gating_config(config_path)
+    report = {'checked': 0, 'passed': 0, 'rejected': 0, 'reasons': Counter(),
+              'scrapes_avoided': 0, 'tokens_avoided': 0}
+
+    if not gating['enabled']:
+        print("Gating disabled in config - all new items will be scraped")
+        return report
+
+    own_session = session is None
+    if own_session:
+        session = get_session()
+
+    try:
+        scorer = get_scorer(config_path)
+        items = session.query(RawItem).filter(RawItem.status == 'new').all()
+
+        for item in items:
+            if item.relevance_score is None:
+                scorer.apply(item)
+
+            report['checked'] += 1
+            reason = gate_item(item, gating)
+            if reason is None:
+                report['passed'] += 1
+                continue
+
+            report['rejected'] += 1
+            report['reasons'][reason] += 1
+            if not dry_run:
+                item.status = AUTO_REJECTED
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+    finally:
+        if own_session:
+            session.close()
+
+    report['scrapes_avoided'] = report['rejected']
+    report['tokens_avoided'] = report['rejected'] * (EST_INPUT_TOKENS_PER_ITEM + EST_OUTPUT_TOKENS_PER_ITEM)
+
+    print_report(report, dry_run=dry_run)
+    return report
+
+
+def print_report(report, dry_run=False):
+    """Print a one-block gating summary"""
+    verb = 'Would auto-reject' if dry_run else 'Auto-rejected'
+    print(f"GATING: {report['checked']} new items checked, {report['passed']} passed, "
+          f"{verb.lower()} {report['rejected']}")
+    for reason, count in report['reasons'].most_common():
+        print(f"  {reason}: {count}")
+    if report['rejected']:
+        print(f"  Avoided: {report['scrapes_avoided']} scrapes, "
+              f"~{report['tokens_avoided']:,} Claude tokens (estimated)")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    # Run from project root
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Auto-reject low-relevance new items before scraping')
+    parser.add_argument('--dry-run', action='store_true', help='Report without changing item status')
+    args = parser.parse_args()
+
+    gate_new_items(dry_run=args.dry_run)
@@ -0,0 +1,224 @@
+"""Keyword relevance scoring for ingested items.
+
+Compiles the `keywords` section of config/feeds.json once into a single
+regex shaped like a trie (shared prefixes factored out, so matching cost stays
+flat as keyword lists grow), then scores title + summary in one scan:
+
+- each distinct high-priority keyword adds TITLE_WEIGHT if it appears in the
+  title, otherwise SUMMARY_WEIGHT if it appears in the summary (capped at 1.0)
+- any exclude keyword hit forces the score to 0.0
+
+Matched keywords are stored in relevance_flags as a comma-separated list;
+exclude hits are prefixed with "exclude:".
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / 'config' / 'feeds.json'
+
+TITLE_WEIGHT = 0.25
+SUMMARY_WEIGHT = 0.15
+
+EXCLUDE_PREFIX = 'exclude:'
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so matches map back to keywords"""
+    return ' '.join(text.lower().split())
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex matching any keyword, with common prefixes factored out
+
+    e.g. ['defense', 'dod', 'dual-use'] -> d(?:efense|od|ual\-use).
+    Optional tails are greedy, so the longest keyword at a position wins.
+    Spaces inside keywords match any run of whitespace.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = []
+        leaves = []
+        for char in sorted(k for k in node if k):
+            escaped = r'\s+' if char == ' ' else re.escape(char)
+            rest = build(node[char])
+            if rest is None:
+                leaves.append(escaped)
+            else:
+                branches.append(escaped + rest)
+
+        if leaves:
+            branches.append(leaves[0] if len(leaves) == 1 else '[' + ''.join(leaves) + ']')
+        if not branches:
+            return None
+
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A keyword ends here; longer keywords continue optionally
+            pattern = f'(?:{pattern})?'
+        return pattern
+
+    return build(trie)
+
+
+class RelevanceScorer:
+    """Scores item text against high-priority and exclude keyword lists."""
+
+    def __init__(self, high_priority: Iterable[str], exclude: Iterable[str] = ()):
+        self.high_priority = [_normalize(k) for k in high_priority if k and k.strip()]
+        self.exclude = [_normalize(k) for k in exclude if k and k.strip()]
+        self.exclude_set = set(self.exclude)
+
+        keywords = set(self.high_priority) | self.exclude_set
+        if keywords:
+            # Text is lowercased before matching (much faster than re.IGNORECASE);
+            # \b keeps "dod" from matching "dodge"
+            self.pattern = re.compile(rf'\b{_trie_pattern(keywords)}\b')
+        else:
+            self.pattern = None
+        self.keywords = set(keywords)
+
+    def match(self, title: Optional[str], summary: Optional[str] = None) -> Tuple[dict, set]:
+        """
+        Find keyword hits in title and summary with one regex scan
+
+        Returns:
+            Tuple of (high-priority hits {keyword: in_title}, exclude hits set)
+        """
+        high = {}
+        excluded = set()
+        if self.pattern is None:
+            return high, excluded
+
+        title = title or ''
+        text = (f"{title}\n{summary}" if summary else title).lower()
+        title_end = len(title)
+
+        for m in self.pattern.finditer(text):
+            keyword = m.group(0)
+            if keyword not in self.keywords:
+                keyword = _normalize(keyword)
+            if keyword in self.exclude_set:
+                excluded.add(keyword)
+            else:
+                high[keyword] = high.get(keyword, False) or m.start() < title_end
+
+        return high, excluded
+
+    def score(self, title: Optional[str], summary: Optional[str] = None) -> Tuple[float, str]:
+        """
+        Score an item
+
+        Args:
+            title: Item title
+            summary: RSS summary or other short description
+
+        Returns:
+            Tuple of (relevance_score 0.0-1.0, relevance_flags string)
+        """
+        high, excluded = self.match(title, summary)
+
+        if excluded:
+            score = 0.0
+        else:
+            score = sum(TITLE_WEIGHT if in_title else SUMMARY_WEIGHT for in_title in high.values())
+            score = round(min(score, 1.0), 2)
+
+        flags = [k for k in self.high_priority if k in high]
+        flags += [EXCLUDE_PREFIX + k for k in self.exclude if k in excluded]
+
+        return score, ','.join(flags)
+
+    def apply(self, item) -> None:
+        """Set relevance_score/relevance_flags on a RawItem from its title and rss_summary"""
+        item.relevance_score, item.relevance_flags = self.score(item.title, item.rss_summary)
+
+
+@lru_cache(maxsize=None)
+def _load_scorer(config_path: str) -> RelevanceScorer:
+    with open(config_path, 'r') as f:
+        keywords = json.load(f).get('keywords', {})
+    return RelevanceScorer(keywords.get('high_priority', []), keywords.get('exclude', []))
+
+
+def get_scorer(config_path=None) -> RelevanceScorer:
+    """Get the scorer for a feeds config (compiled once per process)"""
+    return _load_scorer(str(Path(config_path or DEFAULT_CONFIG_PATH).resolve()))
+
+
+def parse_flags(flags: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Split a relevance_flags string into (high-priority keywords, exclude keywords)"""
+    high, excluded = [], []
+    for flag in (flags or '').split(','):
+        if flag.startswith(EXCLUDE_PREFIX):
+            excluded.append(flag[len(EXCLUDE_PREFIX):])
+        elif flag:
+            high.append(flag)
+    return high, excluded
+
+
+def benchmark(n: int = 100_000, seed: int = 42):
+    """
+    Benchmark scoring n synthetic entries with the compiled matcher vs one
+    word-boundary regex per keyword, with the configured keywords and with a
+    200-keyword list to show how each scales.
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    configured = get_scorer()
+    filler = ('the company said on tuesday that its new program would expand operations '
+              'across several states while analysts expect further growth next year').split()
+    synthetic = [f'keyword{i} term' for i in range(200 - len(configured.high_priority))]
+    large = RelevanceScorer(configured.high_priority + synthetic, configured.exclude)
+
+    def sentence(keywords, words, hits):
+        parts = rng.sample(filler, words)
+        for _ in range(hits):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(keywords))
+        return ' '.join(parts).capitalize()
+
+    print(f"Scoring {n:,} synthetic entries (title ~10 words, summary ~20 words)\n")
+    print(f"{'Keywords':>10}{'Per-keyword regex':>20}{'Compiled trie':>18}{'Speedup':>10}")
+    print("-" * 58)
+
+    for scorer in (configured, large):
+        keywords = scorer.high_priority + scorer.exclude
+        entries = [(sentence(keywords, 10, rng.randint(0, 2)), sentence(keywords, 20, rng.randint(0, 3)))
+                   for _ in range(n)]
+
+        # Baseline: the obvious loop, one search per keyword (timed on a sample - it is slow)
+        per_keyword = [re.compile(rf'\b{re.escape(k)}\b') for k in keywords]
+        sample = entries[:10_000]
+        start = time.perf_counter()
+        for title, summary in sample:
+            text = f"{title}\n{summary}".lower()
+            [p for p in per_keyword if p.search(text)]
+        naive_rate = len(sample) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for title, summary in entries:
+            scorer.score(title, summary)
+        compiled_rate = n / (time.perf_counter() - start)
+
+        print(f"{len(keywords):>10}{naive_rate:>15,.0f}/sec{compiled_rate:>13,.0f}/sec"
+              f"{compiled_rate / naive_rate:>9.1f}x")
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python src/ingest/relevance.py [n]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
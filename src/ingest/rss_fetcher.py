@@ -10,6 +10,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.database import RawItem, get_session
+from src.ingest.relevance import get_scorer
+from src.utils.metrics import counter, span
+
+feed_entries = counter('rss_feed_entries_total', 'Entries parsed from RSS feeds')
 
 
 def load_config(config_path='config/feeds.json'):
@@ -23,7 +27,11 @@ def parse_feed(feed_url, feed_name):
     print(f"Fetching feed: {feed_name}")
     print(f"URL: {feed_url}")
 
-    feed = feedparser.parse(feed_url)
+    with span('rss', feed=feed_name) as feed_span:
+        feed = feedparser.parse(feed_url)
+        feed_span.fields['entries'] = len(feed.entries)
+        if feed.bozo and not feed.entries:
+            feed_span.fail(feed.bozo_exception)
 
     if feed.bozo:
         print(f"Warning: Feed parsing had issues: {feed.bozo_exception}")
@@ -45,12 +53,16 @@ def parse_feed(feed_url, feed_name):
 
         entries.append(item)
 
+    feed_entries.inc(len(entries))
     print(f"Found {len(entries)} entries")
     return entries
 
 
-def save_to_database(entries, session):
-    """Save RSS entries to database (skip duplicates)."""
+def save_to_database(entries, session, scorer=None):
+    """Save RSS entries to database (skip duplicates), scoring relevance on the way in."""
+    if scorer is None:
+        scorer = get_scorer()
+
     new_count = 0
     duplicate_count = 0
 
@@ -71,6 +83,7 @@ def save_to_database(entries, session):
             feed_source=entry['feed_source'],
             status='new'
         )
+        scorer.apply(raw_item)
 
         session.add(raw_item)
         new_count += 1
@@ -90,6 +103,7 @@ def fetch_all_feeds(config_path='config/feeds.json', db_path='databases/tracker.
 
     # Load configuration
     config = load_config(config_path)
+    scorer = get_scorer(config_path)
 
     # Get database session
     session = get_session(db_path)
@@ -105,7 +119,7 @@ def fetch_all_feeds(config_path='config/feeds.json', db_path='databases/tracker.
 
         print()
         entries = parse_feed(feed_config['url'], feed_config['name'])
-        new, dupes = save_to_database(entries, session)
+        new, dupes = save_to_database(entries, session, scorer)
 
         total_new += new
         total_duplicates += dupes
@@ -1,11 +1,17 @@
 """Notification modules for Defense Capital Tracker."""
 
-from .email_sender import send_digest_email, generate_action_token, verify_action_token
+from .email_sender import (
+    send_digest_email, send_digests, get_transport, Recipient,
+    generate_action_token, verify_action_token
+)
 from .telegram_bot import handle_telegram_update
 from .send_digest import send_pending_digest
 
 __all__ = [
     'send_digest_email',
+    'send_digests',
+    'get_transport',
+    'Recipient',
     'generate_action_token',
     'verify_action_token',
     'handle_telegram_update',
@@ -1,7 +1,27 @@
 """Email sender for Defense Capital Tracker digest.
 
-Uses Gmail SMTP with App Password for sending HTML email digests
-with HMAC-signed approve/reject action links.
+Sends HTML email digests with HMAC-signed approve/reject action links.
+
+Mail goes through a transport that keeps one authenticated connection open
+for a whole batch, reconnecting if the server drops it, so a digest per
+analyst costs one TLS handshake and login in total instead of one each:
+
+    with get_transport() as transport:
+        send_digests(items, recipients, transport=transport)
+
+Backends (EMAIL_BACKEND):
+    gmail    Gmail SMTP over SSL with an App Password (default)
+             GMAIL_ADDRESS, GMAIL_APP_PASSWORD
+    smtp     Any SMTP server: SMTP_HOST, SMTP_PORT, SMTP_USERNAME,
+             SMTP_PASSWORD, SMTP_SECURITY (ssl, starttls or none), EMAIL_FROM.
+             For local testing, run a sink with
+             `python -m aiosmtpd -n -l localhost:8025` and set
+             SMTP_HOST=localhost SMTP_PORT=8025 SMTP_SECURITY=none
+    console  Print messages instead of sending them
+
+Recipients come from DIGEST_RECIPIENTS, a comma-separated list where each
+entry may carry a sector filter ("ana@x.com=Space|AI/ML" only gets deals
+in those sectors), or the single DIGEST_RECIPIENT.
 """
 
 import os
@@ -11,7 +31,7 @@ import time
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -27,11 +47,30 @@ class DigestItem:
     summary: Optional[str]
     url: str
     relevance_score: Optional[float]
+    reminder: bool = False  # Sent before and still awaiting triage
+
+
+@dataclass
+class Recipient:
+    """Digest recipient, optionally limited to some sectors."""
+    email: str
+    name: Optional[str] = None
+    sectors: Optional[List[str]] = None  # None: every deal
+
+    def wants(self, item: DigestItem) -> bool:
+        """Whether an item matches this recipient's sector filter."""
+        if not self.sectors:
+            return True
+        item_sectors = {s.strip() for s in (item.sectors or '').split(',') if s.strip()}
+        return bool(item_sectors & set(self.sectors))
 
 
 # Token expiry: 24 hours
 TOKEN_EXPIRY_SECONDS = 24 * 60 * 60
 
+# Servers cap messages per session (Gmail: ~100); reconnect before hitting it
+MAX_MESSAGES_PER_CONNECTION = 100
+
 
 def generate_action_token(item_id: int, action: str) -> str:
     """Generate HMAC-signed token for email action links.
@@ -101,12 +140,25 @@ def verify_action_token(token: str) -> Tuple[bool, Optional[int], Optional[str],
         return False, None, None, f"Token parse error: {e}"
 
 
-def build_email_html(items: List[DigestItem], base_url: str) -> str:
+def describe_counts(items: List[DigestItem]) -> str:
+    """Item counts for subjects and headlines, e.g. "3 new items, 2 still pending"."""
+    reminders = sum(1 for item in items if item.reminder)
+    new = len(items) - reminders
+    parts = []
+    if new or not reminders:
+        parts.append(f"{new} new item{'s' if new != 1 else ''}")
+    if reminders:
+        parts.append(f"{reminders} still pending")
+    return ', '.join(parts)
+
+
+def build_email_html(items: List[DigestItem], base_url: str, recipient: Optional[Recipient] = None) -> str:
     """Build HTML email content with deal cards and action links.
 
     Args:
         items: List of DigestItem objects to include
         base_url: Base URL for action links (e.g., https://app.railway.app)
+        recipient: Personalizes the greeting and notes the sector filter
 
     Returns:
         HTML string for email body
@@ -133,12 +185,17 @@ def build_email_html(items: List[DigestItem], base_url: str) -> str:
             color = "#4caf50" if item.relevance_score >= 0.5 else "#ff9800" if item.relevance_score >= 0.3 else "#f44336"
             relevance_indicator = f'<span style="color:{color};font-size:11px;">●</span>'
 
+        reminder_badge = ""
+        if item.reminder:
+            reminder_badge = '<span style="background:#fff3e0;color:#e65100;padding:2px 6px;border-radius:3px;font-size:11px;margin-left:8px;">Still pending</span>'
+
         cards_html += f"""
         <div style="border:1px solid #e0e0e0;border-radius:8px;padding:16px;margin-bottom:16px;background:#fafafa;">
             <div style="margin-bottom:8px;">
                 {relevance_indicator}
                 <strong style="font-size:14px;">{item.company or 'Unknown Company'}</strong>
                 {f'<span style="color:#1976d2;margin-left:8px;">{item.deal_amount}</span>' if item.deal_amount else ''}
+                {reminder_badge}
             </div>
             <div style="font-size:13px;color:#333;margin-bottom:8px;">
                 {item.title[:100]}{'...' if len(item.title) > 100 else ''}
@@ -157,6 +214,13 @@ def build_email_html(items: List[DigestItem], base_url: str) -> str:
 
     triage_url = f"{base_url}/"
 
+    greeting = ""
+    if recipient is not None and recipient.name:
+        greeting = f'<p style="color:#333;font-size:14px;margin-bottom:4px;">Hi {recipient.name},</p>'
+    sector_note = ""
+    if recipient is not None and recipient.sectors:
+        sector_note = f" in {', '.join(recipient.sectors)}"
+
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -167,8 +231,9 @@ def build_email_html(items: List[DigestItem], base_url: str) -> str:
     <body style="font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;max-width:600px;margin:0 auto;padding:20px;background:#f5f5f5;">
         <div style="background:white;padding:24px;border-radius:8px;box-shadow:0 1px 3px rgba(0,0,0,0.1);">
             <h1 style="color:#1a237e;font-size:20px;margin-bottom:8px;">Defense Capital Tracker</h1>
+            {greeting}
             <p style="color:#666;font-size:14px;margin-bottom:24px;">
-                {len(items)} new item{'s' if len(items) != 1 else ''} ready for triage
+                {describe_counts(items)}{sector_note} ready for triage
             </p>
 
             {cards_html}
@@ -190,68 +255,296 @@ def build_email_html(items: List[DigestItem], base_url: str) -> str:
     return html
 
 
-def send_digest_email(items: List[DigestItem], base_url: Optional[str] = None) -> bool:
-    """Send digest email with pending items.
+class MailTransport:
+    """Base class for mail backends: open once, send many, close.
 
-    Requires environment variables:
-        GMAIL_ADDRESS: Gmail address to send from
-        GMAIL_APP_PASSWORD: Gmail app password (16 chars)
-        DIGEST_RECIPIENT: Email address to send to
-        APP_BASE_URL: Base URL for action links (optional, overridden by base_url param)
+    Use as a context manager. Subclasses implement _send (and _connect /
+    _disconnect if they hold a connection).
+    """
 
-    Args:
-        items: List of DigestItem objects to include
-        base_url: Override for APP_BASE_URL env var
+    def __init__(self, sender: str):
+        self.sender = sender
+        self.sent = 0
+        self.connections = 0
 
-    Returns:
-        True if email sent successfully, False otherwise
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        """Send one message (raises on permanent failure)."""
+        self._send(msg, recipients)
+        self.sent += 1
+
+    def _send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SMTPTransport(MailTransport):
+    """SMTP backend holding one authenticated connection across sends.
+
+    The connection is opened on the first send and reused until close().
+    If the server drops it (idle timeout, 421 "try again later", network
+    error) the transport reconnects and retries the message, up to
+    max_retries times. Authentication and recipient errors are not retried.
     """
-    if not items:
-        print("No items to send in digest")
-        return True
 
-    gmail_address = os.environ.get('GMAIL_ADDRESS')
-    gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
-    recipient = os.environ.get('DIGEST_RECIPIENT')
-    base_url = base_url or os.environ.get('APP_BASE_URL', 'http://localhost:8000')
+    def __init__(self, host: str, port: int, sender: str, username: Optional[str] = None,
+                 password: Optional[str] = None, security: str = 'ssl', timeout: float = 30,
+                 max_retries: int = 2, retry_delay: float = 1.0):
+        super().__init__(sender)
+        if security not in ('ssl', 'starttls', 'none'):
+            raise ValueError(f"Unknown SMTP security mode: {security}")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._server = None
+        self._messages_on_connection = 0
+
+    def _connect(self) -> None:
+        if self.security == 'ssl':
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == 'starttls':
+                server.starttls()
+        try:
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._messages_on_connection = 0
+        self.connections += 1
+
+    def _disconnect(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+    def _send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._server is not None and self._messages_on_connection >= MAX_MESSAGES_PER_CONNECTION:
+                    self._disconnect()
+                if self._server is None:
+                    self._connect()
+                self._server.send_message(msg, from_addr=self.sender, to_addrs=recipients)
+                self._messages_on_connection += 1
+                return
+
+            except (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                raise
+            except smtplib.SMTPResponseException as e:
+                # 4xx is transient (421 = server closing the session); 5xx is final
+                self._disconnect()
+                if not 400 <= e.smtp_code < 500 or attempt == self.max_retries:
+                    raise
+            except OSError:
+                # Dropped connection (SMTPServerDisconnected), timeout, network error
+                self._server = None
+                if attempt == self.max_retries:
+                    raise
+
+            print(f"  ↻ SMTP connection lost, reconnecting (attempt {attempt + 2}/{self.max_retries + 1})")
+            time.sleep(self.retry_delay * (attempt + 1))
+
+    def close(self) -> None:
+        self._disconnect()
+
+
+class ConsoleTransport(MailTransport):
+    """Backend that prints messages instead of sending them (keeps them in outbox)."""
+
+    def __init__(self, sender: str = 'digest@localhost'):
+        super().__init__(sender)
+        self.outbox = []
+
+    def _send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        self.outbox.append((recipients, msg))
+        print(f"  [console] To: {', '.join(recipients)} | Subject: {msg['Subject']}")
+
+
+def get_transport(backend: Optional[str] = None) -> MailTransport:
+    """Create the mail transport configured by EMAIL_BACKEND (see module docstring).
+
+    Raises:
+        ValueError: Unknown backend or missing configuration
+    """
+    backend = (backend or os.environ.get('EMAIL_BACKEND', 'gmail')).lower()
 
-    if not all([gmail_address, gmail_password, recipient]):
-        print("Missing email configuration. Required: GMAIL_ADDRESS, GMAIL_APP_PASSWORD, DIGEST_RECIPIENT")
-        return False
+    if backend == 'console':
+        return ConsoleTransport(os.environ.get('EMAIL_FROM') or os.environ.get('GMAIL_ADDRESS') or 'digest@localhost')
+
+    if backend == 'gmail':
+        gmail_address = os.environ.get('GMAIL_ADDRESS')
+        gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
+        if not (gmail_address and gmail_password):
+            raise ValueError("Missing email configuration. Required: GMAIL_ADDRESS, GMAIL_APP_PASSWORD")
+        return SMTPTransport('smtp.gmail.com', 465, gmail_address, gmail_address, gmail_password, security='ssl')
+
+    if backend == 'smtp':
+        host = os.environ.get('SMTP_HOST')
+        sender = os.environ.get('EMAIL_FROM') or os.environ.get('SMTP_USERNAME')
+        if not (host and sender):
+            raise ValueError("Missing email configuration. Required: SMTP_HOST, EMAIL_FROM (or SMTP_USERNAME)")
+        security = os.environ.get('SMTP_SECURITY', 'starttls').lower()
+        default_port = {'ssl': 465, 'starttls': 587}.get(security, 25)
+        return SMTPTransport(
+            host, int(os.environ.get('SMTP_PORT', default_port)), sender,
+            os.environ.get('SMTP_USERNAME'), os.environ.get('SMTP_PASSWORD'), security=security
+        )
+
+    raise ValueError(f"Unknown EMAIL_BACKEND: {backend}")
 
-    # Build email
+
+def get_recipients() -> List[Recipient]:
+    """Digest recipients from DIGEST_RECIPIENTS (or DIGEST_RECIPIENT).
+
+    DIGEST_RECIPIENTS="lead@x.com, space@x.com=Space|Satellites"
+    """
+    entries = os.environ.get('DIGEST_RECIPIENTS') or os.environ.get('DIGEST_RECIPIENT') or ''
+
+    recipients = []
+    for entry in entries.split(','):
+        email, _, sectors = entry.strip().partition('=')
+        if email:
+            recipients.append(Recipient(
+                email=email.strip(),
+                sectors=[s.strip() for s in sectors.split('|') if s.strip()] or None
+            ))
+    return recipients
+
+
+def build_digest_message(items: List[DigestItem], recipient: Recipient, sender: str,
+                         base_url: str) -> MIMEMultipart:
+    """Build one recipient's digest (subject, plain text and HTML parts)."""
     msg = MIMEMultipart('alternative')
-    msg['Subject'] = f"Defense Tracker: {len(items)} new item{'s' if len(items) != 1 else ''} for review"
-    msg['From'] = gmail_address
-    msg['To'] = recipient
+    msg['Subject'] = f"Defense Tracker: {describe_counts(items)} for review"
+    msg['From'] = sender
+    msg['To'] = recipient.email
 
     # Plain text fallback
-    plain_text = f"Defense Capital Tracker: {len(items)} new items ready for triage.\n\n"
+    plain_text = f"Defense Capital Tracker: {describe_counts(items)} ready for triage.\n\n"
     for item in items:
-        plain_text += f"- {item.company or 'Unknown'}: {item.title[:80]}\n"
+        plain_text += f"- {item.company or 'Unknown'}: {item.title[:80]}{' (still pending)' if item.reminder else ''}\n"
     plain_text += f"\nOpen triage interface: {base_url}/"
 
     # HTML version
-    html_content = build_email_html(items, base_url)
+    html_content = build_email_html(items, base_url, recipient)
 
     msg.attach(MIMEText(plain_text, 'plain'))
     msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+def send_digests(items: List[DigestItem], recipients: List[Recipient], base_url: Optional[str] = None,
+                 transport: Optional[MailTransport] = None) -> Dict[str, int]:
+    """Send each recipient a digest of the items matching their sector filter.
+
+    All messages share one transport connection. A recipient whose message
+    fails is counted and skipped; the rest still get theirs.
+
+    Args:
+        items: All candidate items
+        recipients: Who to send to
+        base_url: Override for APP_BASE_URL env var
+        transport: Open transport to use (default: get_transport(), closed afterwards)
+
+    Returns:
+        Dict with counts of 'sent', 'empty' (no matching items) and 'failed'
+    """
+    base_url = base_url or os.environ.get('APP_BASE_URL', 'http://localhost:8000')
+    counts = {'sent': 0, 'empty': 0, 'failed': 0}
+
+    own_transport = transport is None
+    if own_transport:
+        transport = get_transport()
 
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(gmail_address, gmail_password)
-            server.sendmail(gmail_address, recipient, msg.as_string())
+        for recipient in recipients:
+            selected = [item for item in items if recipient.wants(item)]
+            if not selected:
+                counts['empty'] += 1
+                continue
+
+            msg = build_digest_message(selected, recipient, transport.sender, base_url)
+            try:
+                transport.send(msg, [recipient.email])
+                counts['sent'] += 1
+                print(f"Digest email sent to {recipient.email} with {len(selected)} items")
+            except smtplib.SMTPAuthenticationError:
+                # Nothing else will get through either
+                raise
+            except Exception as e:
+                counts['failed'] += 1
+                print(f"Failed to send email to {recipient.email}: {e}")
+    finally:
+        if own_transport:
+            transport.close()
+
+    return counts
+
+
+def send_digest_email(items: List[DigestItem], base_url: Optional[str] = None,
+                      recipients: Optional[List[Recipient]] = None,
+                      transport: Optional[MailTransport] = None) -> bool:
+    """Send digest email with pending items.
 
-        print(f"Digest email sent to {recipient} with {len(items)} items")
+    Requires environment variables:
+        GMAIL_ADDRESS: Gmail address to send from
+        GMAIL_APP_PASSWORD: Gmail app password (16 chars)
+        DIGEST_RECIPIENT: Email address to send to (or DIGEST_RECIPIENTS for several)
+        APP_BASE_URL: Base URL for action links (optional, overridden by base_url param)
+    (or another EMAIL_BACKEND, see module docstring)
+
+    Args:
+        items: List of DigestItem objects to include
+        base_url: Override for APP_BASE_URL env var
+        recipients: Override for DIGEST_RECIPIENTS / DIGEST_RECIPIENT
+        transport: Open transport to reuse (default: a new one for this call)
+
+    Returns:
+        True if every recipient's email was sent successfully, False otherwise
+    """
+    if not items:
+        print("No items to send in digest")
         return True
 
+    recipients = recipients if recipients is not None else get_recipients()
+    if not recipients:
+        print("Missing email configuration. Required: DIGEST_RECIPIENT or DIGEST_RECIPIENTS")
+        return False
+
+    try:
+        counts = send_digests(items, recipients, base_url=base_url, transport=transport)
     except smtplib.SMTPAuthenticationError:
-        print("Gmail authentication failed. Check GMAIL_ADDRESS and GMAIL_APP_PASSWORD")
+        print("SMTP authentication failed. Check GMAIL_ADDRESS and GMAIL_APP_PASSWORD (or SMTP_USERNAME/SMTP_PASSWORD)")
+        return False
+    except ValueError as e:
+        print(e)
         return False
     except Exception as e:
         print(f"Failed to send email: {e}")
         return False
 
+    return counts['failed'] == 0
+
 
 if __name__ == "__main__":
     # Test with sample data
@@ -290,3 +583,13 @@ if __name__ == "__main__":
 
     valid, item_id, action, error = verify_action_token(token)
     print(f"Verified: valid={valid}, item_id={item_id}, action={action}")
+
+    print("\nTesting personalized digests over one transport (console backend)...")
+    recipients = [
+        Recipient(email="lead@example.com", name="Lead"),
+        Recipient(email="space@example.com", sectors=["Space"]),
+        Recipient(email="autonomy@example.com", sectors=["Autonomous Systems"]),
+    ]
+    with get_transport('console') as transport:
+        counts = send_digests(test_items, recipients, "http://localhost:8000", transport=transport)
+    print(f"Counts: {counts}")
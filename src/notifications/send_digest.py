@@ -4,23 +4,88 @@ Queries items that:
 1. Have been successfully scraped
 2. Have AI summaries
 3. Are not yet in master list or rejected
+4. Have not been emailed to the recipient before
+
+Every item sent is recorded in the notifications ledger (one row per item
+per channel, the channel being "email:<recipient>"), so each run only
+mails what is new. Candidates are limited to summaries at or after the
+channel's watermark - the newest summary it was sent, minus a little slack
+for summaries committed late - so the query only looks at recent
+extractions however large the corpus grows. The oldest unsent summaries go
+first; anything past --limit waits for the next run.
+
+A channel with no ledger rows yet (a new recipient, or the first run on an
+existing database) starts from summaries of the last --lookback hours
+(default NEW_CHANNEL_LOOKBACK_HOURS) instead of the whole backlog, so it
+isn't sent the oldest pending items from the full history.
+
+With --remind, items sent more than --remind-after hours ago that are
+still awaiting triage are included again, marked "still pending".
 
 This script is called by GitHub Actions after RSS processing completes.
 """
 
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.database import RawItem, ArticleContent, AIExtraction, MasterItem, RejectedItem, get_session
-from src.notifications.email_sender import DigestItem, send_digest_email
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+
+from src.database import RawItem, ArticleContent, AIExtraction, MasterItem, RejectedItem, Notification, get_session
+from src.database.categories import SECTOR, in_category
+from src.notifications.email_sender import DigestItem, Recipient, get_recipients, get_transport, send_digest_email
+
+# Summaries committed up to this long after a newer one was sent are still picked up
+WATERMARK_SLACK = timedelta(minutes=30)
+REMIND_AFTER_HOURS = 24
+# Starting watermark for a channel that has never been sent anything
+NEW_CHANNEL_LOOKBACK_HOURS = 72
+
+
+def pending_items_query():
+    """Projection of the DigestItem fields for items ready for triage.
+
+    Items must have been scraped successfully and have a complete AI
+    summary, and must not be in the master list or rejected (anti-joins on
+    the unique item_id columns, so each check is one index lookup per row).
+    Columns are labelled with DigestItem field names.
+    """
+    return select(
+        RawItem.id.label('item_id'),
+        RawItem.title,
+        AIExtraction.company,
+        AIExtraction.deal_amount,
+        func.coalesce(func.nullif(AIExtraction.transaction_type, ''), AIExtraction.deal_type).label('deal_type'),
+        AIExtraction.sectors,
+        func.coalesce(func.nullif(AIExtraction.strategic_significance, ''), AIExtraction.ai_summary).label('summary'),
+        RawItem.url,
+        RawItem.relevance_score
+    ).join(
+        ArticleContent, RawItem.id == ArticleContent.item_id
+    ).join(
+        AIExtraction, RawItem.id == AIExtraction.item_id
+    ).outerjoin(
+        MasterItem, RawItem.id == MasterItem.item_id
+    ).outerjoin(
+        RejectedItem, RawItem.id == RejectedItem.item_id
+    ).where(
+        ArticleContent.scrape_success == True,
+        AIExtraction.summary_complete == True,
+        MasterItem.id.is_(None),
+        RejectedItem.id.is_(None)
+    )
 
 
 def get_pending_items(limit: int = 20) -> list:
     """Query pending items with AI summaries ready for triage.
 
+    Runs a single query; rows go straight into DigestItems without loading
+    ORM objects.
+
     Args:
         limit: Maximum number of items to include in digest
 
@@ -30,81 +95,199 @@ def get_pending_items(limit: int = 20) -> list:
     session = get_session()
 
     try:
-        # Get items that:
-        # 1. Have been successfully scraped
-        # 2. Have AI extraction
-        # 3. Are not in master list
-        # 4. Are not rejected
-        items = session.query(RawItem).join(
-            ArticleContent, RawItem.id == ArticleContent.item_id
-        ).join(
-            AIExtraction, RawItem.id == AIExtraction.item_id
-        ).filter(
-            ArticleContent.scrape_success == True,
-            AIExtraction.summary_complete == True,
-            ~RawItem.id.in_(session.query(MasterItem.item_id)),
-            ~RawItem.id.in_(session.query(RejectedItem.item_id))
-        ).order_by(
-            RawItem.published_date.desc()
-        ).limit(limit).all()
-
-        digest_items = []
-        for item in items:
-            extraction = session.query(AIExtraction).filter_by(item_id=item.id).first()
-
-            digest_items.append(DigestItem(
-                item_id=item.id,
-                title=item.title,
-                company=extraction.company if extraction else None,
-                deal_amount=extraction.deal_amount if extraction else None,
-                deal_type=extraction.transaction_type or (extraction.deal_type if extraction else None),
-                sectors=extraction.sectors if extraction else None,
-                summary=extraction.strategic_significance or (extraction.ai_summary if extraction else None),
-                url=item.url,
-                relevance_score=item.relevance_score
-            ))
-
-        return digest_items
+        query = pending_items_query().order_by(RawItem.published_date.desc()).limit(limit)
+        return [DigestItem(**row._mapping) for row in session.execute(query)]
 
     finally:
         session.close()
 
 
-def send_pending_digest(limit: int = 20, dry_run: bool = False) -> bool:
-    """Send email digest with pending items.
+def email_channel(recipient: Recipient) -> str:
+    """Ledger channel for a digest recipient."""
+    return f"email:{recipient.email.lower()}"
+
+
+def _sector_filter(query, sectors):
+    if sectors:
+        query = query.where(or_(*(in_category(AIExtraction, SECTOR, sector) for sector in sectors)))
+    return query
+
+
+def get_new_items(session, channel: str, limit: int = 20, sectors: list = None,
+                  lookback_hours: float = NEW_CHANNEL_LOOKBACK_HOURS) -> list:
+    """Pending items never sent on a channel, oldest summary first.
+
+    Args:
+        session: Database session
+        channel: Ledger channel (see email_channel)
+        limit: Maximum number of items
+        sectors: Only items in one of these sectors (None: all)
+        lookback_hours: For a channel with no ledger rows yet, only items
+            summarized within this many hours
+
+    Returns:
+        List of (DigestItem, extracted_at) tuples
+    """
+    watermark = session.scalar(
+        select(func.max(Notification.summarized_at)).where(Notification.channel == channel)
+    )
+
+    query = pending_items_query().add_columns(
+        AIExtraction.extracted_at
+    ).outerjoin(
+        Notification, and_(Notification.item_id == RawItem.id, Notification.channel == channel)
+    ).where(
+        Notification.id.is_(None)
+    )
+    if watermark is not None:
+        query = query.where(AIExtraction.extracted_at >= watermark - WATERMARK_SLACK)
+    else:
+        query = query.where(AIExtraction.extracted_at >= datetime.utcnow() - timedelta(hours=lookback_hours))
+    query = _sector_filter(query, sectors).order_by(AIExtraction.extracted_at, RawItem.id).limit(limit)
+
+    items = []
+    for row in session.execute(query):
+        fields = dict(row._mapping)
+        extracted_at = fields.pop('extracted_at')
+        items.append((DigestItem(**fields), extracted_at))
+    return items
+
+
+def get_reminder_items(session, channel: str, limit: int = 20, sectors: list = None,
+                       remind_after_hours: float = REMIND_AFTER_HOURS) -> list:
+    """Items sent on a channel a while ago and still awaiting triage, longest waiting first.
+
+    Returns:
+        List of DigestItem objects (reminder=True)
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=remind_after_hours)
+    query = pending_items_query().join(
+        Notification, and_(Notification.item_id == RawItem.id, Notification.channel == channel)
+    ).where(
+        Notification.notified_at < cutoff
+    )
+    query = _sector_filter(query, sectors).order_by(Notification.notified_at).limit(limit)
+
+    return [DigestItem(**row._mapping, reminder=True) for row in session.execute(query)]
+
+
+def record_notifications(session, channel: str, new_items: list, reminders: list):
+    """Add sent items to the ledger (caller commits).
+
+    Args:
+        session: Database session
+        channel: Ledger channel
+        new_items: (DigestItem, extracted_at) tuples sent for the first time
+        reminders: DigestItems sent again
+    """
+    now = datetime.utcnow()
+    rows = [
+        {'channel': channel, 'item_id': item.item_id, 'summarized_at': extracted_at,
+         'first_notified_at': now, 'notified_at': now, 'notify_count': 1}
+        for item, extracted_at in new_items
+    ]
+    if rows:
+        stmt = insert(Notification).values(rows)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=['channel', 'item_id'],
+            set_={'notified_at': now, 'notify_count': Notification.notify_count + 1}
+        ))
+
+    if reminders:
+        session.query(Notification).filter(
+            Notification.channel == channel,
+            Notification.item_id.in_([item.item_id for item in reminders])
+        ).update({
+            Notification.notified_at: now,
+            Notification.notify_count: Notification.notify_count + 1
+        }, synchronize_session=False)
+
+
+def send_pending_digest(limit: int = 20, dry_run: bool = False, remind: bool = False,
+                        remind_after_hours: float = REMIND_AFTER_HOURS,
+                        lookback_hours: float = NEW_CHANNEL_LOOKBACK_HOURS) -> bool:
+    """Email each recipient the pending items they have not been sent yet.
 
     Args:
-        limit: Maximum items to include
-        dry_run: If True, print items but don't send email
+        limit: Maximum new items (and, with remind, reminders) per recipient
+        dry_run: If True, print items but don't send email or update the ledger
+        remind: Also resend items still pending remind_after_hours after they were sent
+        remind_after_hours: Age of a notification before it is repeated
+        lookback_hours: How far back a recipient never sent anything starts
 
     Returns:
         True if successful
     """
-    items = get_pending_items(limit)
+    recipients = get_recipients()
+    if not recipients:
+        if not dry_run:
+            print("Missing email configuration. Required: DIGEST_RECIPIENT or DIGEST_RECIPIENTS")
+            return False
+        recipients = [Recipient(email='dry-run')]
+
+    session = get_session()
+    try:
+        batches = []
+        for recipient in recipients:
+            channel = email_channel(recipient)
+            new_items = get_new_items(session, channel, limit, recipient.sectors, lookback_hours)
+            reminders = get_reminder_items(session, channel, limit, recipient.sectors, remind_after_hours) if remind else []
+            batches.append((recipient, channel, new_items, reminders))
+
+            print(f"{recipient.email}: {len(new_items)} new, {len(reminders)} still pending")
+            for item, _ in new_items:
+                print(f"  - [{item.item_id}] {item.company or 'Unknown'}: {item.title[:60]}...")
+            for item in reminders:
+                print(f"  ↻ [{item.item_id}] {item.company or 'Unknown'}: {item.title[:60]}...")
 
-    if not items:
-        print("No pending items with AI summaries found")
-        return True
+        if dry_run:
+            print("\nDry run - not sending email")
+            return True
 
-    print(f"Found {len(items)} pending items:")
-    for item in items:
-        print(f"  - [{item.item_id}] {item.company or 'Unknown'}: {item.title[:60]}...")
+        if not any(new_items or reminders for _, _, new_items, reminders in batches):
+            print("No new pending items with AI summaries found")
+            return True
 
-    if dry_run:
-        print("\nDry run - not sending email")
-        return True
+        success = True
+        try:
+            transport = get_transport()
+        except ValueError as e:
+            print(e)
+            return False
 
-    return send_digest_email(items)
+        with transport:
+            for recipient, channel, new_items, reminders in batches:
+                items = [item for item, _ in new_items] + reminders
+                if not items:
+                    continue
+
+                if send_digest_email(items, recipients=[recipient], transport=transport):
+                    record_notifications(session, channel, new_items, reminders)
+                    session.commit()
+                else:
+                    success = False
+
+        return success
+
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Send digest email with pending items")
-    parser.add_argument("--limit", type=int, default=20, help="Max items to include")
+    parser.add_argument("--limit", type=int, default=20, help="Max new items per recipient")
     parser.add_argument("--dry-run", action="store_true", help="Print items without sending")
+    parser.add_argument("--remind", action="store_true", help="Also resend items still awaiting triage")
+    parser.add_argument("--remind-after", type=float, default=REMIND_AFTER_HOURS, metavar="HOURS",
+                        help=f"Hours before a sent item is included again (default {REMIND_AFTER_HOURS})")
+    parser.add_argument("--lookback", type=float, default=NEW_CHANNEL_LOOKBACK_HOURS, metavar="HOURS",
+                        help="Hours of summaries a recipient never sent anything starts from "
+                             f"(default {NEW_CHANNEL_LOOKBACK_HOURS})")
 
     args = parser.parse_args()
 
-    success = send_pending_digest(limit=args.limit, dry_run=args.dry_run)
+    success = send_pending_digest(limit=args.limit, dry_run=args.dry_run, remind=args.remind,
+                                  remind_after_hours=args.remind_after, lookback_hours=args.lookback)
     sys.exit(0 if success else 1)
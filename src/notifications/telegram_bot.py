@@ -13,12 +13,20 @@ import re
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from sqlalchemy import insert
+
 from src.database import RawItem, get_session
+from src.ingest.relevance import get_scorer
+from src.pipeline.jobs import SCRAPE, PRIORITY_MANUAL, enqueue
+from src.utils.urls import canonicalize_url
+
+# Most URLs taken from one message (a forwarded digest can carry dozens)
+MAX_URLS_PER_MESSAGE = int(os.environ.get('TELEGRAM_MAX_URLS', '5'))
 
 
 # URL extraction regex
@@ -60,47 +68,104 @@ def is_authorized_user(user_id: int) -> bool:
     return user_id in allowed_ids
 
 
-def add_url_to_queue(url: str, title: Optional[str] = None, source: str = 'telegram') -> tuple:
-    """Add URL to the processing queue.
+def add_urls_to_queue(urls: List[str], source: str = 'telegram', title: Optional[str] = None) -> List[tuple]:
+    """Add URLs to the processing queue in one transaction.
+
+    URLs are canonicalized (see src/utils/urls.py) and checked against the
+    database with a single query; new ones are inserted and queued for
+    scraping in one commit.
 
     Args:
-        url: Article URL to add
-        title: Optional title for the article
+        urls: Article URLs (duplicates and tracking variants collapse to one)
         source: Source identifier
+        title: Optional title for the articles
 
     Returns:
-        Tuple of (success: bool, message: str, item_id: Optional[int])
+        List of (url, success: bool, message: str, item_id: Optional[int]),
+        one per distinct URL in submission order
     """
+    results = []
+    canonical = {}  # canonical URL -> submitted spelling
+    for url in urls:
+        key = canonicalize_url(url)
+        if key is None:
+            results.append((url, False, "Not a valid http(s) URL", None))
+        elif key not in canonical:
+            canonical[key] = url
+
+    if not canonical:
+        return results
+
     session = get_session()
 
     try:
-        # Check if URL already exists
-        existing = session.query(RawItem).filter_by(url=url).first()
-        if existing:
-            return False, f"URL already in database (ID: {existing.id})", existing.id
-
-        # Create new item
-        item = RawItem(
-            url=url,
-            title=title or f"Telegram submission: {url[:50]}...",
-            rss_summary="Submitted via Telegram bot",
-            feed_source=source,
-            date_found=datetime.utcnow(),
-            status='new'
-        )
-        session.add(item)
-        session.commit()
-
-        return True, f"Added to queue (ID: {item.id})", item.id
+        # One existence query covering canonical and as-submitted spellings
+        candidates = set(canonical) | set(canonical.values())
+        existing = {
+            url: item_id
+            for item_id, url in session.query(RawItem.id, RawItem.url).filter(RawItem.url.in_(candidates))
+        }
+
+        scorer = get_scorer()
+        rows = []
+        for key, url in canonical.items():
+            if key in existing or url in existing:
+                continue
+            row = {
+                'url': key,
+                'title': title or f"Telegram submission: {key[:50]}...",
+                'rss_summary': "Submitted via Telegram bot",
+                'feed_source': source,
+                'date_found': datetime.utcnow(),
+                'status': 'new'
+            }
+            row['relevance_score'], row['relevance_flags'] = scorer.score(row['title'], row['rss_summary'])
+            rows.append(row)
+
+        new_items = {}
+        if rows:
+            # One multi-row INSERT ... RETURNING for all new items
+            inserted = session.execute(
+                insert(RawItem).returning(RawItem.id, RawItem.url), rows
+            )
+            new_items = {url: item_id for item_id, url in inserted}
+            # Hand-picked articles are scraped ahead of feed items
+            enqueue(session, SCRAPE, list(new_items.values()), priority=PRIORITY_MANUAL)
+            session.commit()
+
+        for key, url in canonical.items():
+            if key in new_items:
+                item_id = new_items[key]
+                results.append((url, True, f"Added to queue (ID: {item_id})", item_id))
+            else:
+                item_id = existing.get(key, existing.get(url))
+                results.append((url, False, f"URL already in database (ID: {item_id})", item_id))
+
+        return results
 
     except Exception as e:
         session.rollback()
-        return False, f"Database error: {e}", None
+        return results + [(url, False, f"Database error: {e}", None) for url in canonical.values()]
 
     finally:
         session.close()
 
 
+def add_url_to_queue(url: str, title: Optional[str] = None, source: str = 'telegram') -> tuple:
+    """Add URL to the processing queue.
+
+    Args:
+        url: Article URL to add
+        title: Optional title for the article
+        source: Source identifier
+
+    Returns:
+        Tuple of (success: bool, message: str, item_id: Optional[int])
+    """
+    _, success, message, item_id = add_urls_to_queue([url], source=source, title=title)[0]
+    return success, message, item_id
+
+
 def get_queue_status() -> Dict[str, int]:
     """Get current processing queue status.
 
@@ -134,11 +199,15 @@ def get_queue_status() -> Dict[str, int]:
         session.close()
 
 
-def handle_telegram_update(update: Dict[str, Any]) -> Dict[str, Any]:
+def handle_telegram_update(update: Dict[str, Any], processor=None) -> Dict[str, Any]:
     """Handle incoming Telegram webhook update.
 
     Args:
         update: Telegram update object (dict)
+        processor: Optional SubmissionProcessor (src/notifications/telegram_processor.py).
+            When given, URLs are acknowledged at once and scraped, summarized
+            and answered with a summary card in the background; otherwise
+            they are only added to the queue before replying.
 
     Returns:
         Response dict with 'text' to send back
@@ -167,7 +236,8 @@ def handle_telegram_update(update: Dict[str, Any]) -> Dict[str, Any]:
             'chat_id': chat_id,
             'text': (
                 "🛡️ *Defense Capital Tracker Bot*\n\n"
-                "Forward me articles or send URLs to add them to the triage queue.\n\n"
+                "Forward me articles or send URLs to add them to the triage queue. "
+                "I'll reply with an AI summary of each.\n\n"
                 "Commands:\n"
                 "/status - View queue stats\n"
                 "/help - Show this message"
@@ -199,7 +269,8 @@ def handle_telegram_update(update: Dict[str, Any]) -> Dict[str, Any]:
             'chat_id': chat_id,
             'text': (
                 "🛡️ *Defense Capital Tracker Bot*\n\n"
-                "Forward me articles or send URLs to add them to the triage queue.\n\n"
+                "Forward me articles or send URLs to add them to the triage queue. "
+                "I'll reply with an AI summary of each.\n\n"
                 "Commands:\n"
                 "/status - View queue stats\n"
                 "/help - Show this message"
@@ -232,10 +303,16 @@ def handle_telegram_update(update: Dict[str, Any]) -> Dict[str, Any]:
             'text': "No URLs found in message. Forward an article or send a URL directly."
         }
 
-    # Process each URL
+    if processor is not None:
+        return {
+            'method': 'sendMessage',
+            'chat_id': chat_id,
+            'text': processor.submit(chat_id, user_id, username, urls[:MAX_URLS_PER_MESSAGE])
+        }
+
+    # Add all URLs in one transaction
     results = []
-    for url in urls[:5]:  # Limit to 5 URLs per message
-        success, msg, item_id = add_url_to_queue(url, source=f'telegram:{username}')
+    for url, success, msg, item_id in add_urls_to_queue(urls[:MAX_URLS_PER_MESSAGE], source=f'telegram:{username}'):
         emoji = "✅" if success else "⚠️"
         results.append(f"{emoji} {msg}")
 
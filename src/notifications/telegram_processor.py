@@ -0,0 +1,281 @@
+"""Background processing for Telegram-submitted articles.
+
+The webhook only parses the update and acknowledges it. A small background
+pool adds the message's URLs to the database in one transaction, then
+scrapes and summarizes each new article right away (claiming its jobs from the pipeline queue, so
+a running pipeline worker never does the same item twice) and replies to
+the chat with a summary card.
+
+Limits keep a burst of forwards from starving the web app:
+- TELEGRAM_MAX_CONCURRENT (default 2): URLs processed at once, on a
+  dedicated thread pool
+- TELEGRAM_MAX_PENDING (default 20): URLs in flight (processing or
+  waiting); beyond that, new URLs are only queued for the pipeline worker
+- TELEGRAM_USER_RATE_LIMIT URLs per TELEGRAM_USER_RATE_WINDOW seconds per
+  user (default 10 per 600); only distinct valid URLs count, so invalid
+  links and tracking-parameter copies don't use up the quota
+"""
+
+import asyncio
+import html
+import math
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.database import RawItem, get_session
+from src.notifications.telegram_bot import add_urls_to_queue, send_telegram_message
+from src.pipeline.jobs import SCRAPE, SUMMARIZE, PRIORITY_MANUAL, enqueue, claim, worker_id
+from src.utils.urls import canonicalize_url
+
+MAX_CONCURRENT = int(os.environ.get('TELEGRAM_MAX_CONCURRENT', '2'))
+MAX_PENDING = int(os.environ.get('TELEGRAM_MAX_PENDING', '20'))
+USER_RATE_LIMIT = int(os.environ.get('TELEGRAM_USER_RATE_LIMIT', '10'))
+USER_RATE_WINDOW = int(os.environ.get('TELEGRAM_USER_RATE_WINDOW', '600'))
+
+
+class UserThrottle:
+    """Sliding-window limit on URLs submitted per user."""
+
+    def __init__(self, limit: int = USER_RATE_LIMIT, window: int = USER_RATE_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._recent = defaultdict(deque)
+
+    def take(self, user_id: int, count: int, now: Optional[float] = None) -> Tuple[int, int]:
+        """Reserve up to count submissions for a user.
+
+        Returns:
+            Tuple of (submissions allowed, seconds until the next slot frees up)
+        """
+        now = time.monotonic() if now is None else now
+        recent = self._recent[user_id]
+        while recent and recent[0] <= now - self.window:
+            recent.popleft()
+
+        allowed = max(0, min(count, self.limit - len(recent)))
+        recent.extend([now] * allowed)
+
+        retry_after = math.ceil(recent[0] + self.window - now) if len(recent) >= self.limit else 0
+        return allowed, retry_after
+
+
+def format_summary_card(item: RawItem) -> str:
+    """HTML summary card for a summarized item (Telegram parse_mode='HTML')."""
+    extraction = item.extraction
+    esc = lambda value: html.escape(value or '')
+
+    lines = [f"🛡️ <b>{esc(extraction.company) or 'Unknown company'}</b>"]
+    if extraction.company_description:
+        lines.append(f"<i>{esc(extraction.company_description)}</i>")
+
+    deal = ' · '.join(esc(value) for value in (extraction.transaction_type, extraction.deal_amount) if value)
+    if deal:
+        lines.append(f"💰 {deal}")
+    if extraction.investors:
+        lines.append(f"🏦 {esc(extraction.investors)}")
+    if extraction.sectors:
+        lines.append(f"🏷️ {esc(extraction.sectors.replace(',', ', '))}")
+    if extraction.strategic_significance:
+        lines.append(f"\n{esc(extraction.strategic_significance)}")
+
+    lines.append(f"\n<a href=\"{html.escape(item.url, quote=True)}\">{esc(item.title[:100])}</a>")
+    lines.append(f"#{item.id} · ready for triage")
+    return '\n'.join(lines)
+
+
+def process_submission(url: str, item_id: int, added: bool, owner: str, scrape_config: dict,
+                       process: bool = True) -> str:
+    """Scrape and summarize one submitted article (blocking).
+
+    Args:
+        url: Submitted article URL
+        item_id: Its RawItem id (from add_urls_to_queue)
+        added: Whether the submission created the item
+        owner: Job lease owner
+        scrape_config: Scraper configuration (config/feeds.json)
+        process: Scrape and summarize now (otherwise leave it to the pipeline)
+
+    Returns:
+        Reply text (HTML)
+    """
+    from src.scraper.article_scraper import run_scrape_job
+    from src.scraper.generate_ai_summaries import run_summarize_job
+
+    session = get_session()
+    try:
+        item = session.get(RawItem, item_id)
+        if not added and (item.status != 'new' or item.extraction is not None):
+            return "📚 Already tracked\n\n" + _describe(session, item, url)
+
+        if not added:
+            # Known URL that never finished processing: move it up the queue
+            enqueue(session, SCRAPE, [item_id], priority=PRIORITY_MANUAL)
+            session.commit()
+
+        if not process:
+            return f"📥 Queued #{item_id} for the pipeline (busy right now)\n{html.escape(url)}"
+
+        stages = (
+            (SCRAPE, lambda s, job, o: run_scrape_job(s, job, o, scrape_config)),
+            (SUMMARIZE, run_summarize_job),
+        )
+        for stage, run in stages:
+            # Nothing to claim: stage done already, or a pipeline worker has it
+            jobs = claim(session, stage, owner, item_ids=[item_id])
+            if not jobs:
+                continue
+
+            outcome, item, detail = run(session, jobs[0], owner)
+            if outcome == 'retry':
+                return f"⚠️ Couldn't {stage} #{item_id} yet ({html.escape(str(detail))}); it will be retried\n{html.escape(url)}"
+
+        session.expire_all()
+        return _describe(session, session.get(RawItem, item_id), url)
+
+    finally:
+        session.close()
+
+
+def _describe(session, item: RawItem, url: str) -> str:
+    """Reply text for an item's current processing state (HTML)."""
+    if item.extraction is not None and item.extraction.summary_complete:
+        return format_summary_card(item)
+
+    fingerprint = item.fingerprint
+    if fingerprint is not None and fingerprint.cluster_id != item.id:
+        representative = session.get(RawItem, fingerprint.cluster_id)
+        header = f"🔁 #{item.id} is the same story as #{fingerprint.cluster_id}, already in the triage queue"
+        if representative.extraction is not None and representative.extraction.summary_complete:
+            return f"{header}\n\n{format_summary_card(representative)}"
+        return f"{header}\n{html.escape(url)}"
+
+    if item.status == 'failed':
+        error = item.article.error_message if item.article is not None else 'scrape failed'
+        return f"✗ Couldn't scrape #{item.id}: {html.escape(error or 'scrape failed')}\n{html.escape(url)}"
+    if item.status == 'auto_rejected':
+        return f"⊘ #{item.id} was filtered out as not relevant\n{html.escape(url)}"
+
+    return f"⏳ #{item.id} is being processed by the pipeline; it will show up in triage shortly\n{html.escape(url)}"
+
+
+class SubmissionProcessor:
+    """Background pool for Telegram submissions (one per web app process)."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, max_pending: int = MAX_PENDING,
+                 throttle: Optional[UserThrottle] = None):
+        from src.scraper.article_scraper import load_config
+
+        self.max_pending = max_pending
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # Own threads, so slow scrapes and LLM calls never tie up the web app's thread pool
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='telegram')
+        self.throttle = throttle or UserThrottle()
+        self.owner = f"{worker_id()}:telegram"
+        self.scrape_config = load_config()
+        self.tasks = set()
+        self.in_flight = 0  # Submitted URLs not yet answered
+
+    def submit(self, chat_id: int, user_id: int, username: str, urls: List[str]) -> str:
+        """Schedule URLs for background processing (call from the event loop).
+
+        Returns:
+            Acknowledgement text to send right away
+        """
+        # Only distinct valid URLs count against the user's quota
+        invalid = []
+        distinct = {}  # canonical URL -> submitted spelling
+        for url in urls:
+            key = canonicalize_url(url)
+            if key is None:
+                invalid.append(url)
+            else:
+                distinct.setdefault(key, url)
+        distinct = list(distinct.values())
+
+        allowed, retry_after = self.throttle.take(user_id, len(distinct))
+
+        if allowed:
+            # URLs past the in-flight limit are only queued for the pipeline
+            process = [self.in_flight + i < self.max_pending for i in range(allowed)]
+            self.in_flight += allowed
+            task = asyncio.create_task(self._handle(chat_id, distinct[:allowed], f'telegram:{username}', process))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        lines = []
+        if allowed:
+            lines.append(f"📥 Got {allowed} link{'s' if allowed != 1 else ''}, "
+                         "scraping and summarizing now. I'll reply with the summary.")
+        if allowed < len(distinct):
+            lines.append(f"⏳ Rate limit reached: {len(distinct) - allowed} link(s) skipped. "
+                         f"Try again in {-(-retry_after // 60)} min.")
+        for url in invalid:
+            lines.append(f"⚠️ Not a valid http(s) URL: {url}")
+        return '\n'.join(lines)
+
+    async def _handle(self, chat_id: int, urls: List[str], source: str, process: List[bool]):
+        """Add a message's URLs in one transaction, then process each article."""
+        loop = asyncio.get_running_loop()
+        try:
+            async with self.semaphore:
+                added = await loop.run_in_executor(self.executor, add_urls_to_queue, urls, source)
+        except Exception as e:
+            print(f"Telegram submission failed: {e}")
+            added = [(url, False, f"Processing failed: {e}", None) for url in urls]
+
+        # Canonical duplicates within the message collapse to one result
+        self.in_flight -= len(urls) - len(added)
+        await asyncio.gather(*(
+            self._handle_item(chat_id, url, success, message, item_id, run)
+            for (url, success, message, item_id), run in zip(added, process)
+        ))
+
+    async def _handle_item(self, chat_id: int, url: str, added: bool, message: str,
+                           item_id: Optional[int], process: bool):
+        loop = asyncio.get_running_loop()
+        try:
+            if item_id is None:
+                reply = f"⚠️ {html.escape(message)}\n{html.escape(url)}"
+            else:
+                async with self.semaphore:
+                    reply = await loop.run_in_executor(
+                        self.executor, process_submission, url, item_id, added, self.owner, self.scrape_config, process
+                    )
+        except Exception as e:
+            print(f"Telegram submission failed for {url}: {e}")
+            reply = f"✗ Processing failed: {html.escape(str(e))}\n{html.escape(url)}"
+        finally:
+            self.in_flight -= 1
+
+        await send_telegram_message(chat_id, reply, parse_mode='HTML')
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Give in-flight submissions a chance to finish, then stop.
+
+        Anything cut short keeps its job lease and is picked up again by the
+        pipeline once the lease expires.
+        """
+        if self.tasks:
+            await asyncio.wait(set(self.tasks), timeout=timeout)
+        for task in self.tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+_processor = None
+
+
+def get_processor() -> SubmissionProcessor:
+    """The web app's shared SubmissionProcessor (created on first use)."""
+    global _processor
+    if _processor is None:
+        _processor = SubmissionProcessor()
+    return _processor
@@ -0,0 +1,5 @@
+"""Pipeline job queue and workers."""
+
+from .jobs import enqueue, enqueue_pending, claim, complete, fail, queue_metrics, worker_id
+
+__all__ = ['enqueue', 'enqueue_pending', 'claim', 'complete', 'fail', 'queue_metrics', 'worker_id']
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Database-backed job queue for the scrape and summarize stages.
+
+Every unit of pipeline work is a row in the jobs table: one stage for one
+raw item (unique per stage + item, so enqueuing is idempotent). Workers
+claim jobs with a single UPDATE ... RETURNING that flips the highest
+priority ready rows to 'running' and stamps them with a lease:
+
+    jobs = claim(session, SCRAPE, worker_id(), limit=1)
+    ... do the work ...
+    complete(session, job, owner)   # or fail(session, job, owner, error)
+    session.commit()
+
+The database serializes writers, so two processes (overlapping cron runs,
+several daemons) can never claim the same job. A worker that dies mid-job
+simply lets its lease expire and the job is claimed again; failed jobs are
+retried with exponential backoff until max_attempts, then marked 'failed'.
+
+Job states: pending -> running -> done | failed (or back to pending on retry).
+
+    python src/pipeline/jobs.py                  # queue depth and age
+    python src/pipeline/jobs.py --enqueue        # queue all outstanding work
+    python src/pipeline/jobs.py --retry-failed   # give failed jobs another go
+"""
+
+import os
+import socket
+import sys
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from src.database import RawItem, ArticleContent, AIExtraction, Job
+
+SCRAPE = 'scrape'
+SUMMARIZE = 'summarize'
+STAGES = (SCRAPE, SUMMARIZE)
+
+STATUSES = ('pending', 'running', 'done', 'failed')
+
+# How long a claimed job stays reserved before another worker may take it
+LEASE_SECONDS = {
+    SCRAPE: 300,
+    SUMMARIZE: 600,
+}
+
+MAX_ATTEMPTS = 3
+
+# Retry n waits RETRY_BACKOFF_SECONDS * 2^(n-1)
+RETRY_BACKOFF_SECONDS = 60
+
+# Items submitted by hand (Telegram, triage) jump ahead of feed items
+PRIORITY_DEFAULT = 0
+PRIORITY_MANUAL = 10
+
+# Keep IN lists / multi-row inserts under SQLite's bound parameter limit
+_CHUNK_SIZE = 500
+
+ClaimedJob = namedtuple('ClaimedJob', 'id item_id attempts max_attempts')
+
+
+def worker_id():
+    """Lease owner name for this process ("host:pid")"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(session, stage, item_ids, priority=PRIORITY_DEFAULT):
+    """
+    Queue a stage for items (caller commits)
+
+    Items that already have a job for the stage are left alone, except that
+    a pending job is raised to the given priority if it is higher.
+
+    Args:
+        session: Database session
+        stage: SCRAPE or SUMMARIZE
+        item_ids: Raw item ids
+        priority: Higher priorities are claimed first
+    """
+    item_ids = list(dict.fromkeys(item_ids))
+    now = datetime.utcnow()
+
+    for start in range(0, len(item_ids), _CHUNK_SIZE):
+        stmt = insert(Job.__table__).values([
+            {'stage': stage, 'item_id': item_id, 'status': 'pending', 'priority': priority,
+             'attempts': 0, 'max_attempts': MAX_ATTEMPTS, 'available_at': now, 'created_at': now, 'updated_at': now}
+            for item_id in item_ids[start:start + _CHUNK_SIZE]
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['stage', 'item_id'],
+            set_={'priority': stmt.excluded.priority, 'updated_at': now},
+            where=and_(Job.__table__.c.status == 'pending', Job.__table__.c.priority < stmt.excluded.priority)
+        )
+        session.execute(stmt)
+
+
+def enqueue_pending(session, stages=STAGES):
+    """
+    Queue every item that still needs a stage and has no job for it yet (caller commits)
+
+    scrape: new items without article content
+    summarize: successfully scraped story cluster representatives without a
+    complete AI extraction
+
+    Returns:
+        Dict of stage -> number of items queued
+    """
+    from src.scraper.dedup import duplicate_item_ids
+
+    def without_job(query, stage):
+        return query.outerjoin(
+            Job, and_(Job.item_id == RawItem.id, Job.stage == stage)
+        ).filter(Job.id.is_(None))
+
+    queued = {}
+    if SCRAPE in stages:
+        item_ids = [item_id for (item_id,) in without_job(
+            session.query(RawItem.id).outerjoin(ArticleContent).filter(
+                RawItem.status == 'new', ArticleContent.id.is_(None)
+            ), SCRAPE
+        ).order_by(RawItem.id)]
+        enqueue(session, SCRAPE, item_ids)
+        queued[SCRAPE] = len(item_ids)
+
+    if SUMMARIZE in stages:
+        item_ids = [item_id for (item_id,) in without_job(
+            session.query(RawItem.id).join(ArticleContent).outerjoin(AIExtraction).filter(
+                ArticleContent.scrape_success == True,
+                ~RawItem.id.in_(duplicate_item_ids(session)),
+                or_(AIExtraction.id.is_(None), AIExtraction.summary_complete.isnot(True))
+            ), SUMMARIZE
+        ).order_by(RawItem.id)]
+        enqueue(session, SUMMARIZE, item_ids)
+        queued[SUMMARIZE] = len(item_ids)
+
+    return queued
+
+
+def _claimable(now):
+    """Ready pending jobs, plus running jobs whose lease has expired"""
+    jobs = Job.__table__.c
+    return or_(
+        and_(jobs.status == 'pending', jobs.available_at <= now),
+        and_(jobs.status == 'running', jobs.lease_expires_at < now, jobs.attempts < jobs.max_attempts)
+    )
+
+
+def expire_leases(session):
+    """
+    Fail running jobs whose lease ran out on their last attempt (caller commits)
+
+    Returns:
+        Number of jobs marked failed
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    result = session.execute(
+        update(Job.__table__).where(
+            jobs.status == 'running', jobs.lease_expires_at < now, jobs.attempts >= jobs.max_attempts
+        ).values(
+            status='failed', lease_owner=None, lease_expires_at=None, finished_at=now, updated_at=now,
+            last_error=func.coalesce(jobs.last_error, 'Lease expired (worker died or timed out)')
+        )
+    )
+    return result.rowcount
+
+
+def claim(session, stage, owner, limit=1, lease_seconds=None, item_ids=None):
+    """
+    Atomically reserve up to limit jobs of a stage (commits)
+
+    A single UPDATE ... RETURNING picks the highest priority, oldest ready
+    jobs and leases them to owner, so concurrent workers never get the same
+    job. Dialects without RETURNING fall back to update-then-select on the
+    lease stamp.
+
+    Args:
+        session: Database session
+        stage: SCRAPE or SUMMARIZE
+        owner: Lease owner (see worker_id())
+        limit: Max jobs to claim
+        lease_seconds: Lease length (default LEASE_SECONDS[stage])
+        item_ids: Only claim jobs for these raw items
+
+    Returns:
+        List of ClaimedJob(id, item_id, attempts, max_attempts)
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=lease_seconds or LEASE_SECONDS[stage])
+
+    expire_leases(session)
+
+    candidates = select(jobs.id).where(
+        jobs.stage == stage, _claimable(now)
+    )
+    if item_ids is not None:
+        candidates = candidates.where(jobs.item_id.in_(list(item_ids)))
+    candidates = candidates.order_by(
+        jobs.priority.desc(), jobs.available_at, jobs.id
+    ).limit(limit).scalar_subquery()
+
+    stmt = update(Job.__table__).where(
+        jobs.id.in_(candidates), _claimable(now)
+    ).values(
+        status='running', lease_owner=owner, lease_expires_at=expires,
+        attempts=jobs.attempts + 1, updated_at=now
+    )
+
+    if session.get_bind().dialect.update_returning:
+        rows = session.execute(
+            stmt.returning(jobs.id, jobs.item_id, jobs.attempts, jobs.max_attempts)
+        ).fetchall()
+    else:
+        session.execute(stmt)
+        rows = session.execute(
+            select(jobs.id, jobs.item_id, jobs.attempts, jobs.max_attempts).where(
+                jobs.status == 'running', jobs.lease_owner == owner, jobs.lease_expires_at == expires
+            )
+        ).fetchall()
+
+    session.commit()
+    return [ClaimedJob(*row) for row in rows]
+
+
+def extend_lease(session, job_ids, owner, lease_seconds):
+    """
+    Push back the lease of jobs still held by owner (caller commits)
+
+    Returns:
+        Number of leases extended (fewer than requested means a lease was lost)
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    result = session.execute(
+        update(Job.__table__).where(
+            jobs.id.in_(list(job_ids)), jobs.status == 'running', jobs.lease_owner == owner
+        ).values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+    )
+    return result.rowcount
+
+
+def release(session, job_ids, owner):
+    """
+    Hand claimed jobs that were never started back to the queue (caller commits)
+
+    The claim's attempt is not counted. Used by workers shutting down with
+    jobs still buffered.
+
+    Returns:
+        Number of jobs released
+    """
+    jobs = Job.__table__.c
+    result = session.execute(
+        update(Job.__table__).where(
+            jobs.id.in_(list(job_ids)), jobs.status == 'running', jobs.lease_owner == owner
+        ).values(
+            status='pending', lease_owner=None, lease_expires_at=None,
+            attempts=jobs.attempts - 1, updated_at=datetime.utcnow()
+        )
+    )
+    return result.rowcount
+
+
+def complete(session, job, owner):
+    """
+    Mark a claimed job done (caller commits, together with the job's results)
+
+    Returns:
+        False if the lease was lost to another worker in the meantime
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    result = session.execute(
+        update(Job.__table__).where(
+            jobs.id == job.id, jobs.status == 'running', jobs.lease_owner == owner
+        ).values(
+            status='done', lease_owner=None, lease_expires_at=None,
+            last_error=None, finished_at=now, updated_at=now
+        )
+    )
+    return result.rowcount == 1
+
+
+def fail(session, job, owner, error, retry=True):
+    """
+    Record a failed attempt of a claimed job (caller commits)
+
+    The job goes back to pending after an exponential backoff, or to
+    'failed' once it has used max_attempts (or retry is False).
+
+    Returns:
+        True if the job will be retried
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    will_retry = retry and job.attempts < job.max_attempts
+
+    if will_retry:
+        backoff = timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+        values = {'status': 'pending', 'available_at': now + backoff}
+    else:
+        values = {'status': 'failed', 'finished_at': now}
+
+    session.execute(
+        update(Job.__table__).where(
+            jobs.id == job.id, jobs.status == 'running', jobs.lease_owner == owner
+        ).values(
+            lease_owner=None, lease_expires_at=None, last_error=str(error)[:2000], updated_at=now, **values
+        )
+    )
+    return will_retry
+
+
+def retry_failed(session, stage=None):
+    """
+    Reset failed jobs to pending with a fresh attempt budget (commits)
+
+    Returns:
+        Number of jobs requeued
+    """
+    jobs = Job.__table__.c
+    now = datetime.utcnow()
+    stmt = update(Job.__table__).where(jobs.status == 'failed').values(
+        status='pending', attempts=0, available_at=now, finished_at=None, updated_at=now
+    )
+    if stage:
+        stmt = stmt.where(jobs.stage == stage)
+    count = session.execute(stmt).rowcount
+    session.commit()
+    return count
+
+
+def queue_metrics(session):
+    """
+    Queue depth and age per stage (one GROUP BY)
+
+    Returns:
+        Dict of stage -> {
+            'pending', 'running', 'done', 'failed': job counts,
+            'ready': pending jobs claimable now (not waiting on a retry backoff),
+            'expired_leases': running jobs whose lease has run out,
+            'depth': pending + running,
+            'oldest_pending_age': seconds since the oldest pending job was queued (None if none)
+        }
+    """
+    now = datetime.utcnow()
+    rows = session.query(
+        Job.stage,
+        Job.status,
+        func.count(Job.id),
+        func.min(Job.created_at),
+        func.sum(case((Job.available_at <= now, 1), else_=0)),
+        func.sum(case((Job.lease_expires_at < now, 1), else_=0))
+    ).group_by(Job.stage, Job.status)
+
+    def empty():
+        return {**{status: 0 for status in STATUSES}, 'ready': 0, 'expired_leases': 0,
+                'depth': 0, 'oldest_pending_age': None}
+
+    metrics = {stage: empty() for stage in STAGES}
+    for stage, status, count, oldest, ready, expired in rows:
+        stage_metrics = metrics.setdefault(stage, empty())
+        stage_metrics[status] = count
+        if status == 'pending':
+            stage_metrics['ready'] = ready or 0
+            if oldest is not None:
+                if isinstance(oldest, str):
+                    oldest = datetime.fromisoformat(oldest)
+                stage_metrics['oldest_pending_age'] = round((now - oldest).total_seconds(), 1)
+        elif status == 'running':
+            stage_metrics['expired_leases'] = expired or 0
+
+    for stage_metrics in metrics.values():
+        stage_metrics['depth'] = stage_metrics['pending'] + stage_metrics['running']
+    return metrics
+
+
+def _format_age(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 172800:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def print_metrics(metrics):
+    """Print queue_metrics() as a table"""
+    print(f"{'Stage':<11} {'Pending':>8} {'Ready':>6} {'Running':>8} {'Done':>7} {'Failed':>7} {'Oldest':>8}")
+    for stage, m in metrics.items():
+        running = f"{m['running']}" + (f" ({m['expired_leases']} expired)" if m['expired_leases'] else '')
+        print(f"{stage:<11} {m['pending']:>8} {m['ready']:>6} {running:>8} {m['done']:>7} {m['failed']:>7} "
+              f"{_format_age(m['oldest_pending_age']):>8}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    from src.database import get_session
+
+    parser = argparse.ArgumentParser(description='Pipeline job queue')
+    parser.add_argument('--enqueue', action='store_true', help='Queue all outstanding scrape/summarize work')
+    parser.add_argument('--retry-failed', nargs='?', const='all', metavar='STAGE',
+                        help='Requeue failed jobs (all stages unless one is given)')
+    parser.add_argument('--json', action='store_true', help='Print metrics as JSON')
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        if args.enqueue:
+            queued = enqueue_pending(session)
+            session.commit()
+            for stage, count in queued.items():
+                print(f"✓ Queued {count} {stage} jobs")
+
+        if args.retry_failed:
+            stage = None if args.retry_failed == 'all' else args.retry_failed
+            print(f"✓ Requeued {retry_failed(session, stage)} failed jobs")
+
+        metrics = queue_metrics(session)
+        if args.json:
+            print(json.dumps(metrics, indent=2))
+        else:
+            print_metrics(metrics)
+    finally:
+        session.close()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Long-running pipeline worker: ingest -> scrape -> summarize.
+
+Runs every stage in one process as an asyncio pipeline, so a new RSS item
+is scraped and summarized as soon as it is found instead of waiting for the
+next ./update_workflow.sh run, and the process keeps a single database
+engine (one Turso connection pool) for its whole life.
+
+    python -m src.pipeline.worker                      # run until Ctrl+C / SIGTERM
+    python -m src.pipeline.worker --once --no-fetch    # drain the queues and exit
+
+Layout:
+
+    ingest (every --fetch-interval)
+       | enqueue scrape jobs, wake scrape
+       v
+    scrape feeder --[bounded queue]--> scrape workers (--scrape-workers)
+       | enqueue summarize jobs, wake summarize
+       v
+    summarize feeder --[bounded queue]--> summarize workers (--summarize-workers)
+
+Stages hand work to each other through the jobs table (src/pipeline/jobs.py),
+not through in-memory queues, so a slow LLM stage only grows the summarize
+backlog: it never blocks scraping or ingest. Each stage's feeder claims only
+as many jobs as its bounded queue has room for (backpressure: no job sits
+leased in memory for long, and other worker processes can share the load),
+and each stage runs its blocking work on its own thread pool.
+
+On shutdown, in-flight items finish, buffered jobs are released back to the
+queue and the per-stage throughput counters are printed.
+"""
+
+import asyncio
+import signal
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database import get_engine
+from src.pipeline.jobs import (
+    SCRAPE, SUMMARIZE, STAGES, LEASE_SECONDS,
+    enqueue_pending, claim, extend_lease, release, worker_id
+)
+
+# Seconds between feed fetches
+FETCH_INTERVAL = 1800
+
+# Idle feeders re-check the jobs table this often (catches work queued by
+# other processes, e.g. Telegram submissions or retries coming off backoff)
+POLL_INTERVAL = 15
+
+STATS_INTERVAL = 300
+
+# Courtesy delay per worker after each item (sites being scraped, LLM rate limits)
+STAGE_DELAY = {
+    SCRAPE: 1.0,
+    SUMMARIZE: 1.0,
+}
+
+# Outcomes that count as throughput (the rest are skips, retries and failures)
+DONE_OUTCOMES = {
+    SCRAPE: ('scraped', 'duplicate'),
+    SUMMARIZE: ('summarized',),
+}
+
+
+class Stage:
+    """One queue-fed stage: a feeder claiming jobs into a bounded queue, and its workers."""
+
+    def __init__(self, name, run, concurrency, downstream=None):
+        self.name = name
+        self.run = run  # run(session, job, owner) -> (outcome, item, detail), blocking
+        self.concurrency = concurrency
+        self.downstream = downstream
+        self.queue = asyncio.Queue(maxsize=concurrency)
+        self.wakeup = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self.counters = Counter()
+        self.active = 0
+        self.busy_seconds = 0.0
+        self.drained = False  # Last claim found nothing
+
+    def stats(self, elapsed):
+        done = sum(self.counters[outcome] for outcome in DONE_OUTCOMES[self.name])
+        return {
+            'claimed': self.counters['claimed'],
+            'done': done,
+            **{outcome: count for outcome, count in self.counters.items() if outcome != 'claimed'},
+            'per_minute': round(done / elapsed * 60, 2) if elapsed else 0.0,
+            'queued': self.queue.qsize(),
+            'active': self.active,
+            'busy_seconds': round(self.busy_seconds, 1),
+        }
+
+
+class PipelineWorker:
+    """Asyncio pipeline over the job queue (see module docstring)."""
+
+    def __init__(self, db_path='databases/tracker.db', scrape_workers=4, summarize_workers=1,
+                 fetch=True, fetch_interval=FETCH_INTERVAL, poll_interval=POLL_INTERVAL,
+                 stats_interval=STATS_INTERVAL, once=False):
+        # One engine (and connection pool) shared by every stage
+        self.Session = sessionmaker(bind=get_engine(db_path))
+        self.owner = worker_id()
+        self.fetch = fetch
+        self.fetch_interval = fetch_interval
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.once = once
+        self.scrape_workers = scrape_workers
+        self.summarize_workers = summarize_workers
+
+    # -- blocking helpers (run on executor threads, one session each) --
+
+    def _with_session(self, fn, *args, **kwargs):
+        session = self.Session()
+        try:
+            return fn(session, *args, **kwargs)
+        finally:
+            session.close()
+
+    def _fetch_feeds(self):
+        """Fetch every enabled feed, gate new items and queue them for scraping"""
+        from src.ingest.rss_fetcher import load_config, parse_feed, save_to_database
+        from src.ingest.relevance import get_scorer
+        from src.ingest.gating import gate_new_items
+
+        config = load_config()
+        scorer = get_scorer()
+        session = self.Session()
+        try:
+            new_items = 0
+            for feed_config in config['rss_feeds']:
+                if feed_config.get('enabled', True):
+                    entries = parse_feed(feed_config['url'], feed_config['name'])
+                    new_items += save_to_database(entries, session, scorer)[0]
+
+            gate_new_items(session)
+            queued = enqueue_pending(session, stages=(SCRAPE,))[SCRAPE]
+            session.commit()
+            return new_items, queued
+        finally:
+            session.close()
+
+    def _run_job(self, stage, job):
+        """Process one claimed job; returns its outcome"""
+        session = self.Session()
+        try:
+            # The job may have waited in the buffer: renew the lease, or drop
+            # it if another worker reclaimed it in the meantime
+            if not extend_lease(session, [job.id], self.owner, LEASE_SECONDS[stage.name]):
+                session.rollback()
+                return 'lost'
+            session.commit()
+
+            outcome, item, detail = stage.run(session, job, self.owner)
+            title = item.title[:60] if item is not None else f"item {job.item_id}"
+            if outcome in DONE_OUTCOMES[stage.name]:
+                print(f"  ✓ [{stage.name}] {title}")
+            elif outcome in ('retry', 'failed'):
+                print(f"  ✗ [{stage.name}] {title}: {detail}" + (' (will retry)' if outcome == 'retry' else ''))
+            return outcome
+        finally:
+            session.close()
+
+    # -- coroutines --
+
+    async def _in_thread(self, executor, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    async def _wait(self, event, timeout):
+        """Wait for event or timeout, whichever comes first"""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def ingest(self):
+        while not self.stop.is_set():
+            started = time.monotonic()
+            try:
+                new_items, queued = await self._in_thread(self.ingest_executor, self._fetch_feeds)
+                self.ingest_counters['runs'] += 1
+                self.ingest_counters['new_items'] += new_items
+                self.ingest_counters['queued'] += queued
+                print(f"📥 [ingest] {new_items} new items, {queued} queued for scraping "
+                      f"({time.monotonic() - started:.1f}s)")
+                if queued:
+                    self._wake(self.stages[SCRAPE])
+            except Exception as e:
+                self.ingest_counters['errors'] += 1
+                print(f"✗ [ingest] Feed fetch failed: {e}")
+
+            if self.once:
+                break
+            await self._wait(self.stop, self.fetch_interval)
+        self.ingest_done = True
+
+    async def feed(self, stage):
+        """Keep the stage's bounded queue topped up with claimed jobs"""
+        while not self.stop.is_set():
+            stage.wakeup.clear()
+            room = stage.queue.maxsize - stage.queue.qsize()
+            jobs = []
+            if room > 0:
+                try:
+                    jobs = await self._in_thread(
+                        self.db_executor, self._with_session, claim, stage.name, self.owner, room
+                    )
+                except Exception as e:
+                    print(f"✗ [{stage.name}] Claim failed: {e}")
+
+            if jobs:
+                stage.drained = False
+                stage.counters['claimed'] += len(jobs)
+                for job in jobs:
+                    stage.queue.put_nowait(job)  # Only the feeder puts, and it checked for room
+                continue
+
+            # Queue full or nothing ready: sleep until a worker frees a slot,
+            # the upstream stage queues work, or the poll interval passes
+            stage.drained = room > 0
+            await self._wait(stage.wakeup, self.poll_interval)
+
+    async def work(self, stage):
+        while True:
+            job = await stage.queue.get()
+            if job is None:
+                return
+            stage.wakeup.set()  # A slot opened up
+
+            stage.active += 1
+            started = time.monotonic()
+            try:
+                outcome = await self._in_thread(stage.executor, self._run_job, stage, job)
+            except Exception as e:
+                # Lease runs out and the job is retried by whoever claims it next
+                outcome = 'error'
+                print(f"  ✗ [{stage.name}] Job {job.id} (item {job.item_id}) crashed: {e}")
+            finally:
+                stage.active -= 1
+                stage.busy_seconds += time.monotonic() - started
+
+            stage.counters[outcome] += 1
+            if outcome in DONE_OUTCOMES[stage.name] and stage.downstream:
+                self._wake(self.stages[stage.downstream])
+
+            if outcome != 'skipped' and STAGE_DELAY[stage.name]:
+                await asyncio.sleep(STAGE_DELAY[stage.name])
+
+    def stats(self):
+        """Throughput counters: ingest totals and per-stage outcomes"""
+        elapsed = time.monotonic() - self.started
+        return {
+            'uptime_seconds': round(elapsed, 1),
+            'ingest': dict(self.ingest_counters),
+            **{name: stage.stats(elapsed) for name, stage in self.stages.items()},
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        parts = [f"ingest {stats['ingest'].get('new_items', 0)} new/{stats['ingest'].get('runs', 0)} runs"]
+        for name in STAGES:
+            s = stats[name]
+            parts.append(f"{name} {s['done']} done ({s['per_minute']}/min), {s.get('retry', 0)} retry, "
+                         f"{s.get('failed', 0)} failed, {s['active']} busy, {s['queued']} buffered")
+        print(f"📊 [{stats['uptime_seconds']:.0f}s] " + ' | '.join(parts))
+
+    async def monitor(self):
+        """Print stats periodically; in --once mode stop when everything is drained"""
+        last_stats = time.monotonic()
+        while not self.stop.is_set():
+            await self._wait(self.stop, 1 if self.once else self.stats_interval)
+
+            if self.once and self.ingest_done and all(
+                stage.drained and stage.queue.empty() and stage.active == 0 for stage in self.stages.values()
+            ):
+                self._shutdown()
+            elif time.monotonic() - last_stats >= self.stats_interval:
+                self.print_stats()
+                last_stats = time.monotonic()
+
+    def _wake(self, stage):
+        """Tell an idle stage that work was queued for it"""
+        stage.drained = False
+        stage.wakeup.set()
+
+    def _shutdown(self):
+        self.stop.set()
+        for stage in self.stages.values():
+            stage.wakeup.set()
+
+    def request_stop(self):
+        if not self.stop.is_set():
+            print("\n⏹  Stopping: finishing in-flight items...")
+            self._shutdown()
+
+    async def run(self):
+        from src.scraper.article_scraper import load_config, run_scrape_job
+        from src.scraper.generate_ai_summaries import run_summarize_job
+
+        scrape_config = load_config()
+        self.stop = asyncio.Event()
+        self.started = time.monotonic()
+        self.ingest_counters = Counter()
+        self.ingest_done = not self.fetch
+        self.ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest')
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
+        self.stages = {
+            SCRAPE: Stage(SCRAPE, lambda session, job, owner: run_scrape_job(session, job, owner, scrape_config),
+                          self.scrape_workers, downstream=SUMMARIZE),
+            SUMMARIZE: Stage(SUMMARIZE, run_summarize_job, self.summarize_workers),
+        }
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.request_stop)
+
+        print("=" * 80)
+        print(f"PIPELINE WORKER {self.owner}: {self.scrape_workers} scrape / "
+              f"{self.summarize_workers} summarize workers" + (" (drain once)" if self.once else ""))
+        print("=" * 80)
+
+        # Pick up work queued before this worker started
+        queued = await self._in_thread(self.db_executor, self._with_session, self._enqueue_backlog)
+        print(f"✓ Backlog: {queued[SCRAPE]} scrape, {queued[SUMMARIZE]} summarize jobs queued")
+
+        feeders = [asyncio.create_task(self.feed(stage)) for stage in self.stages.values()]
+        workers = {
+            name: [asyncio.create_task(self.work(stage)) for _ in range(stage.concurrency)]
+            for name, stage in self.stages.items()
+        }
+        ingest = asyncio.create_task(self.ingest()) if self.fetch else None
+        monitor = asyncio.create_task(self.monitor())
+
+        await self.stop.wait()
+
+        # Graceful shutdown: stop claiming, hand buffered jobs back, let workers finish
+        await asyncio.gather(*feeders)
+        for name, stage in self.stages.items():
+            buffered = []
+            while not stage.queue.empty():
+                buffered.append(stage.queue.get_nowait().id)
+            if buffered:
+                released = await self._in_thread(self.db_executor, self._with_session, self._release, buffered)
+                print(f"↩ [{name}] Released {released} buffered jobs")
+            for _ in workers[name]:
+                stage.queue.put_nowait(None)
+        await asyncio.gather(*(task for tasks in workers.values() for task in tasks))
+        if ingest is not None:
+            await ingest
+        await monitor
+
+        for executor in [self.ingest_executor, self.db_executor] + [s.executor for s in self.stages.values()]:
+            executor.shutdown(wait=True)
+
+        print()
+        print("=" * 80)
+        self.print_stats()
+        print("=" * 80)
+        return self.stats()
+
+    def _enqueue_backlog(self, session):
+        queued = enqueue_pending(session)
+        session.commit()
+        return queued
+
+    def _release(self, session, job_ids):
+        released = release(session, job_ids, self.owner)
+        session.commit()
+        return released
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Long-running ingest -> scrape -> summarize pipeline')
+    parser.add_argument('--scrape-workers', type=int, default=4, help='Concurrent scrapes (default 4)')
+    parser.add_argument('--summarize-workers', type=int, default=1, help='Concurrent AI summaries (default 1)')
+    parser.add_argument('--fetch-interval', type=int, default=FETCH_INTERVAL,
+                        help=f'Seconds between RSS fetches (default {FETCH_INTERVAL})')
+    parser.add_argument('--no-fetch', action='store_true', help='Only work the scrape/summarize queues')
+    parser.add_argument('--poll-interval', type=int, default=POLL_INTERVAL,
+                        help=f'Seconds between idle queue checks (default {POLL_INTERVAL})')
+    parser.add_argument('--stats-interval', type=int, default=STATS_INTERVAL,
+                        help=f'Seconds between throughput reports (default {STATS_INTERVAL})')
+    parser.add_argument('--once', action='store_true', help='Fetch once, drain the queues, then exit')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on this port (GET /metrics)')
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        from src.utils.metrics import start_metrics_server
+        start_metrics_server(args.metrics_port)
+        print(f"✓ Metrics at http://localhost:{args.metrics_port}/metrics")
+
+    worker = PipelineWorker(
+        scrape_workers=args.scrape_workers,
+        summarize_workers=args.summarize_workers,
+        fetch=not args.no_fetch,
+        fetch_interval=args.fetch_interval,
+        poll_interval=args.poll_interval,
+        stats_interval=args.stats_interval,
+        once=args.once
+    )
+    asyncio.run(worker.run())
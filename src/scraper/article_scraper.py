@@ -11,6 +11,10 @@ from urllib.parse import urlparse, parse_qs, unquote
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.database import RawItem, ArticleContent, get_session
+from src.ingest.gating import gate_new_items
+from src.scraper.dedup import assign_cluster
+from src.pipeline.jobs import SCRAPE, SUMMARIZE, enqueue, enqueue_pending, claim, complete, fail, worker_id
+from src.utils.metrics import span
 
 
 def load_config(config_path='config/feeds.json'):
@@ -48,8 +52,21 @@ def extract_real_url_from_google_redirect(google_url):
         return google_url
 
 
+# HTTP statuses worth another attempt later; any other non-200 is permanent
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+
+
+def is_retryable_status(status_code):
+    """True for rate limiting, request timeouts and server errors (5xx)."""
+    return status_code in RETRYABLE_STATUS_CODES or 500 <= status_code < 600
+
+
 def scrape_article(url, config):
-    """Scrape full article content from URL."""
+    """Scrape full article content from URL.
+
+    Returns:
+        Same as fetch_article
+    """
     # Extract real URL from Google redirect if needed
     original_url = url
     url = extract_real_url_from_google_redirect(url)
@@ -58,6 +75,20 @@ def scrape_article(url, config):
         print(f"  → Extracted real URL from Google redirect")
         print(f"     {url[:80]}...")
 
+    with span('scrape', host=urlparse(url).netloc) as scrape_span:
+        content, error, retryable = fetch_article(url, config)
+        if error:
+            scrape_span.fail(error)
+    return content, error, retryable
+
+
+def fetch_article(url, config):
+    """Fetch and clean an article page (following meta refreshes).
+
+    Returns:
+        Tuple of (content dict, None, False) or (None, error message, retryable)
+        where retryable is True for timeouts, connection errors, 429 and 5xx
+    """
     headers = {
         'User-Agent': config['scraping']['user_agent']
     }
@@ -71,7 +102,7 @@ def scrape_article(url, config):
         )
 
         if response.status_code != 200:
-            return None, f"HTTP {response.status_code}"
+            return None, f"HTTP {response.status_code}", is_retryable_status(response.status_code)
 
         # Parse HTML
         soup = BeautifulSoup(response.content, 'lxml')
@@ -93,7 +124,7 @@ def scrape_article(url, config):
                 )
 
                 if response.status_code != 200:
-                    return None, f"HTTP {response.status_code} (redirected)"
+                    return None, f"HTTP {response.status_code} (redirected)", is_retryable_status(response.status_code)
 
                 soup = BeautifulSoup(response.content, 'lxml')
 
@@ -114,88 +145,151 @@ def scrape_article(url, config):
             'clean_text': text,
             'success': True,
             'error': None
-        }, None
+        }, None, False
 
     except requests.Timeout:
-        return None, "Timeout"
+        return None, "Timeout", True
+    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+        return None, f"Request error: {str(e)}", True
     except requests.RequestException as e:
-        return None, f"Request error: {str(e)}"
+        # Invalid URLs, too many redirects and the like won't fix themselves
+        return None, f"Request error: {str(e)}", False
     except Exception as e:
-        return None, f"Parse error: {str(e)}"
+        return None, f"Parse error: {str(e)}", False
 
 
-def scrape_pending_items(limit=None, delay=1.0):
-    """Scrape articles for items that haven't been scraped yet."""
-    config = load_config()
-    session = get_session()
+def run_scrape_job(session, job, owner, config):
+    """Scrape the item of a claimed scrape job and record the outcome (commits).
+
+    Successful scrapes store the article, join a story cluster and, for
+    cluster representatives, queue a summarize job. Transient fetch failures
+    go back to the queue for a retry; permanent ones (403, 404, parse errors)
+    and jobs out of attempts have the failure stored and the item marked
+    failed.
 
-    # Get items without article content
-    query = session.query(RawItem).filter(
-        ~RawItem.id.in_(
-            session.query(ArticleContent.item_id)
+    Returns:
+        Tuple of (outcome, item, detail) where outcome is one of
+        'skipped' (item rejected or scraped since it was queued), 'scraped'
+        (detail: text length), 'duplicate' (detail: cluster id), 'retry' or
+        'failed' (detail: error message)
+    """
+    item = session.get(RawItem, job.item_id)
+    if item is None or item.status != 'new' or item.article is not None:
+        complete(session, job, owner)
+        session.commit()
+        return 'skipped', item, None
+
+    # Scrape the article
+    result, error, retryable = scrape_article(item.url, config)
+
+    if result:
+        # Save to database
+        article = ArticleContent(
+            item_id=item.id,
+            html=result['html'],
+            clean_text=result['clean_text'],
+            scrape_success=True,
+            error_message=None
         )
-    ).filter(
-        RawItem.status == 'new'
-    )
+        session.add(article)
 
-    if limit:
-        query = query.limit(limit)
+        # Update raw item status
+        item.status = 'scraped'
 
-    items = query.all()
+        # Group near-duplicate coverage of the same story
+        fingerprint = assign_cluster(session, item, result['clean_text'])
+        if fingerprint.cluster_id != item.id:
+            outcome, detail = 'duplicate', fingerprint.cluster_id
+        else:
+            enqueue(session, SUMMARIZE, [item.id])
+            outcome, detail = 'scraped', len(result['clean_text'])
+
+        complete(session, job, owner)
+
+    elif fail(session, job, owner, error, retry=retryable):
+        # Transient failures (timeouts, 429, 5xx) get another attempt later
+        outcome, detail = 'retry', error
+
+    else:
+        # Permanent failure or out of attempts: save error to database
+        article = ArticleContent(
+            item_id=item.id,
+            html=None,
+            clean_text=None,
+            scrape_success=False,
+            error_message=error
+        )
+        session.add(article)
+
+        # Update raw item status
+        item.status = 'failed'
+        outcome, detail = 'failed', error
+
+    session.commit()
+    return outcome, item, detail
+
+
+def scrape_pending_items(limit=None, delay=1.0, gate=True):
+    """Scrape articles for items that haven't been scraped yet.
+
+    Unless gate is False, low-relevance and excluded items are first marked
+    auto_rejected (see src/ingest/gating.py) so they are never fetched.
+
+    Work is pulled from the scrape job queue (src/pipeline/jobs.py) one
+    claimed job at a time, so overlapping runs never scrape the same item.
+    Transient fetch failures are retried on later runs; an item is marked
+    failed straight away for permanent errors (403, 404, parse errors) and
+    otherwise once its job runs out of attempts. Successful scrapes queue the
+    item for summarizing.
+    """
+    config = load_config()
+    session = get_session()
+    owner = worker_id()
+
+    if gate:
+        gate_new_items(session)
+        print()
+
+    # Queue items without article content (no-op for items already queued)
+    enqueue_pending(session, stages=(SCRAPE,))
+    session.commit()
 
     print("=" * 80)
-    print(f"SCRAPING ARTICLES ({len(items)} items)")
+    print(f"SCRAPING ARTICLES ({limit or 'all'} items)")
     print("=" * 80)
     print()
 
     success_count = 0
     error_count = 0
+    i = 0
 
-    for i, item in enumerate(items, 1):
-        print(f"[{i}/{len(items)}] Scraping: {item.title[:60]}...")
-
-        # Scrape the article
-        result, error = scrape_article(item.url, config)
+    while not limit or i < limit:
+        jobs = claim(session, SCRAPE, owner)
+        if not jobs:
+            break
+        job = jobs[0]
 
-        if result:
-            # Save to database
-            article = ArticleContent(
-                item_id=item.id,
-                html=result['html'],
-                clean_text=result['clean_text'],
-                scrape_success=True,
-                error_message=None
-            )
-            session.add(article)
+        outcome, item, detail = run_scrape_job(session, job, owner, config)
+        if outcome == 'skipped':
+            continue
 
-            # Update raw item status
-            item.status = 'scraped'
+        i += 1
+        print(f"[{i}] Scraping: {item.title[:60]}...")
 
+        if outcome in ('scraped', 'duplicate'):
             success_count += 1
-            print(f"  ✓ Success ({len(result['clean_text'])} chars)")
-
+            print(f"  ✓ Success ({len(item.article.clean_text)} chars)")
+            if outcome == 'duplicate':
+                print(f"  ↳ Near duplicate of item {detail} (story cluster)")
         else:
-            # Save error to database
-            article = ArticleContent(
-                item_id=item.id,
-                html=None,
-                clean_text=None,
-                scrape_success=False,
-                error_message=error
-            )
-            session.add(article)
-
-            # Update raw item status
-            item.status = 'failed'
-
             error_count += 1
-            print(f"  ✗ Failed: {error}")
-
-        session.commit()
+            if outcome == 'retry':
+                print(f"  ✗ Failed: {detail} (will retry, attempt {job.attempts}/{job.max_attempts})")
+            else:
+                print(f"  ✗ Failed: {detail}")
 
         # Delay between requests
-        if i < len(items):
-            time.sleep(delay)
+        time.sleep(delay)
 
     print()
     print("=" * 80)
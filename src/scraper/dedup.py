@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate story clustering with MinHash-LSH.
+
+Google Alerts often delivers the same announcement from several outlets.
+Each scraped article gets a MinHash signature over word 3-gram shingles of
+its clean text (title + RSS summary when the text is too short), stored in
+story_fingerprints. The signature is split into LSH bands whose hashes go into
+the indexed story_bands table, so a new item finds candidate duplicates with
+a handful of index lookups instead of comparing against every stored article.
+
+Candidates whose estimated Jaccard similarity reaches JACCARD_THRESHOLD are
+near duplicates: the new item joins the most similar candidate's cluster, or
+starts a new cluster with itself as representative. Only representatives are
+shown in triage and sent to the summarizer.
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import or_, and_
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.database import RawItem, ArticleContent, StoryFingerprint, StoryBand, get_session
+
+# 16 bands x 4 rows: items with Jaccard ~0.5 become candidates about half the
+# time, ~0.75 almost always, unrelated text practically never
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+JACCARD_THRESHOLD = 0.5
+
+SHINGLE_SIZE = 3
+
+# Shorter scraped text (paywall stubs, cookie notices) falls back to title + summary
+MIN_TEXT_LENGTH = 200
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Fixed permutations (a * x + b) mod p so signatures are comparable across runs
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingles(text):
+    """Unique word n-gram shingles of lowercased text (single words for very short text)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """
+    MinHash signature of text
+
+    Shingles are hashed with BLAKE2b (stable across processes, unlike hash())
+    and all permutations are applied at once as a NumPy outer product.
+
+    Returns:
+        uint32 array of NUM_PERM values (all max values for empty text)
+    """
+    shingles = _shingles(text or '')
+    if not shingles:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    permuted = np.bitwise_and((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME, _MAX_HASH)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_values(signature):
+    """Hash each band's rows into one signed 64-bit value (fits SQLite INTEGER)"""
+    rows = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'little', signed=True)
+        for row in rows
+    ]
+
+
+def fingerprint_text(item, clean_text=None):
+    """
+    Text to fingerprint for an item
+
+    Returns:
+        Tuple of (text, source) where source is 'text' or 'title'
+    """
+    if clean_text and len(clean_text) >= MIN_TEXT_LENGTH:
+        return clean_text, 'text'
+    return f"{item.title or ''} {item.rss_summary or ''}", 'title'
+
+
+def find_cluster(session, signature, exclude_item_id=None):
+    """
+    Find the most similar stored story at or above JACCARD_THRESHOLD
+
+    Returns:
+        Tuple of (cluster_id, similarity), or (None, None) if no near duplicate
+    """
+    bands = band_values(signature)
+    candidate_ids = session.query(StoryBand.fingerprint_id).filter(
+        or_(*(and_(StoryBand.band == i, StoryBand.value == value) for i, value in enumerate(bands)))
+    ).distinct()
+
+    query = session.query(StoryFingerprint.item_id, StoryFingerprint.signature, StoryFingerprint.cluster_id).filter(
+        StoryFingerprint.id.in_(candidate_ids)
+    )
+    if exclude_item_id is not None:
+        query = query.filter(StoryFingerprint.item_id != exclude_item_id)
+
+    best = (None, None)
+    for item_id, stored, cluster_id in query:
+        score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+        if score >= JACCARD_THRESHOLD and (best[1] is None or score > best[1]):
+            best = (cluster_id or item_id, score)
+    return best
+
+
+def assign_cluster(session, item, clean_text=None):
+    """
+    Fingerprint an item and add it to a story cluster (caller commits)
+
+    Args:
+        session: Database session
+        item: RawItem (must have an id)
+        clean_text: Scraped article text, if available
+
+    Returns:
+        StoryFingerprint (cluster_id == item.id when the item starts a new cluster)
+    """
+    text, source = fingerprint_text(item, clean_text)
+    signature = minhash(text)
+    cluster_id, _ = find_cluster(session, signature, exclude_item_id=item.id)
+
+    fingerprint = session.query(StoryFingerprint).filter_by(item_id=item.id).first()
+    if fingerprint is None:
+        fingerprint = StoryFingerprint(item_id=item.id)
+        session.add(fingerprint)
+
+    fingerprint.signature = signature.tobytes()
+    fingerprint.cluster_id = cluster_id or item.id
+    fingerprint.source = source
+    fingerprint.bands = [StoryBand(band=i, value=value) for i, value in enumerate(band_values(signature))]
+
+    # Make the new fingerprint visible to the next lookup in this session
+    session.flush()
+    return fingerprint
+
+
+def duplicate_item_ids(session):
+    """Subquery of item ids that are non-representative members of a cluster"""
+    return session.query(StoryFingerprint.item_id).filter(
+        StoryFingerprint.cluster_id != StoryFingerprint.item_id
+    )
+
+
+def get_cluster_members(session, cluster_ids):
+    """
+    Non-representative members for a set of clusters
+
+    Returns:
+        Dict of cluster_id -> list of RawItem
+    """
+    members = {}
+    if not cluster_ids:
+        return members
+
+    rows = session.query(StoryFingerprint.cluster_id, RawItem).join(
+        RawItem, RawItem.id == StoryFingerprint.item_id
+    ).filter(
+        StoryFingerprint.cluster_id.in_(list(cluster_ids)),
+        StoryFingerprint.item_id != StoryFingerprint.cluster_id
+    ).order_by(RawItem.id)
+
+    for cluster_id, item in rows:
+        members.setdefault(cluster_id, []).append(item)
+    return members
+
+
+def cluster_unassigned(limit=None):
+    """Fingerprint successfully scraped items that have no fingerprint yet (oldest first)"""
+    session = get_session()
+    try:
+        query = session.query(RawItem, ArticleContent.clean_text).join(
+            ArticleContent, ArticleContent.item_id == RawItem.id
+        ).filter(
+            ArticleContent.scrape_success == True,
+            ~RawItem.id.in_(session.query(StoryFingerprint.item_id))
+        ).order_by(RawItem.id)
+
+        if limit:
+            query = query.limit(limit)
+
+        clustered = 0
+        duplicates = 0
+        for item, clean_text in query.all():
+            fingerprint = assign_cluster(session, item, clean_text)
+            clustered += 1
+            if fingerprint.cluster_id != item.id:
+                duplicates += 1
+
+        session.commit()
+        print(f"Fingerprinted {clustered} items: {duplicates} joined existing story clusters")
+        return clustered, duplicates
+    finally:
+        session.close()
+
+
+def benchmark(n=5_000, probes=200, seed=42):
+    """
+    Compare near-duplicate lookups via LSH bands vs comparing every signature
+
+    Builds n synthetic ~500-word articles in memory, then looks up edited
+    copies (a few words changed, outlet boilerplate added) of random ones.
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+             for _ in range(5000)]
+
+    def article(words):
+        return [rng.choice(vocab) for _ in range(words)]
+
+    docs = [article(500) for _ in range(n)]
+    signatures = [minhash(' '.join(doc)) for doc in docs]
+
+    band_index = {}
+    for idx, signature in enumerate(signatures):
+        for key in enumerate(band_values(signature)):
+            band_index.setdefault(key, []).append(idx)
+
+    queries = []
+    for _ in range(probes):
+        target = rng.randrange(n)
+        words = list(docs[target])
+        for _ in range(5):
+            words[rng.randrange(len(words))] = rng.choice(vocab)
+        text = ' '.join(article(30) + words + article(30))
+        queries.append((target, minhash(text)))
+
+    start = time.perf_counter()
+    scan_found = sum(
+        1 for target, sig in queries
+        if max(range(n), key=lambda i: similarity(sig, signatures[i])) == target
+    )
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lsh_found = 0
+    candidates_checked = 0
+    for target, sig in queries:
+        candidates = {idx for key in enumerate(band_values(sig)) for idx in band_index.get(key, ())}
+        candidates_checked += len(candidates)
+        matches = [idx for idx in candidates if similarity(sig, signatures[idx]) >= JACCARD_THRESHOLD]
+        if target in matches:
+            lsh_found += 1
+    lsh_time = time.perf_counter() - start
+
+    print(f"{probes} near-duplicate lookups against {n:,} stored articles")
+    print(f"  Full scan:  {scan_time / probes * 1000:8.2f} ms/lookup ({scan_found}/{probes} found)")
+    print(f"  LSH bands:  {lsh_time / probes * 1000:8.2f} ms/lookup ({lsh_found}/{probes} found, "
+          f"{candidates_checked / probes:.1f} candidates per lookup)")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    os.chdir(Path(__file__).parent.parent.parent)
+
+    parser = argparse.ArgumentParser(description='Near-duplicate story clustering')
+    parser.add_argument('--limit', type=int, default=None, help='Max items to fingerprint')
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark LSH lookups vs a full scan')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        cluster_unassigned(limit=args.limit)
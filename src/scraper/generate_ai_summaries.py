@@ -3,135 +3,256 @@
 Generate AI summaries for scraped articles.
 
 Run this after article_scraper.py to generate AI summaries for articles
-that don't have them yet.
+that don't have them yet. Work comes from the summarize job queue
+(src/pipeline/jobs.py), so several runs can safely overlap.
 """
 
 import sys
+from datetime import datetime
 from pathlib import Path
 import time
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.database import RawItem, ArticleContent, AIExtraction, get_session
+from src.database.categories import set_categories
+from src.database.companies import link_company
 from src.utils.ai_summarizer import summarize_deal_article, format_summary_for_display
+from src.scraper.dedup import duplicate_item_ids
+from src.utils.amounts import parse_amount_usd
+from src.pipeline.jobs import SUMMARIZE, enqueue_pending, claim, complete, fail, worker_id
 
 
-def generate_summaries(limit=5, force_regenerate=False):
+def summarize_item(session, item):
     """
-    Generate AI summaries for articles.
+    Summarize one scraped item into its AIExtraction (caller commits)
 
     Args:
-        limit: Max number of summaries to generate
-        force_regenerate: If True, regenerate summaries even if they exist
+        session: Database session
+        item: RawItem with successfully scraped article content
+
+    Returns:
+        Summary dict from summarize_deal_article
     """
+    article = item.article
 
-    session = get_session()
+    # Generate AI summary
+    summary = summarize_deal_article(
+        article_text=article.clean_text,
+        article_title=item.title,
+        article_url=item.url
+    )
 
-    # Find articles that need summaries
-    query = session.query(RawItem).join(ArticleContent).outerjoin(AIExtraction)
+    # Check if extraction exists
+    extraction = session.query(AIExtraction).filter_by(item_id=item.id).first()
 
-    if force_regenerate:
-        # Regenerate all that have article content
-        items = query.filter(
-            ArticleContent.scrape_success == True
-        ).limit(limit).all()
+    if extraction:
+        # Update existing
+        extraction.company = summary.get('company_name')
+        extraction.company_description = summary.get('company_description')
+        extraction.deal_type = summary.get('deal_type')  # Legacy
+        extraction.deal_amount = summary.get('deal_amount')
+        extraction.amount_usd = parse_amount_usd(summary.get('deal_amount'))
+        extraction.investors = summary.get('investors')
+        # New enhanced category fields
+        extraction.transaction_type = summary.get('transaction_type')
+        extraction.strategic_significance = summary.get('strategic_significance')
+        extraction.market_implications = summary.get('market_implications')
+        extraction.summary_complete = summary.get('summary_complete', False)
+        extraction.model_used = summary.get('model_used')
+        extraction.extracted_at = datetime.utcnow()
     else:
-        # Only generate for items without complete summaries
-        # Include items with no AI extraction OR incomplete extractions
-        from sqlalchemy import or_
-        items = query.filter(
-            ArticleContent.scrape_success == True,
-            or_(
-                AIExtraction.id == None,  # No AI extraction yet
-                AIExtraction.summary_complete == False,  # Incomplete extraction
-                AIExtraction.summary_complete == None  # Null summary_complete
-            )
-        ).limit(limit).all()
+        # Create new
+        extraction = AIExtraction(
+            item_id=item.id,
+            company=summary.get('company_name'),
+            company_description=summary.get('company_description'),
+            deal_type=summary.get('deal_type'),  # Legacy
+            deal_amount=summary.get('deal_amount'),
+            amount_usd=parse_amount_usd(summary.get('deal_amount')),
+            investors=summary.get('investors'),
+            # New enhanced category fields
+            transaction_type=summary.get('transaction_type'),
+            strategic_significance=summary.get('strategic_significance'),
+            market_implications=summary.get('market_implications'),
+            summary_complete=summary.get('summary_complete', False),
+            model_used=summary.get('model_used')
+        )
+        session.add(extraction)
 
-    if not items:
-        print("No items need AI summaries!")
-        session.close()
-        return 0, 0
+    # Sectors/capital sources: text columns + junction rows
+    set_categories(session, extraction, summary.get('sectors'), summary.get('capital_sources'))
+    # Resolve the company against the registry
+    link_company(session, extraction)
 
-    print("=" * 80)
-    print(f"GENERATING AI SUMMARIES FOR {len(items)} ARTICLES")
-    print("=" * 80)
-    print()
+    return summary
+
+
+def needs_summary(item):
+    """False once an item was summarized, rescraped or clustered as a near duplicate"""
+    return not (item is None or item.article is None or not item.article.scrape_success
+                or (item.extraction is not None and item.extraction.summary_complete)
+                or (item.fingerprint is not None and item.fingerprint.cluster_id != item.id))
 
+
+def run_summarize_job(session, job, owner):
+    """
+    Summarize the item of a claimed summarize job and record the outcome (commits)
+
+    Incomplete summaries and errors go back to the queue for a retry until
+    the job is out of attempts.
+
+    Returns:
+        Tuple of (outcome, item, detail) where outcome is one of
+        'skipped' (no longer needs a summary), 'summarized' (detail: summary
+        dict), 'retry' or 'failed' (detail: error message)
+    """
+    item = session.get(RawItem, job.item_id)
+    if not needs_summary(item):
+        complete(session, job, owner)
+        session.commit()
+        return 'skipped', item, None
+
+    try:
+        summary = summarize_item(session, item)
+        if summary.get('summary_complete'):
+            complete(session, job, owner)
+            session.commit()
+            return 'summarized', item, summary
+        error = 'Summary incomplete (no API key or error)'
+    except Exception as e:
+        session.rollback()
+        error = str(e)
+
+    retry = fail(session, job, owner, error)
+    session.commit()
+    return ('retry' if retry else 'failed'), item, error
+
+
+def summarize_forced(session, items, limit):
+    """
+    Regenerate summaries for the given items outside the job queue (--force)
+
+    Returns:
+        Tuple of (success_count, error_count, items processed)
+    """
     success_count = 0
     error_count = 0
+    i = 0
 
     for i, item in enumerate(items, 1):
-        print(f"[{i}/{len(items)}] {item.title[:60]}...")
-
-        # Get article content
-        article = item.article
+        print(f"[{i}] {item.title[:60]}...")
 
         try:
-            # Generate AI summary
-            summary = summarize_deal_article(
-                article_text=article.clean_text,
-                article_title=item.title,
-                article_url=item.url
-            )
-
-            # Check if extraction exists
-            extraction = session.query(AIExtraction).filter_by(item_id=item.id).first()
-
-            if extraction:
-                # Update existing
-                extraction.company = summary.get('company_name')
-                extraction.company_description = summary.get('company_description')
-                extraction.deal_type = summary.get('deal_type')  # Legacy
-                extraction.deal_amount = summary.get('deal_amount')
-                extraction.investors = summary.get('investors')
-                # New enhanced category fields
-                extraction.transaction_type = summary.get('transaction_type')
-                extraction.capital_sources = ','.join(summary.get('capital_sources', [])) if summary.get('capital_sources') else None
-                extraction.sectors = ','.join(summary.get('sectors', [])) if summary.get('sectors') else None
-                extraction.strategic_significance = summary.get('strategic_significance')
-                extraction.market_implications = summary.get('market_implications')
-                extraction.summary_complete = summary.get('summary_complete', False)
-                extraction.model_used = summary.get('model_used')
-            else:
-                # Create new
-                extraction = AIExtraction(
-                    item_id=item.id,
-                    company=summary.get('company_name'),
-                    company_description=summary.get('company_description'),
-                    deal_type=summary.get('deal_type'),  # Legacy
-                    deal_amount=summary.get('deal_amount'),
-                    investors=summary.get('investors'),
-                    # New enhanced category fields
-                    transaction_type=summary.get('transaction_type'),
-                    capital_sources=','.join(summary.get('capital_sources', [])) if summary.get('capital_sources') else None,
-                    sectors=','.join(summary.get('sectors', [])) if summary.get('sectors') else None,
-                    strategic_significance=summary.get('strategic_significance'),
-                    market_implications=summary.get('market_implications'),
-                    summary_complete=summary.get('summary_complete', False),
-                    model_used=summary.get('model_used')
-                )
-                session.add(extraction)
-
+            summary = summarize_item(session, item)
             session.commit()
 
             if summary.get('summary_complete'):
                 success_count += 1
                 print(f"  ✓ Generated summary")
-                # Optionally print summary for review
-                # print(format_summary_for_display(summary))
             else:
                 error_count += 1
                 print(f"  ⚠️  Summary incomplete (no API key or error)")
 
         except Exception as e:
+            session.rollback()
             error_count += 1
             print(f"  ✗ Error: {e}")
 
         # Rate limiting (Claude API has limits)
-        if i < len(items):
+        if i < limit:
+            time.sleep(1)  # 1 second between requests
+
+    return success_count, error_count, i
+
+
+def summarize_queued(session, owner, limit):
+    """
+    Claim summarize jobs one at a time and run them with run_summarize_job
+
+    Returns:
+        Tuple of (success_count, error_count, items processed)
+    """
+    success_count = 0
+    error_count = 0
+    i = 0
+
+    while i < limit:
+        jobs = claim(session, SUMMARIZE, owner)
+        if not jobs:
+            break
+        job = jobs[0]
+
+        outcome, item, detail = run_summarize_job(session, job, owner)
+        if outcome == 'skipped':
+            continue
+
+        i += 1
+        print(f"[{i}] {item.title[:60]}...")
+
+        if outcome == 'summarized':
+            success_count += 1
+            print(f"  ✓ Generated summary")
+            # Optionally print summary for review
+            # print(format_summary_for_display(detail))
+        else:
+            error_count += 1
+            if outcome == 'retry':
+                print(f"  ✗ {detail} (will retry, attempt {job.attempts}/{job.max_attempts})")
+            else:
+                print(f"  ✗ {detail}")
+
+        # Rate limiting (Claude API has limits)
+        if i < limit:
             time.sleep(1)  # 1 second between requests
 
+    return success_count, error_count, i
+
+
+def generate_summaries(limit=5, force_regenerate=False):
+    """
+    Generate AI summaries for articles.
+
+    Items are pulled from the summarize job queue (src/pipeline/jobs.py) and
+    run with run_summarize_job, so overlapping runs never summarize the same
+    item twice. Incomplete summaries and errors are retried on later runs
+    until the job runs out of attempts.
+
+    Args:
+        limit: Max number of summaries to generate
+        force_regenerate: If True, regenerate summaries even if they exist
+            (bypasses the queue)
+    """
+
+    session = get_session()
+    owner = worker_id()
+
+    if not force_regenerate:
+        # Queue items without complete summaries (no-op for items already queued)
+        enqueue_pending(session, stages=(SUMMARIZE,))
+        session.commit()
+
+    print("=" * 80)
+    print(f"GENERATING AI SUMMARIES (up to {limit} articles)")
+    print("=" * 80)
+    print()
+
+    if force_regenerate:
+        # Regenerate all that have article content
+        # (only story cluster representatives; near duplicates are skipped)
+        items = session.query(RawItem).join(ArticleContent).filter(
+            ~RawItem.id.in_(duplicate_item_ids(session)),
+            ArticleContent.scrape_success == True
+        ).limit(limit).all()
+        success_count, error_count, processed = summarize_forced(session, items, limit)
+    else:
+        success_count, error_count, processed = summarize_queued(session, owner, limit)
+
+    if processed == 0:
+        print("No items need AI summaries!")
+        session.close()
+        return 0, 0
+
     print()
     print("=" * 80)
     print(f"SUMMARY: {success_count} successful, {error_count} failed/incomplete")
@@ -2,9 +2,17 @@
 """
 Import articles from Excel file into the triage system.
 Reads the Raw_GA sheet and adds articles to raw_items, then scrapes them.
+
+Built for large sheets: URLs and dates are normalized a column at a time,
+the sheet is diffed against every stored URL fetched in one query, and new
+rows go in with chunked multi-row INSERTs (committed per chunk, so an
+interrupted import resumes where it stopped when re-run). URLs are
+canonicalized (see src/utils/urls.py) so tracking variants of a stored
+article are skipped.
 """
 
 import sys
+import time
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
@@ -12,77 +20,131 @@ from datetime import datetime
 # Add parent directories to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from sqlalchemy import insert, select
+
 from src.database import RawItem, get_session
+from src.ingest.relevance import get_scorer
+from src.utils.urls import canonicalize_url
+
+DEFAULT_EXCEL_FILE = "Sheet with many articles that could be added to triage system.xlsx"
+
+# Rows per INSERT statement / commit
+CHUNK_SIZE = 1000
+
+
+def normalize_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean the sheet's columns into raw_items fields
 
+    Returns:
+        DataFrame with url (canonical), submitted_url, title, rss_summary and
+        published_date columns; rows without a valid http(s) URL dropped.
+        Unparseable dates fall back to the import time.
+    """
+    submitted = df['URL'].astype('string').str.strip()
+    dates = pd.to_datetime(df['Date Created'], errors='coerce', format='mixed', utc=True)
 
-def import_excel_articles(excel_path: str, sheet_name: str = 'Raw_GA'):
+    rows = pd.DataFrame({
+        'submitted_url': submitted,
+        'url': submitted.map(canonicalize_url, na_action='ignore'),
+        'title': df['Title'].fillna('').astype(str).str.strip(),
+        'rss_summary': df['Summary'].fillna('').astype(str) if 'Summary' in df else '',
+        'published_date': dates.dt.tz_convert(None).fillna(pd.Timestamp(datetime.now())),
+    })
+    return rows[rows['url'].notna()]
+
+
+def import_excel_articles(excel_path: str, sheet_name: str = 'Raw_GA', chunk_size: int = CHUNK_SIZE):
     """Import articles from Excel file into raw_items table."""
 
     # Read Excel file
     print(f"Reading Excel file: {excel_path}")
+    start = time.perf_counter()
     df = pd.read_excel(excel_path, sheet_name=sheet_name)
-    print(f"Found {len(df)} articles in sheet '{sheet_name}'")
+    read_time = time.perf_counter() - start
+    print(f"Found {len(df)} articles in sheet '{sheet_name}' ({read_time:.1f}s)")
 
-    session = get_session()
+    start = time.perf_counter()
+    rows = normalize_sheet(df)
+    invalid = len(df) - len(rows)
 
-    imported = 0
-    skipped = 0
-
-    for idx, row in df.iterrows():
-        title = row['Title']
-        url = row['URL']
-        date_str = row['Date Created']
-        summary = row['Summary'] if pd.notna(row['Summary']) else ''
-
-        # Parse date
-        try:
-            published_date = pd.to_datetime(date_str)
-        except:
-            published_date = datetime.now()
-
-        # Check if URL already exists
-        existing = session.query(RawItem).filter_by(url=url).first()
-        if existing:
-            print(f"  Skip (exists): {title[:60]}...")
-            skipped += 1
-            continue
-
-        # Create new raw item
-        raw_item = RawItem(
-            title=title,
-            url=url,
-            published_date=published_date,
-            rss_summary=summary,
-            feed_source='Excel Import',
-            date_found=datetime.now()
-        )
-
-        session.add(raw_item)
-        imported += 1
-        print(f"  ✓ Imported: {title[:60]}...")
-
-    session.commit()
-    session.close()
+    # Same article listed twice in the sheet
+    unique = rows.drop_duplicates('url')
+    repeated = len(rows) - len(unique)
+
+    session = get_session()
+    scorer = get_scorer()
+
+    try:
+        # Every stored URL in one query (index-only scan)
+        existing_urls = set(session.scalars(select(RawItem.url)))
+        exists = unique['url'].isin(existing_urls) | unique['submitted_url'].isin(existing_urls)
+        new_rows = unique[~exists]
+        skipped = int(exists.sum())
+
+        # Relevance scoring and row dicts
+        now = datetime.now()
+        records = []
+        for url, title, summary, published_date in zip(
+            new_rows['url'], new_rows['title'], new_rows['rss_summary'], new_rows['published_date']
+        ):
+            score, flags = scorer.score(title, summary)
+            records.append({
+                'url': url,
+                'title': title,
+                'rss_summary': summary,
+                'published_date': published_date.to_pydatetime(),
+                'feed_source': 'Excel Import',
+                'date_found': now,
+                'status': 'new',
+                'relevance_score': score,
+                'relevance_flags': flags
+            })
+
+        # Chunked bulk inserts (executemany), one commit per chunk
+        for i in range(0, len(records), chunk_size):
+            session.execute(insert(RawItem), records[i:i + chunk_size])
+            session.commit()
+            if len(records) > chunk_size:
+                print(f"  ✓ Inserted {min(i + chunk_size, len(records))}/{len(records)}")
+
+    finally:
+        session.close()
+
+    elapsed = time.perf_counter() - start
+    rate = len(df) / elapsed if elapsed > 0 else float('inf')
 
     print(f"\n✅ Import complete!")
-    print(f"   Imported: {imported}")
+    print(f"   Imported: {len(records)}")
     print(f"   Skipped (duplicates): {skipped}")
+    if repeated:
+        print(f"   Skipped (repeated in sheet): {repeated}")
+    if invalid:
+        print(f"   Skipped (invalid URL): {invalid}")
+    print(f"   Processed {len(df)} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec, excluding Excel read)")
     print(f"\nNext steps:")
     print(f"1. Run article scraper: python3 src/scraper/article_scraper.py")
     print(f"2. Review in triage UI: python3 src/web/app.py")
 
+    return len(records)
+
 
 if __name__ == "__main__":
+    import argparse
     import os
 
     # Change to project root
     project_root = Path(__file__).parent.parent.parent
     os.chdir(project_root)
 
-    excel_file = "Sheet with many articles that could be added to triage system.xlsx"
+    parser = argparse.ArgumentParser(description='Import articles from an Excel sheet into the triage system')
+    parser.add_argument('excel_file', nargs='?', default=DEFAULT_EXCEL_FILE, help='Excel workbook')
+    parser.add_argument('--sheet', default='Raw_GA', help='Sheet name (default Raw_GA)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows per INSERT/commit')
+    args = parser.parse_args()
 
-    if not Path(excel_file).exists():
-        print(f"Error: Excel file not found: {excel_file}")
+    if not Path(args.excel_file).exists():
+        print(f"Error: Excel file not found: {args.excel_file}")
         sys.exit(1)
 
-    import_excel_articles(excel_file)
+    import_excel_articles(args.excel_file, sheet_name=args.sheet, chunk_size=args.chunk_size)
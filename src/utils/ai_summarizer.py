@@ -12,8 +12,18 @@ Uses Claude API to extract structured information from scraped articles:
 
 import os
 import json
+import sys
+from pathlib import Path
 from anthropic import Anthropic
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.metrics import counter, timed
+
+llm_tokens = counter('llm_tokens_total', 'Tokens used by AI summaries (labels: direction)')
+
+
+@timed('summarize', outcome=lambda summary: 'ok' if summary.get('summary_complete') else 'error')
 def summarize_deal_article(article_text, article_title, article_url):
     """
     Generate AI summary of a defense deal article.
@@ -97,6 +107,11 @@ Notes:
             ]
         )
 
+        usage = getattr(message, 'usage', None)
+        if usage is not None:
+            llm_tokens.inc(usage.input_tokens, direction='input')
+            llm_tokens.inc(usage.output_tokens, direction='output')
+
         # Extract response
         response_text = message.content[0].text
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Parse free-text deal amounts into numeric USD.
+
+AIExtraction.deal_amount and MasterItem.investment_amount hold strings such
+as "$300M", "$4.7B", "USD 1.2 billion", "€50m", "$10-20M" or "Not disclosed".
+parse_amount_usd() turns them into a float (or None) for the indexed
+amount_usd columns, so deals can be sorted, summed and range-filtered in SQL.
+
+Rules:
+- suffixes K/M/B/T and the words thousand/million/billion/trillion (also
+  mn, mm, bn) scale the number; a bare number is taken as-is
+- ranges ("$10-20M", "$10M to $20M") use the midpoint
+- $, US$, USD are dollars; C$/CAD, A$/AUD, €/EUR, £/GBP and ¥/JPY are
+  converted with the fixed rates in CURRENCY_TO_USD (approximate - for
+  ranking, not accounting)
+- no currency marker means USD
+- a number needs a scale suffix or a currency marker to count, so years and
+  bare counts are ignored; "undisclosed", "unknown", "N/A" give None
+"""
+
+import re
+from typing import Optional
+
+# Approximate conversion rates, only used to put non-USD deals on the same scale
+CURRENCY_TO_USD = {
+    'USD': 1.0,
+    'EUR': 1.08,
+    'GBP': 1.27,
+    'CAD': 0.73,
+    'AUD': 0.66,
+    'JPY': 0.0067,
+}
+
+# Checked in order; the dollar variants come before a bare "$" so "C$10M" is CAD
+_CURRENCY_MARKERS = [
+    (re.compile(r'C\$|CAD\b'), 'CAD'),
+    (re.compile(r'A\$|AUD\b'), 'AUD'),
+    (re.compile(r'US\$|USD|(?<![CA])\$'), 'USD'),
+    (re.compile(r'€|EUR\b|euros?\b', re.IGNORECASE), 'EUR'),
+    (re.compile(r'£|GBP\b|pounds?\b', re.IGNORECASE), 'GBP'),
+    (re.compile(r'¥|JPY\b|yen\b', re.IGNORECASE), 'JPY'),
+]
+
+_MULTIPLIERS = {
+    'k': 1e3, 'thousand': 1e3,
+    'm': 1e6, 'mm': 1e6, 'mn': 1e6, 'mil': 1e6, 'million': 1e6, 'millions': 1e6,
+    'b': 1e9, 'bn': 1e9, 'billion': 1e9, 'billions': 1e9,
+    't': 1e12, 'tn': 1e12, 'trillion': 1e12,
+}
+
+# A number with an optional scale word/suffix right after it
+_AMOUNT_PATTERN = re.compile(
+    r'(?P<number>\d+(?:,\d{3})*(?:\.\d+)?)\s*'
+    r'(?P<unit>thousand|millions?|billions?|trillion|mil|mm|mn|bn|tn|[kmbt])?(?![a-z])',
+    re.IGNORECASE
+)
+
+# Two amounts joined by a dash or "to" form a range
+_RANGE_JOINER = re.compile(r'^\s*(?:-|–|—|to)\s*(?:US\$|[CA]\$|USD|\$|€|£)?\s*$', re.IGNORECASE)
+
+# Currency marker directly before a number ("$", "USD ", "€")
+_CURRENCY_PREFIX = re.compile(r'(?:US\$|[$€£¥]|\b(?:USD|EUR|GBP|CAD|AUD|JPY))\s*$')
+
+
+def _currency_rate(text):
+    for pattern, currency in _CURRENCY_MARKERS:
+        if pattern.search(text):
+            return CURRENCY_TO_USD[currency]
+    return CURRENCY_TO_USD['USD']
+
+
+def _is_amount(text, match):
+    """A number counts as an amount if it has a scale suffix or follows a currency marker"""
+    return bool(match.group('unit')) or bool(_CURRENCY_PREFIX.search(text[:match.start()]))
+
+
+def parse_amount_usd(text) -> Optional[float]:
+    """
+    Parse a free-text deal amount into US dollars
+
+    Examples:
+        '$300M' -> 300000000.0
+        '$4.7B' -> 4700000000.0
+        '$10-20M' -> 15000000.0
+        '€50 million' -> 54000000.0
+        'C$10M' -> 7300000.0
+        'A$10M' -> 6600000.0
+        'Not disclosed' -> None
+
+    Returns:
+        Amount in USD, or None if the text has no usable amount
+    """
+    if text is None:
+        return None
+    text = str(text).strip()
+    if not text:
+        return None
+
+    matches = list(_AMOUNT_PATTERN.finditer(text))
+    # Skip bare numbers such as years ("2024 contract worth $50M")
+    while matches and not _is_amount(text, matches[0]):
+        matches.pop(0)
+    if not matches:
+        return None
+
+    first = matches[0]
+    low = float(first.group('number').replace(',', ''))
+    unit = first.group('unit')
+    high = None
+
+    # "$10-20M" / "$10M to $20M": second number right after a range joiner
+    if len(matches) > 1 and _RANGE_JOINER.match(text[first.end():matches[1].start()]):
+        second = matches[1]
+        high = float(second.group('number').replace(',', ''))
+        # "$10-20M" shares the unit of the second number
+        unit = unit or second.group('unit')
+        high_unit = second.group('unit') or unit
+        high *= _MULTIPLIERS.get(high_unit.lower(), 1.0) if high_unit else 1.0
+
+    multiplier = _MULTIPLIERS.get(unit.lower(), 1.0) if unit else 1.0
+    value = low * multiplier
+    if high is not None:
+        value = (value + high) / 2
+
+    return round(value * _currency_rate(text), 2)
+
+
+def format_usd(amount) -> str:
+    """Compact display for a USD amount ($4.7B, $300M, $250K)"""
+    if amount is None:
+        return 'Not disclosed'
+    for threshold, suffix in ((1e12, 'T'), (1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(amount) >= threshold:
+            return f"${amount / threshold:.1f}".rstrip('0').rstrip('.') + suffix
+    return f"${amount:,.0f}"
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Usage: python src/utils/amounts.py "$4.7B" "Not disclosed" ...
+    samples = sys.argv[1:] or [
+        '$300M', '$4.7B', '$1.2 billion', 'USD 50 million', '$10-20M', '$10M to $20M',
+        '€50m', '£1.5bn', 'C$10M', 'A$10M', 'CAD 25 million', '$300,000', '250K', 'Not disclosed', 'Undisclosed', 'Unknown', ''
+    ]
+    for sample in samples:
+        amount = parse_amount_usd(sample)
+        print(f"{sample!r:>20} -> {amount!r:<16} {format_usd(amount)}")
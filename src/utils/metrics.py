@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Lightweight pipeline instrumentation: timing spans, counters, histograms.
+
+Stages are timed with a span, which records its duration in the
+pipeline_stage_duration_seconds histogram (labels: stage, outcome):
+
+    with span('scrape', host='defensenews.com') as s:
+        content, error = fetch(...)
+        if error:
+            s.fail(error)
+
+    @timed('rss', fields=lambda url, name: {'feed': name})
+    def parse_feed(url, name): ...
+
+Instrumented: RSS feed parsing (rss), article scraping (scrape), AI
+extraction (summarize), database commits (db_commit) and publish build
+steps (publish.<step>).
+
+Output:
+- Prometheus text format: render_prometheus(), served by the web app at
+  /metrics and by the pipeline worker with --metrics-port
+- Structured JSON logs, one object per finished span, when METRICS_LOG is
+  set: a file path (JSON lines, appended) or "-" for stderr. Span keyword
+  arguments (feed name, outlet host, ...) go into the log line but not
+  into metric labels, which keeps label cardinality low.
+
+Batch runs (GitHub Actions) can't be scraped; summarize their logs:
+
+    METRICS_LOG=logs/metrics.jsonl python3 src/ingest/rss_fetcher.py
+    python3 -m src.utils.metrics logs/metrics.jsonl
+
+Metrics are per process; everything here is thread-safe.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+# Histogram buckets (seconds): sub-millisecond commits up to multi-minute publishes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_DURATION = 'pipeline_stage_duration_seconds'
+
+# Commits faster than this are counted but not logged (one line per commit is noise)
+SLOW_COMMIT_SECONDS = float(os.environ.get('METRICS_SLOW_COMMIT_SECONDS', '0.5'))
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type = 'counter'
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[-2] if series else 0
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within buckets (like histogram_quantile)"""
+        series = self._series.get(_label_key(labels))
+        if not series or not series[-2]:
+            return None
+        rank = q * series[-2]
+        lower_bound, lower_count = 0.0, 0
+        for bound, count in zip(self.buckets, series):
+            if count >= rank:
+                if count == lower_count:
+                    return bound
+                return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+            lower_bound, lower_count = bound, count
+        return self.buckets[-1]
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                samples.append((f'{self.name}_bucket', key + (('le', _format_value(bound)),), count))
+            samples.append((f'{self.name}_bucket', key + (('le', '+Inf'),), series[-2]))
+            samples.append((f'{self.name}_sum', key, series[-1]))
+            samples.append((f'{self.name}_count', key, series[-2]))
+        return samples
+
+
+class Registry:
+    """Named metrics of this process"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str = '') -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name: str, help: str = '', buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, key, value in metric.samples():
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+stage_duration = REGISTRY.histogram(STAGE_DURATION, 'Duration of pipeline stage operations')
+
+
+def counter(name: str, help: str = '') -> Counter:
+    """Get or create a counter in the process registry"""
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name: str, help: str = '', buckets=DEFAULT_BUCKETS) -> Histogram:
+    """Get or create a histogram in the process registry"""
+    return REGISTRY.histogram(name, help, buckets)
+
+
+def render_prometheus() -> str:
+    """The process registry in the Prometheus text format"""
+    return REGISTRY.render()
+
+
+# --- Structured JSON logs ---------------------------------------------------
+
+logger = logging.getLogger('pipeline.metrics')
+logger.propagate = False
+
+
+def configure_log(target: Optional[str] = None):
+    """
+    Send span logs to a JSON-lines file, or stderr for "-" (default: METRICS_LOG)
+
+    Without a target, span logs are dropped (metrics are still recorded).
+    """
+    target = target if target is not None else os.environ.get('METRICS_LOG')
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    if not target:
+        logger.setLevel(logging.CRITICAL + 1)
+        return
+
+    if target == '-':
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        handler = logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def log_event(event: str, **fields):
+    """Write one structured log line (no-op unless a log target is configured)"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    record = {'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), 'event': event,
+              'pid': os.getpid(), **fields}
+    logger.info(json.dumps(record, default=str))
+
+
+configure_log()
+
+
+# --- Spans ------------------------------------------------------------------
+
+class Span:
+    """A timed stage operation; set outcome or add fields before it ends"""
+
+    def __init__(self, stage: str, fields: dict):
+        self.stage = stage
+        self.fields = fields
+        self.outcome = 'ok'
+        self.duration = None
+
+    def fail(self, error=None, outcome: str = 'error'):
+        """Mark the operation failed (without raising)"""
+        self.outcome = outcome
+        if error is not None:
+            self.fields['error'] = str(error)[:200]
+
+
+@contextmanager
+def span(stage: str, log_slower_than: Optional[float] = None, **fields):
+    """
+    Time a block as one operation of a pipeline stage
+
+    Exceptions mark the span 'error' and propagate. The duration goes into
+    pipeline_stage_duration_seconds{stage, outcome}; a JSON log line with
+    the keyword fields is written when logging is configured (and the span
+    took at least log_slower_than seconds, if given).
+    """
+    current = Span(stage, dict(fields))
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        stage_duration.observe(current.duration, stage=stage, outcome=current.outcome)
+        if log_slower_than is None or current.duration >= log_slower_than:
+            log_event('span', stage=stage, outcome=current.outcome,
+                      duration_ms=round(current.duration * 1000, 2), **current.fields)
+
+
+def timed(stage: str, fields: Optional[Callable] = None, outcome: Optional[Callable] = None):
+    """
+    Decorator: run the function inside a span
+
+    Args:
+        stage: Stage name
+        fields: Called with the function's arguments, returns log fields
+        outcome: Called with the return value, returns the outcome ('ok',
+            'error', ...) for functions that report failure instead of raising
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **(fields(*args, **kwargs) if fields else {})) as current:
+                result = fn(*args, **kwargs)
+                if outcome is not None:
+                    current.outcome = outcome(result)
+                return result
+        return wrapper
+    return decorator
+
+
+# --- Database commits -------------------------------------------------------
+
+_commits_instrumented = False
+
+
+def instrument_db_commits():
+    """Time every SQLAlchemy Session commit as a db_commit span (idempotent)"""
+    global _commits_instrumented
+    if _commits_instrumented:
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    def before_commit(session):
+        session.info['_commit_started'] = time.perf_counter()
+
+    def finish(session, outcome):
+        started = session.info.pop('_commit_started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        stage_duration.observe(duration, stage='db_commit', outcome=outcome)
+        if duration >= SLOW_COMMIT_SECONDS or outcome != 'ok':
+            log_event('span', stage='db_commit', outcome=outcome, duration_ms=round(duration * 1000, 2))
+
+    event.listen(Session, 'before_commit', before_commit)
+    event.listen(Session, 'after_commit', lambda session: finish(session, 'ok'))
+    event.listen(Session, 'after_soft_rollback', lambda session, previous: finish(session, 'error'))
+    _commits_instrumented = True
+
+
+instrument_db_commits()
+
+
+# --- Standalone exporter ----------------------------------------------------
+
+def start_metrics_server(port: int, host: str = '0.0.0.0'):
+    """Serve /metrics from a background thread (for processes without the web app)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+# --- Log summary ------------------------------------------------------------
+
+def summarize_log(path: str):
+    """
+    Per-stage throughput and latency percentiles from a JSON span log
+
+    Returns:
+        Dict of stage -> {'count', 'errors', 'per_minute', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+    """
+    durations, errors, first, last = {}, {}, {}, {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('event') != 'span':
+                continue
+            stage = record['stage']
+            durations.setdefault(stage, []).append(record['duration_ms'])
+            errors[stage] = errors.get(stage, 0) + (record.get('outcome') != 'ok')
+            ts = datetime.fromisoformat(record['ts'])
+            first[stage] = min(first.get(stage, ts), ts)
+            last[stage] = max(last.get(stage, ts), ts)
+
+    def percentile(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    summary = {}
+    for stage, values in durations.items():
+        values.sort()
+        minutes = (last[stage] - first[stage]).total_seconds() / 60
+        summary[stage] = {
+            'count': len(values),
+            'errors': errors[stage],
+            'per_minute': round(len(values) / minutes, 1) if minutes > 0 else None,
+            'p50_ms': percentile(values, 0.50),
+            'p95_ms': percentile(values, 0.95),
+            'p99_ms': percentile(values, 0.99),
+            'max_ms': values[-1]
+        }
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Summarize a pipeline metrics log (JSON lines)')
+    parser.add_argument('log', help='Log file written with METRICS_LOG')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    summary = summarize_log(args.log)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{'Stage':<28}{'Count':>7}{'Errors':>8}{'/min':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        print("-" * 81)
+        for stage, row in sorted(summary.items()):
+            per_minute = f"{row['per_minute']:.1f}" if row['per_minute'] is not None else '-'
+            print(f"{stage:<28}{row['count']:>7}{row['errors']:>8}{per_minute:>8}"
+                  f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
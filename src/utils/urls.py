@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Canonical article URLs.
+
+The same article arrives with different spellings: wrapped in a Google
+redirect, with utm_* tracking parameters, a #fragment, an upper-case host
+or trailing punctuation picked up from a chat message. canonicalize_url()
+reduces them to one form so existence checks against raw_items.url match:
+
+    https://www.google.com/url?rct=j&url=https%3A%2F%2FExample.com%2Fa%3Futm_source%3Dx&ct=ga
+    https://example.com/a#comments
+    https://EXAMPLE.com:443/a?utm_medium=email).
+
+all become https://example.com/a
+
+Rules:
+- Google redirect URLs are unwrapped to their url= target
+- scheme and host are lower-cased, default ports dropped, an empty path becomes "/"
+- tracking parameters (utm_*, fbclid, gclid, ...) and fragments are removed,
+  the remaining query parameters are sorted
+- the path itself (case, trailing slash) is left alone: sites differ on
+  whether those matter
+"""
+
+import re
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click, never select content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', 'mkt_tok', '_hsenc', '_hsmi', 'ocid', 'cmpid', 'sr_share',
+    'ref_src', 'smid', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Characters a URL typed into a sentence tends to pick up at its end
+_TRAILING_PUNCTUATION = re.compile(r'[.,;:!?\'")\]>]+$')
+
+
+def _is_tracking(param):
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Canonical form of an article URL
+
+    Returns:
+        Canonical URL, or None if the text is not an http(s) URL
+    """
+    if not url:
+        return None
+    url = _TRAILING_PUNCTUATION.sub('', url.strip())
+
+    try:
+        parts = urlsplit(url)
+
+        # Unwrap Google redirects (Google Alerts links)
+        host = (parts.hostname or '').lower()
+        if (host == 'google.com' or host.endswith('.google.com')) and parts.path == '/url':
+            params = dict(parse_qsl(parts.query))
+            target = params.get('url') or params.get('q')
+            if target:
+                return canonicalize_url(target)
+
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not host:
+            return None
+
+        netloc = host
+        if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+            netloc = f"{host}:{parts.port}"
+        if parts.username:
+            netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+    except ValueError:
+        # Malformed host or port
+        return None
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(key)
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+
+if __name__ == '__main__':
+    examples = [
+        'https://www.google.com/url?rct=j&sa=t&url=https%3A%2F%2FExample.com%2Fa%3Futm_source%3Dx&ct=ga',
+        'https://example.com/a#comments',
+        'https://EXAMPLE.com:443/a?utm_medium=email).',
+        'https://example.com/deal?b=2&a=1&fbclid=abc',
+        'http://example.com',
+        'ftp://example.com/file',
+    ]
+    for example in examples:
+        print(f"{example}\n  -> {canonicalize_url(example)}")
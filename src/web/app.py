@@ -1,7 +1,7 @@
 """FastAPI web application for triage and dashboard."""
 
 from fastapi import FastAPI, Request, Form, Query
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import sys
@@ -11,6 +11,9 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.database import RawItem, ArticleContent, AIExtraction, MasterItem, RejectedItem, get_session
+from src.database.categories import set_categories, in_category, category_counts, SECTOR, CAPITAL_SOURCE
+from src.database.companies import link_company, get_prior_deals
+from src.utils.amounts import parse_amount_usd
 
 app = FastAPI(title="Defense Capital Tracker")
 
@@ -84,13 +87,15 @@ async def email_action(request: Request, token: str = Query(...)):
                     company=extraction.company if extraction else None,
                     investors=extraction.investors if extraction else None,
                     investment_amount=extraction.deal_amount if extraction else None,
+                    amount_usd=extraction.amount_usd if extraction else None,
                     transaction_type=extraction.transaction_type if extraction else None,
-                    capital_sources=extraction.capital_sources if extraction else None,
-                    sectors=extraction.sectors if extraction else None,
                     summary=extraction.strategic_significance if extraction else None,
                     human_notes="Approved via email",
                     published=False
                 )
+                if extraction:
+                    set_categories(session, master, extraction.sectors, extraction.capital_sources)
+                link_company(session, master)
                 session.add(master)
                 session.commit()
 
@@ -141,10 +146,12 @@ async def email_action(request: Request, token: str = Query(...)):
 async def telegram_webhook(request: Request):
     """Handle incoming Telegram bot updates."""
     from src.notifications.telegram_bot import handle_telegram_update
+    from src.notifications.telegram_processor import get_processor
 
     try:
         update = await request.json()
-        response = handle_telegram_update(update)
+        # URLs are acknowledged immediately and processed in the background
+        response = handle_telegram_update(update, processor=get_processor())
 
         # If response has a method, it's a Telegram API response format
         if response.get('method'):
@@ -156,6 +163,88 @@ async def telegram_webhook(request: Request):
         print(f"Telegram webhook error: {e}")
         return JSONResponse(content={'ok': True})
 
+
+@app.on_event("shutdown")
+async def stop_telegram_processor():
+    """Let in-flight Telegram submissions finish before the app exits."""
+    from src.notifications import telegram_processor
+
+    if telegram_processor._processor is not None:
+        await telegram_processor._processor.shutdown()
+
+
+@app.get("/api/search")
+async def search(
+    q: str = Query(..., description="Search text"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100)
+):
+    """Ranked full-text search over titles, summaries, article text, companies and investors.
+
+    Returns highlighted, paginated hits (see src/database/search.py).
+    """
+    from src.database.search import search_items
+
+    session = get_session()
+
+    try:
+        return search_items(session, q, page=page, per_page=per_page)
+    except Exception as e:
+        return JSONResponse(content={'error': f'Search failed: {e}'}, status_code=500)
+    finally:
+        session.close()
+
+
+@app.get("/api/facets")
+async def facets():
+    """Deal counts per sector and capital source for the master list."""
+    session = get_session()
+    try:
+        counts = category_counts(session, MasterItem)
+    finally:
+        session.close()
+
+    return {
+        "sectors": [{"name": name, "count": count} for name, count in counts.get(SECTOR, [])],
+        "capital_sources": [{"name": name, "count": count} for name, count in counts.get(CAPITAL_SOURCE, [])]
+    }
+
+@app.get("/api/queue")
+async def queue():
+    """Pipeline job queue depth and age per stage."""
+    from src.pipeline.jobs import queue_metrics
+
+    session = get_session()
+    try:
+        return queue_metrics(session)
+    finally:
+        session.close()
+
+
+@app.get("/export/master.csv")
+def export_master_csv(
+    sort: str = Query('date'),
+    sector: str = Query(None),
+    capital_source: str = Query(None)
+):
+    """Download the master list as CSV, streamed straight from the database cursor."""
+    from src.export.export_to_csv import iter_master_csv
+
+    filename = f"master_list_{datetime.now().strftime('%Y%m%d')}.csv"
+    return StreamingResponse(
+        iter_master_csv(sort_by=sort, sector=sector, capital_source=capital_source),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Pipeline stage timings and counters of this process, in Prometheus text format."""
+    from src.utils.metrics import render_prometheus
+
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Setup templates
 templates_dir = Path(__file__).parent / "templates"
 templates_dir.mkdir(exist_ok=True)
@@ -167,10 +256,13 @@ async def home(request: Request):
     """Home page showing triage queue."""
     session = get_session()
 
+    from src.scraper.dedup import duplicate_item_ids, get_cluster_members
+
     # Get items that:
     # 1. Have been successfully scraped
     # 2. Are not yet in master list
     # 3. Have not been rejected
+    # 4. Are not near duplicates of another story (one card per cluster)
     items = session.query(RawItem).join(
         ArticleContent, RawItem.id == ArticleContent.item_id
     ).filter(
@@ -180,15 +272,32 @@ async def home(request: Request):
         ),
         ~RawItem.id.in_(
             session.query(RejectedItem.item_id)
+        ),
+        ~RawItem.id.in_(
+            duplicate_item_ids(session)
         )
     ).order_by(
         RawItem.published_date.desc()
     ).limit(50).all()
 
+    # Other outlets' coverage of the same stories
+    cluster_members = get_cluster_members(session, [item.id for item in items])
+
     # Add article content and AI extraction to each item
     for item in items:
         item.article_content = session.query(ArticleContent).filter_by(item_id=item.id).first()
         item.ai_extraction = session.query(AIExtraction).filter_by(item_id=item.id).first()
+        item.duplicates = cluster_members.get(item.id, [])
+
+    # Earlier master list deals for each item's company (one query for the page)
+    prior_deals = get_prior_deals(
+        session,
+        [item.ai_extraction.company_id for item in items if item.ai_extraction],
+        exclude_item_ids=[item.id for item in items]
+    )
+    for item in items:
+        company_id = item.ai_extraction.company_id if item.ai_extraction else None
+        item.prior_deals = prior_deals.get(company_id, [])
 
     total_items = len(items)
     master_count = session.query(MasterItem).count()
@@ -254,10 +363,9 @@ async def accept_item(
             company=company if company else None,
             investors=investors if investors else None,
             investment_amount=investment_amount if investment_amount else None,
+            amount_usd=parse_amount_usd(investment_amount),
             # NEW fields
             transaction_type=transaction_type if transaction_type else None,
-            capital_sources=",".join(capital_sources) if capital_sources else None,
-            sectors=",".join(sectors) if sectors else None,
             # OLD fields (for backward compatibility)
             deal_type=deal_type if deal_type else None,
             capital_type=capital_type if capital_type else None,
@@ -268,6 +376,8 @@ async def accept_item(
             human_notes=notes if notes else None,
             published=False
         )
+        set_categories(session, master, sectors, capital_sources)
+        link_company(session, master)
         session.add(master)
         session.commit()
 
@@ -295,18 +405,30 @@ async def reject_item(item_id: int):
 
 
 @app.get("/master", response_class=HTMLResponse)
-async def master_list(request: Request):
-    """View master list of accepted items."""
+async def master_list(
+    request: Request,
+    sector: str = Query(None),
+    capital_source: str = Query(None)
+):
+    """View master list of accepted items, optionally filtered by sector/capital source."""
     from src.database import AIExtraction
 
     session = get_session()
 
-    master_items = session.query(MasterItem).join(
+    query = session.query(MasterItem).join(
         RawItem, MasterItem.item_id == RawItem.id
-    ).order_by(
+    )
+    if sector:
+        query = query.filter(in_category(MasterItem, SECTOR, sector))
+    if capital_source:
+        query = query.filter(in_category(MasterItem, CAPITAL_SOURCE, capital_source))
+
+    master_items = query.order_by(
         MasterItem.curated_at.desc()
     ).all()
 
+    facets = category_counts(session, MasterItem)
+
     # Add raw item data and pipeline status
     for master in master_items:
         master.raw_item = session.query(RawItem).filter_by(id=master.item_id).first()
@@ -317,7 +439,11 @@ async def master_list(request: Request):
 
     return templates.TemplateResponse("master.html", {
         "request": request,
-        "items": master_items
+        "items": master_items,
+        "sector_counts": facets.get(SECTOR, []),
+        "capital_source_counts": facets.get(CAPITAL_SOURCE, []),
+        "selected_sector": sector,
+        "selected_capital_source": capital_source
     })
 
 
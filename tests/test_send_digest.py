@@ -0,0 +1,108 @@
+"""Digest assembly: fixed query counts and which pending items each channel is sent."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, RawItem, ArticleContent, AIExtraction, MasterItem, RejectedItem
+from src.notifications import send_digest
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """In-memory database; send_digest.get_session hands out sessions on it."""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(send_digest, 'get_session', Session)
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def count_selects(session_factory):
+    """List that collects every SELECT statement run on the test engine."""
+    engine = session_factory.kw['bind']
+    selects = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            selects.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield selects
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def add_items(Session, pending=5, mastered=2, rejected=2):
+    """Summarized items: some pending, some already in the master list or rejected."""
+    session = Session()
+    now = datetime.utcnow()
+    for i in range(pending + mastered + rejected):
+        item = RawItem(url=f'https://example.com/{i}', title=f'Deal {i}', feed_source='test',
+                       published_date=now - timedelta(days=i))
+        session.add(item)
+        session.flush()
+        session.add(ArticleContent(item_id=item.id, clean_text='text', scrape_success=True))
+        session.add(AIExtraction(item_id=item.id, company=f'Company {i}', ai_summary='Summary',
+                                 summary_complete=True, extracted_at=now - timedelta(hours=i)))
+        if pending <= i < pending + mastered:
+            session.add(MasterItem(item_id=item.id, company=f'Company {i}'))
+        elif i >= pending + mastered:
+            session.add(RejectedItem(item_id=item.id))
+    session.commit()
+    session.close()
+
+
+def test_get_pending_items_runs_one_select(session_factory, count_selects):
+    add_items(session_factory)
+
+    items = send_digest.get_pending_items(limit=20)
+
+    assert len(count_selects) == 1
+    assert sorted(item.title for item in items) == [f'Deal {i}' for i in range(5)]
+
+
+def test_get_pending_items_query_count_does_not_grow_with_items(session_factory, count_selects):
+    add_items(session_factory, pending=30, mastered=10, rejected=10)
+
+    items = send_digest.get_pending_items(limit=20)
+
+    assert len(count_selects) == 1
+    assert len(items) == 20
+    # Newest first
+    assert items[0].title == 'Deal 0'
+
+
+def test_get_new_items_starts_a_new_channel_at_the_lookback_window(session_factory, count_selects):
+    add_items(session_factory, pending=3, mastered=0, rejected=0)
+    session = session_factory()
+    # A backlog item summarized long before the channel existed
+    old = session.query(AIExtraction).filter_by(company='Company 2').one()
+    old.extracted_at = datetime.utcnow() - timedelta(days=30)
+    session.commit()
+    count_selects.clear()
+
+    items = send_digest.get_new_items(session, 'email:new@example.com', limit=20, lookback_hours=24)
+
+    # Watermark lookup + one items query, and the old backlog item is left out
+    assert len(count_selects) == 2
+    assert [item.title for item, _ in items] == ['Deal 1', 'Deal 0']
+    session.close()
+
+
+def test_get_new_items_skips_items_already_sent(session_factory):
+    add_items(session_factory, pending=5, mastered=0, rejected=0)
+    session = session_factory()
+    channel = 'email:someone@example.com'
+
+    first = send_digest.get_new_items(session, channel, limit=2)
+    send_digest.record_notifications(session, channel, first, [])
+    session.commit()
+    second = send_digest.get_new_items(session, channel, limit=20)
+
+    assert [item.title for item, _ in first] == ['Deal 4', 'Deal 3']
+    assert [item.title for item, _ in second] == ['Deal 2', 'Deal 1', 'Deal 0']
+    session.close()
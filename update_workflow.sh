@@ -56,6 +56,14 @@ elif [ "$STAGE" = "ai" ]; then
   python3 src/scraper/generate_ai_summaries.py --limit 20
   echo "✓ AI summaries complete"
 
+elif [ "$STAGE" = "worker" ]; then
+  echo "🔁 Starting pipeline worker (Ctrl+C to stop)..."
+  python3 -m src.pipeline.worker
+
+elif [ "$STAGE" = "queue" ]; then
+  echo "📋 Job queue status..."
+  python3 src/pipeline/jobs.py
+
 elif [ "$STAGE" = "publish" ]; then
   # Publish and automatically deploy
   echo "📄 STAGE 4: Refreshing economic data & publishing website..."
@@ -125,6 +133,8 @@ else
   echo "  fetch   - Fetch RSS feeds (deal articles)"
   echo "  scrape  - Scrape article content"
   echo "  ai      - Generate AI summaries for deals"
+  echo "  worker  - Run fetch→scrape→ai continuously until stopped"
+  echo "  queue   - Show scrape/summarize job queue depth and age"
   echo "  publish - Refresh ALL data (FRED, Yahoo Finance, deals) & generate site + deploy"
   echo "  deploy  - Deploy to GitHub Pages only"
   echo "  all     - Run fetch→scrape→ai, then pause for triage"